@@ -4,11 +4,163 @@ Validators must prove syzygy > threshold to participate
 """
 
 import hashlib
+import multiprocessing as mp
+import os
+import queue
+import sys
 import time
-from dataclasses import dataclass
-from typing import Optional, List
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, astuple
+from typing import Any, Dict, Hashable, Optional, List, Tuple
 import json
 
+
+class TTLCache:
+    """
+    Bounded LRU mapping whose entries also expire after `ttl` seconds
+
+    Lookups, inserts and membership tests are O(1). Entries live in two
+    orders: `_data` is LRU order (for maxsize eviction) and `_expiry` is
+    insertion order, which is also expiry order since every entry gets
+    the same ttl; expired entries are purged from the front of `_expiry`.
+    """
+
+    def __init__(self, maxsize: int = 100000, ttl: float = 300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._expiry: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def _purge(self, now: float):
+        while self._expiry:
+            key, expires = next(iter(self._expiry.items()))
+            if expires > now:
+                break
+            self._expiry.popitem(last=False)
+            del self._data[key]
+
+    def _discard(self, key: Hashable):
+        self._data.pop(key, None)
+        self._expiry.pop(key, None)
+
+    def put(self, key: Hashable, value: Any = True):
+        now = self.clock()
+        self._purge(now)
+        self._expiry.pop(key, None)
+        self._expiry[key] = now + self.ttl
+        self._data[key] = (now + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            key, _ = self._data.popitem(last=False)
+            del self._expiry[key]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= self.clock():
+            self._discard(key)
+            return default
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        self._discard(key)
+        if entry is None or entry[0] <= self.clock():
+            return default
+        return entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        self._purge(self.clock())
+        return len(self._data)
+
+
+_MISSING = object()
+
+
+def meets_difficulty(digest: bytes, difficulty: int) -> bool:
+    """Leading-zero check on the raw digest (difficulty counts hex digits)"""
+    full, half = divmod(difficulty, 2)
+    if digest[:full] != bytes(full):
+        return False
+    return not half or digest[full] < 0x10
+
+
+def _proof_prefix(node_id: str, syzygy: float, timestamp: int):
+    """SHA-256 state with the constant part of the proof data already absorbed"""
+    return hashlib.sha256(f"{node_id}{syzygy}{timestamp}".encode())
+
+
+def _search_nonces(prefix, difficulty: int, start: int, stop: int) -> Optional[int]:
+    for nonce in range(start, stop):
+        h = prefix.copy()
+        h.update(b"%d" % nonce)
+        if meets_difficulty(h.digest(), difficulty):
+            return nonce
+    return None
+
+
+def _mine_worker(data: bytes, difficulty: int, worker: int, workers: int,
+                 chunk: int, max_iterations: int, found, results):
+    """
+    Worker process: scans chunks worker, worker+workers, ... of the nonce
+    space and stops as soon as any worker signals a hit.
+    """
+    prefix = hashlib.sha256(data)
+    hashed = 0
+    start = worker * chunk
+    while start < max_iterations and not found.is_set():
+        stop = min(start + chunk, max_iterations)
+        nonce = _search_nonces(prefix, difficulty, start, stop)
+        if nonce is not None:
+            found.set()
+            results.put((worker, nonce, hashed + nonce - start + 1))
+            return
+        hashed += stop - start
+        start += workers * chunk
+    results.put((worker, None, hashed))
+
+
+def _collect_results(procs: List[mp.Process], results, found=None,
+                     poll: float = 1.0) -> List[Tuple[int, Optional[int], int]]:
+    """
+    Gather one (worker, nonce, hashed) report per worker process
+
+    Waits in `poll`-second slices and checks liveness in between, so a
+    worker that dies without reporting is counted as exhausted (with a
+    warning) instead of blocking the caller forever. `found` is set on
+    the first hit so the remaining workers stop early.
+    """
+    reports = {}
+    while len(reports) < len(procs):
+        try:
+            worker, hit, count = results.get(timeout=poll)
+        except queue.Empty:
+            for w, proc in enumerate(procs):
+                if w not in reports and not proc.is_alive():
+                    try:
+                        # A worker that exited cleanly may have a report still in the pipe
+                        worker, hit, count = results.get(timeout=poll)
+                    except queue.Empty:
+                        print(f"⚠ Worker {w} exited (code {proc.exitcode}) without reporting")
+                        reports[w] = (w, None, 0)
+                        break
+                    reports[worker] = (worker, hit, count)
+                    break
+            continue
+        reports[worker] = (worker, hit, count)
+        if hit is not None and found is not None:
+            found.set()
+    for proc in procs:
+        proc.join()
+    return [reports[w] for w in sorted(reports)]
+
 @dataclass
 class CoherenceProof:
     """Cryptographic proof of coherence state"""
@@ -40,6 +192,15 @@ class CoherenceProof:
 
         return True
 
+def _verify_proofs(rows: List[tuple], difficulty: int, syzygy_threshold: float) -> List[bool]:
+    """Worker: quiet verification of proofs shipped as field tuples"""
+    results = []
+    for row in rows:
+        proof = CoherenceProof(*row)
+        results.append(proof.syzygy >= syzygy_threshold and proof.verify(difficulty))
+    return results
+
+
 class ProofOfCoherenceValidator:
     """
     Generate and verify proof-of-coherence
@@ -49,9 +210,12 @@ class ProofOfCoherenceValidator:
     2. Mining nonce that encodes coherence state
     """
 
-    def __init__(self, difficulty: int = 4, syzygy_threshold: float = 0.98):
+    def __init__(self, difficulty: int = 4, syzygy_threshold: float = 0.98,
+                 challenge_ttl: int = 300, max_challenges: int = 100000):
         self.difficulty = difficulty
         self.syzygy_threshold = syzygy_threshold
+        self.challenge_ttl = challenge_ttl
+        self.challenges = TTLCache(maxsize=max_challenges, ttl=challenge_ttl)
 
     def mine_proof(self,
                   node_id: str,
@@ -84,31 +248,99 @@ class ProofOfCoherenceValidator:
             return None
 
         timestamp = int(time.time())
-        target = '0' * self.difficulty
 
         print(f"Mining proof for {node_id} (syzygy={syzygy:.4f})...")
 
-        for nonce in range(max_iterations):
-            data = f"{node_id}{syzygy}{timestamp}{nonce}"
-            proof_hash = hashlib.sha256(data.encode()).hexdigest()
-
-            if proof_hash.startswith(target):
-                proof = CoherenceProof(
-                    node_id=node_id,
-                    syzygy=syzygy,
-                    coherence=coherence,
-                    fluctuation=fluctuation,
-                    timestamp=timestamp,
-                    nonce=nonce,
-                    proof_hash=proof_hash
-                )
-
-                print(f"✓ Proof found after {nonce+1} iterations")
-                print(f"  Hash: {proof_hash}")
-                return proof
-
-        print(f"✗ No proof found in {max_iterations} iterations")
-        return None
+        prefix = _proof_prefix(node_id, syzygy, timestamp)
+        nonce = _search_nonces(prefix, self.difficulty, 0, max_iterations)
+        if nonce is None:
+            print(f"✗ No proof found in {max_iterations} iterations")
+            return None
+
+        proof = self._build_proof(node_id, syzygy, coherence, fluctuation, timestamp, nonce)
+        print(f"✓ Proof found after {nonce+1} iterations")
+        print(f"  Hash: {proof.proof_hash}")
+        return proof
+
+    def _build_proof(self, node_id: str, syzygy: float, coherence: float,
+                     fluctuation: float, timestamp: int, nonce: int) -> CoherenceProof:
+        h = _proof_prefix(node_id, syzygy, timestamp)
+        h.update(b"%d" % nonce)
+        return CoherenceProof(
+            node_id=node_id,
+            syzygy=syzygy,
+            coherence=coherence,
+            fluctuation=fluctuation,
+            timestamp=timestamp,
+            nonce=nonce,
+            proof_hash=h.hexdigest()
+        )
+
+    def mine_proof_parallel(self,
+                            node_id: str,
+                            syzygy: float,
+                            coherence: float = 0.86,
+                            fluctuation: float = 0.14,
+                            max_iterations: int = 100000000,
+                            workers: Optional[int] = None,
+                            chunk: int = 65536) -> Optional[CoherenceProof]:
+        """
+        Mine a proof-of-coherence across worker processes
+
+        The nonce space is split into interleaved chunks, one stream per
+        worker; all workers stop once any of them finds a valid nonce.
+
+        Args:
+            node_id: Unique node identifier
+            syzygy: Current syzygy value
+            coherence: C value
+            fluctuation: F value
+            max_iterations: Total nonce budget shared by all workers
+            workers: Worker processes (default: CPU count)
+            chunk: Nonces per scheduling unit
+
+        Returns:
+            CoherenceProof if found, None otherwise
+        """
+
+        if syzygy < self.syzygy_threshold:
+            print(f"Syzygy {syzygy} below threshold {self.syzygy_threshold}")
+            return None
+
+        if abs(coherence + fluctuation - 1.0) > 1e-10:
+            print("C+F≠1 violation")
+            return None
+
+        workers = workers or os.cpu_count() or 1
+        timestamp = int(time.time())
+        data = f"{node_id}{syzygy}{timestamp}".encode()
+
+        print(f"Mining proof for {node_id} (syzygy={syzygy:.4f}, {workers} workers)...")
+
+        found = mp.Event()
+        results = mp.Queue()
+        procs = [mp.Process(target=_mine_worker,
+                            args=(data, self.difficulty, w, workers, chunk,
+                                  max_iterations, found, results), daemon=True)
+                 for w in range(workers)]
+        for proc in procs:
+            proc.start()
+
+        # Every live worker reports exactly once (hit or exhausted), so
+        # draining the queue before join() cannot block on unflushed results.
+        reports = _collect_results(procs, results, found)
+        hashed = sum(count for _, _, count in reports)
+        hits = [hit for _, hit, _ in reports if hit is not None]
+        nonce = min(hits) if hits else None
+
+        if nonce is None:
+            print(f"✗ No proof found in {max_iterations} iterations")
+            return None
+
+        proof = self._build_proof(node_id, syzygy, coherence, fluctuation, timestamp, nonce)
+        print(f"✓ Proof found (nonce {nonce}, ~{hashed} hashes)")
+        print(f"  Hash: {proof.proof_hash}")
+        return proof
 
     def verify_proof(self, proof: CoherenceProof) -> bool:
         """Verify a proof-of-coherence"""
@@ -125,30 +357,94 @@ class ProofOfCoherenceValidator:
 
         return True
 
+    def verify_many(self, proofs: List[CoherenceProof], workers: Optional[int] = None,
+                    chunk_size: int = 2048) -> List[bool]:
+        """
+        Verify a batch of proofs
+
+        Identical proofs are verified once; unique proofs are split into
+        chunks and checked across a process pool when there is more than
+        one chunk.
+
+        Returns:
+            One boolean per input proof, in order
+        """
+        unique: Dict[tuple, int] = {}
+        for proof in proofs:
+            unique.setdefault(astuple(proof), len(unique))
+        rows = list(unique)
+
+        chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(chunks) <= 1:
+            verdicts = [v for chunk in chunks
+                        for v in _verify_proofs(chunk, self.difficulty, self.syzygy_threshold)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = pool.map(_verify_proofs, chunks,
+                                 [self.difficulty] * len(chunks),
+                                 [self.syzygy_threshold] * len(chunks))
+                verdicts = [v for part in parts for v in part]
+
+        return [verdicts[unique[astuple(proof)]] for proof in proofs]
+
     def generate_challenge(self, node_id: str) -> dict:
         """
         Generate a challenge for node to prove coherence
 
+        The challenge is kept until it expires and is then dropped
+        automatically.
+
         Returns:
             Challenge dict with timestamp and required difficulty
         """
-        return {
+        now = int(time.time())
+        challenge = {
             'node_id': node_id,
-            'timestamp': int(time.time()),
+            'timestamp': now,
             'difficulty': self.difficulty,
             'syzygy_threshold': self.syzygy_threshold,
-            'expires_at': int(time.time()) + 300  # 5 minutes
+            'expires_at': now + self.challenge_ttl  # 5 minutes by default
         }
+        self.challenges.put(node_id, challenge)
+        return challenge
+
+    def get_challenge(self, node_id: str) -> Optional[dict]:
+        """Return the node's outstanding challenge, or None if absent/expired"""
+        return self.challenges.get(node_id)
 
 class CoherenceAuthenticator:
     """
     Manage authentication tokens based on proof-of-coherence
     """
 
-    def __init__(self):
+    def __init__(self, token_ttl: int = 3600, max_entries: int = 100000):
         self.validator = ProofOfCoherenceValidator(difficulty=4, syzygy_threshold=0.98)
-        self.active_tokens: dict[str, str] = {}  # node_id -> token
-        self.proofs: dict[str, CoherenceProof] = {}
+        self.token_ttl = token_ttl
+        self.active_tokens = TTLCache(maxsize=max_entries, ttl=token_ttl)  # node_id -> token
+        self.proofs = TTLCache(maxsize=max_entries, ttl=token_ttl)  # node_id -> proof
+        # proof_hash of every accepted proof; proofs older than token_ttl are
+        # rejected outright, so a replay cannot outlive its cache entry
+        self.accepted = TTLCache(maxsize=max_entries, ttl=token_ttl)
+
+    def _precheck(self, node_id: str, proof: CoherenceProof) -> Optional[str]:
+        """Cheap O(1) rejections; returns the reason or None"""
+        if proof.node_id != node_id:
+            return "Node ID mismatch"
+        if proof.proof_hash in self.accepted:
+            return "Replayed proof"
+        if proof.timestamp + self.token_ttl < time.time():
+            return "Stale proof"
+        return None
+
+    def _issue_token(self, node_id: str, proof: CoherenceProof) -> str:
+        token_data = f"{node_id}{proof.timestamp}{proof.proof_hash}"
+        token = hashlib.sha256(token_data.encode()).hexdigest()
+
+        self.active_tokens.put(node_id, token)
+        self.proofs.put(node_id, proof)
+        self.accepted.put(proof.proof_hash)
+        return token
 
     def authenticate(self, node_id: str, proof: CoherenceProof) -> Optional[str]:
         """
@@ -162,27 +458,52 @@ class CoherenceAuthenticator:
             Authentication token or None
         """
 
-        if proof.node_id != node_id:
-            print("Node ID mismatch")
+        reason = self._precheck(node_id, proof)
+        if reason:
+            print(reason)
             return None
 
         if not self.validator.verify_proof(proof):
             print("Invalid proof")
             return None
 
-        # Generate token
-        token_data = f"{node_id}{proof.timestamp}{proof.proof_hash}"
-        token = hashlib.sha256(token_data.encode()).hexdigest()
-
-        # Store
-        self.active_tokens[node_id] = token
-        self.proofs[node_id] = proof
+        token = self._issue_token(node_id, proof)
 
         print(f"✓ Authenticated {node_id}")
         print(f"  Token: {token[:16]}...")
 
         return token
 
+    def authenticate_many(self, requests: List[Tuple[str, CoherenceProof]],
+                          workers: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Authenticate a batch of (node_id, proof) pairs
+
+        Replays and stale proofs are rejected from the cache without being
+        verified; the rest go through validator.verify_many. Within the
+        batch only the first copy of a proof can be accepted.
+
+        Returns:
+            Token (or None) per request, in order
+        """
+        tokens: List[Optional[str]] = [None] * len(requests)
+        pending: List[int] = []
+        seen = set()
+        for i, (node_id, proof) in enumerate(requests):
+            if self._precheck(node_id, proof) or proof.proof_hash in seen:
+                continue
+            seen.add(proof.proof_hash)
+            pending.append(i)
+
+        verdicts = self.validator.verify_many([requests[i][1] for i in pending], workers=workers)
+        for i, ok in zip(pending, verdicts):
+            if ok:
+                tokens[i] = self._issue_token(*requests[i])
+
+        accepted = sum(t is not None for t in tokens)
+        print(f"✓ Authenticated {accepted}/{len(requests)} nodes")
+        return tokens
+
     def verify_token(self, node_id: str, token: str) -> bool:
         """Verify an authentication token"""
 
@@ -202,6 +523,44 @@ class CoherenceAuthenticator:
         return proof.syzygy
 
 
+def benchmark_mining(iterations: int = 500000, workers: Optional[int] = None) -> dict:
+    """
+    Measure raw nonce-search throughput
+
+    Every worker hashes `iterations` nonces at an unreachable difficulty,
+    so the numbers reflect pure hashing speed.
+
+    Returns:
+        Dict with total and per-core hashes/sec
+    """
+    workers = workers or os.cpu_count() or 1
+    data = b"benchmark_node0.98361700000000"
+    found = mp.Event()
+    results = mp.Queue()
+    procs = [mp.Process(target=_mine_worker,
+                        args=(data, 64, w, workers, iterations,
+                              iterations * workers, found, results), daemon=True)
+             for w in range(workers)]
+
+    start = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    reports = _collect_results(procs, results)
+    elapsed = time.perf_counter() - start
+    hashed = sum(count for _, _, count in reports)
+
+    report = {
+        'workers': workers,
+        'hashes': hashed,
+        'seconds': elapsed,
+        'hashes_per_sec': hashed / elapsed,
+        'hashes_per_sec_per_core': hashed / elapsed / workers,
+    }
+    print(f"Mining benchmark: {report['hashes_per_sec']:,.0f} H/s total, "
+          f"{report['hashes_per_sec_per_core']:,.0f} H/s per core ({workers} workers)")
+    return report
+
+
 # Example usage
 def example_poc_workflow():
     """Complete proof-of-coherence workflow"""
@@ -280,4 +639,7 @@ def example_poc_workflow():
         print("✓ Correctly rejected low syzygy node")
 
 if __name__ == "__main__":
-    example_poc_workflow()
+    if "--bench" in sys.argv:
+        benchmark_mining()
+    else:
+        example_poc_workflow()
@@ -4,8 +4,9 @@ Wetware Neural Network Simulation
 """
 
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import matplotlib.pyplot as plt
+from scipy import sparse
 from dataclasses import dataclass
 
 @dataclass
@@ -147,7 +148,15 @@ class WetwareNetwork:
         """
         Self-replication: create a daughter network with mutations
         """
-        daughter = WetwareNetwork(n_neurons=self.n_neurons)
+        # Fresh neurons, but no connection sampling: the synapses are inherited below
+        daughter = self.__class__.__new__(self.__class__)
+        daughter.n_neurons = self.n_neurons
+        daughter.grid_size = self.grid_size
+        daughter.neurons = []
+        daughter.synapses = []
+        daughter.opsin_library = self.opsin_library
+        daughter.syzygy_history = []
+        daughter._initialize_neurons()
         daughter.generation = self.generation + 1
 
         # Copy neurons with mutations
@@ -172,10 +181,19 @@ class WetwareNetwork:
 
         return daughter
 
-    def evolve(self, target_frequency: float, generations: int = 10):
+    def evolve(self, target_frequency: float, generations: int = 10,
+               population_size: Optional[int] = None):
         """
         Evolve network by selecting for response to target frequency
+
+        With population_size, runs the copy-on-write population mode of
+        SparseWetwareNetwork (tournament selection).
         """
+        if population_size:
+            history, _ = SparseWetwareNetwork.from_network(self).evolve(
+                target_frequency, generations, population_size)
+            return history
+
         history = []
         for gen in range(generations):
             # Test response
@@ -247,6 +265,319 @@ class WetwareNetwork:
         plt.savefig('wetware_activity.png')
         print("Plot saved to wetware_activity.png")
 
+def _sensitive(sens: Optional[Dict], frequency: float) -> bool:
+    return bool(sens) and sens['min_freq'] <= frequency <= sens['max_freq']
+
+class SparseWetwareNetwork:
+    """
+    Array-based, event-driven backend for WetwareNetwork.
+
+    Neuron state lives in flat arrays and synapses in a CSR matrix
+    (row = presynaptic neuron). Each step only touches the rows of the
+    neurons that spiked: their outgoing weights are summed into the
+    postsynaptic potentials (s^T W restricted to active rows) and the
+    Hebbian update is applied to the same slots. The dynamics are the
+    same as WetwareNetwork.step().
+
+    For large networks lower connection_prob: 100k neurons at 0.001
+    give ~10^7 synapses.
+
+    replicate() is copy-on-write: a daughter shares the parent's arrays
+    and stores only its mutations (the neurons that gained an opsin and
+    the seed of its synapse mutation). State arrays are copied on the
+    first write and the synapse matrix is only rebuilt when step() or
+    compute_memory() needs it, so a population costs O(mutations) per
+    daughter until it is simulated. Shared arrays (on both sides) are
+    marked read-only, so writing to them directly raises instead of
+    leaking into relatives; the methods copy them first.
+    """
+
+    THRESHOLD = -55.0
+    RESET = -70.0
+    LEAK = 0.1
+    SPIKE_RATE = 100.0
+    RATE_DECAY = 0.9
+    EPSP_GAIN = 2.0
+    HEBBIAN_RATE = 0.001
+
+    def __init__(self,
+                 n_neurons: int = 10000,
+                 grid_size: Tuple[float, float, float] = (100.0, 100.0, 100.0),
+                 connection_prob: float = 0.01,
+                 seed: Optional[int] = None):
+        self.n_neurons = n_neurons
+        self.grid_size = grid_size
+        self.rng = np.random.default_rng(seed)
+        self.opsin_library = {}
+        self.generation = 1
+        self.syzygy = 0.0
+        self.syzygy_history = []
+
+        n = n_neurons
+        self.positions = self.rng.uniform(0, 1, (n, 3)) * np.asarray(grid_size)
+        self.membrane_potential = -70.0 + self.rng.standard_normal(n) * 5
+        self.firing_rate = np.zeros(n)
+        # opsin name -> boolean expression mask over neurons
+        self.opsins: Dict[str, np.ndarray] = {'ChR2': self.rng.random(n) < 0.1}
+        self._shared = set()
+        self.mutations: Dict[str, np.ndarray] = {}
+        self._lineage: Tuple[int, ...] = ()
+        self._base_weights = None
+        self.weights = self._sample_connections(connection_prob)
+
+    def _sample_connections(self, p: float) -> sparse.csr_matrix:
+        """
+        Bernoulli(p) over all off-diagonal pairs by geometric skipping:
+        gaps between successive synapses in the flattened pair index are
+        Geometric(p), so the cost is O(synapses) instead of O(n^2).
+        """
+        n = self.n_neurons
+        total = n * (n - 1)
+        chunks, position = [], -1
+        if p > 0 and total > 0:
+            batch = int(total * p * 1.05) + 1024
+            while position < total:
+                gaps = self.rng.geometric(p, batch)
+                flat = position + np.cumsum(gaps)
+                position = int(flat[-1])
+                chunks.append(flat[flat < total])
+        flat = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+        pre, col = np.divmod(flat, n - 1) if n > 1 else (flat, flat)
+        post = col + (col >= pre)  # skip the diagonal
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pre, minlength=n), out=indptr[1:])
+        data = self.rng.uniform(0.1, 1.0, len(flat))
+        return sparse.csr_matrix((data, post, indptr), shape=(n, n))
+
+    @classmethod
+    def from_network(cls, net: 'WetwareNetwork') -> 'SparseWetwareNetwork':
+        """Convert an object-based WetwareNetwork (state, opsins and synapses)."""
+        sparse_net = cls.__new__(cls)
+        n = net.n_neurons
+        sparse_net.n_neurons = n
+        sparse_net.grid_size = net.grid_size
+        sparse_net.rng = np.random.default_rng()
+        sparse_net.opsin_library = dict(net.opsin_library)
+        sparse_net.generation = net.generation
+        sparse_net.syzygy = getattr(net, 'syzygy', 0.0)
+        sparse_net.syzygy_history = list(net.syzygy_history)
+        sparse_net.positions = np.array([(nr.x, nr.y, nr.z) for nr in net.neurons], dtype=float).reshape(n, 3)
+        sparse_net.membrane_potential = np.array([nr.membrane_potential for nr in net.neurons], dtype=float)
+        sparse_net.firing_rate = np.array([nr.firing_rate for nr in net.neurons], dtype=float)
+        sparse_net.opsins = {}
+        for i, neuron in enumerate(net.neurons):
+            for opsin in neuron.opsins:
+                sparse_net.opsins.setdefault(opsin, np.zeros(n, dtype=bool))[i] = True
+        # Later duplicates of a (pre, post) pair are kept as separate slots
+        order = sorted(range(len(net.synapses)), key=lambda k: (net.synapses[k].pre, k))
+        pre = np.array([net.synapses[k].pre for k in order], dtype=np.int64)
+        post = np.array([net.synapses[k].post for k in order], dtype=np.int64)
+        data = np.array([net.synapses[k].weight for k in order], dtype=float)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pre, minlength=n), out=indptr[1:])
+        sparse_net._shared = set()
+        sparse_net.mutations = {}
+        sparse_net._lineage = ()
+        sparse_net._base_weights = None
+        sparse_net.weights = sparse.csr_matrix((data, post, indptr), shape=(n, n))
+        sparse_net.handover_count = np.array([net.synapses[k].handover_count for k in order], dtype=np.int64)
+        return sparse_net
+
+    # --- copy-on-write replication ---
+
+    @property
+    def weights(self) -> sparse.csr_matrix:
+        if self._weights is None:
+            self._materialize_weights()
+        return self._weights
+
+    @weights.setter
+    def weights(self, matrix: sparse.csr_matrix):
+        self._weights = matrix
+        self.handover_count = np.zeros(matrix.nnz, dtype=np.int64)
+
+    def _materialize_weights(self):
+        """Replay the synapse mutations of the lineage on the ancestor's matrix."""
+        W = self._base_weights
+        for seed in self._lineage:
+            W = self._mutate_synapses(W, np.random.default_rng(seed))
+        self.weights = W
+        self._base_weights = None
+        self._lineage = ()
+
+    @staticmethod
+    def _mutate_synapses(W: sparse.csr_matrix, rng: np.random.Generator) -> sparse.csr_matrix:
+        """Drop 5% of the synapses and rescale the rest by U(0.9, 1.1) (capped at 1)."""
+        keep = rng.random(W.nnz) >= 0.05
+        data = np.minimum(1.0, W.data * rng.uniform(0.9, 1.1, W.nnz))[keep]
+        rows = np.repeat(np.arange(W.shape[0]), np.diff(W.indptr))[keep]
+        indptr = np.zeros(W.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=W.shape[0]), out=indptr[1:])
+        return sparse.csr_matrix((data, W.indices[keep], indptr), shape=W.shape)
+
+    def _own(self, *names: str):
+        """Copy shared arrays before writing to them."""
+        for name in names:
+            if name in self._shared:
+                setattr(self, name, getattr(self, name).copy())
+                self._shared.discard(name)
+
+    def replicate(self, mutation_rate: float = 0.01) -> 'SparseWetwareNetwork':
+        """
+        Self-replication with the same mutations as WetwareNetwork.replicate():
+        each neuron gains a random library opsin with probability
+        mutation_rate, 5% of synapses are dropped and the rest rescaled.
+        """
+        daughter = self.__class__.__new__(self.__class__)
+        daughter.__dict__.update(self.__dict__)
+        daughter.generation = self.generation + 1
+        daughter.syzygy_history = []
+        daughter.rng = np.random.default_rng(self.rng.integers(2**63))
+        daughter._shared = {'positions', 'membrane_potential', 'firing_rate'}
+        self._shared |= daughter._shared
+        for name in daughter._shared:
+            getattr(self, name).flags.writeable = False
+        for mask in self.opsins.values():
+            mask.flags.writeable = False
+        daughter.opsins = dict(self.opsins)
+        daughter.mutations = {}
+
+        if self.opsin_library:
+            names = list(self.opsin_library.keys())
+            gained = np.flatnonzero(daughter.rng.random(self.n_neurons) < mutation_rate)
+            choices = daughter.rng.integers(len(names), size=len(gained))
+            for k, name in enumerate(names):
+                neurons = gained[choices == k]
+                if len(neurons):
+                    mask = daughter.opsins.get(name)
+                    mask = mask.copy() if mask is not None else np.zeros(self.n_neurons, dtype=bool)
+                    mask[neurons] = True
+                    daughter.opsins[name] = mask
+                    daughter.mutations[name] = neurons
+
+        # Synapses: remember only the mutation seed, rebuild on demand
+        seed = int(daughter.rng.integers(2**63))
+        if self._weights is None:
+            daughter._lineage = self._lineage + (seed,)
+        else:
+            daughter._base_weights = self._weights
+            daughter._lineage = (seed,)
+            self._shared.add('_weights')
+            self._weights.data.flags.writeable = False
+        daughter._weights = None
+        daughter.handover_count = None
+        return daughter
+
+    def _sensitive_masks(self, frequency: float) -> List[np.ndarray]:
+        return [mask for opsin, mask in self.opsins.items()
+                if _sensitive(self.opsin_library.get(opsin), frequency)]
+
+    def sensitive_mask(self, frequency: float) -> np.ndarray:
+        """Neurons expressing at least one opsin sensitive to frequency"""
+        sensitive = np.zeros(self.n_neurons, dtype=bool)
+        for mask in self._sensitive_masks(frequency):
+            sensitive |= mask
+        return sensitive
+
+    @staticmethod
+    def evaluate_population(population: List['SparseWetwareNetwork'], frequency: float) -> np.ndarray:
+        """
+        Light response (number of sensitive neurons) of every network.
+
+        Replicas share every opsin mask they did not mutate with their
+        ancestors, so networks whose sensitive masks are the same arrays
+        (elites, daughters without opsin mutations) are counted once.
+        """
+        counted: Dict[Tuple[int, ...], int] = {}
+        responses = np.empty(len(population), dtype=np.int64)
+        for i, net in enumerate(population):
+            masks = net._sensitive_masks(frequency)
+            key = tuple(sorted(id(mask) for mask in masks))
+            if key not in counted:
+                counted[key] = int(net.sensitive_mask(frequency).sum())
+            responses[i] = counted[key]
+        return responses
+
+    def evolve(self, target_frequency: float, generations: int = 10, population_size: int = 100,
+               tournament_size: int = 3):
+        """
+        Population-based evolution for response to target_frequency.
+
+        Each generation evaluates the whole population, keeps
+        the best network (elitism) and fills the rest with daughters of
+        tournament winners. Returns (best response per generation, best network).
+        """
+        population = [self] + [self.replicate() for _ in range(population_size - 1)]
+        history = []
+        best = self
+        for gen in range(generations):
+            fitness = self.evaluate_population(population, target_frequency)
+            best = population[int(np.argmax(fitness))]
+            history.append(int(fitness.max()))
+            print(f"Gen {gen}: best response {fitness.max()} (mean {fitness.mean():.1f})")
+            if gen == generations - 1:
+                break
+            contenders = self.rng.integers(len(population), size=(population_size - 1, tournament_size))
+            winners = contenders[np.arange(len(contenders)), np.argmax(fitness[contenders], axis=1)]
+            population = [best] + [population[w].replicate() for w in winners]
+        return history, best
+
+    def load_opsin_library(self, library: Dict[str, Dict]):
+        """Load spectral sensitivity data for opsins"""
+        self.opsin_library = library
+
+    def stimulate_light(self, frequency: float, intensity: float = 1.0) -> np.ndarray:
+        """Depolarize every neuron expressing at least one opsin sensitive to frequency"""
+        sensitive = self.sensitive_mask(frequency)
+        self._own('membrane_potential')
+        self.membrane_potential[sensitive] += intensity * 5.0
+        return np.flatnonzero(sensitive)
+
+    def _row_slots(self, rows: np.ndarray) -> np.ndarray:
+        """Positions in weights.data of all synapses leaving the given neurons."""
+        indptr = self._weights.indptr
+        starts, stops = indptr[rows], indptr[rows + 1]
+        lengths = stops - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return offsets + np.arange(lengths.sum())
+
+    def step(self, dt: float = 0.001) -> np.ndarray:
+        """Leaky integrate-and-fire step with event-driven spike propagation"""
+        self._own('membrane_potential', 'firing_rate', '_weights')
+        v = self.membrane_potential
+        fired = v > self.THRESHOLD
+        spikes = np.flatnonzero(fired)
+        v -= self.LEAK
+        v[spikes] = self.RESET
+        self.firing_rate *= self.RATE_DECAY
+        self.firing_rate[spikes] = self.SPIKE_RATE
+
+        if len(spikes):
+            W = self.weights
+            slots = self._row_slots(spikes)
+            w = W.data
+            targets = W.indices[slots]
+            v += self.EPSP_GAIN * np.bincount(targets, weights=w[slots], minlength=self.n_neurons)
+            self.handover_count[slots] += 1
+            w[slots] = np.minimum(w[slots] + self.HEBBIAN_RATE, 1.0)
+
+        self.syzygy = float(np.mean(self.firing_rate > 10)) if self.n_neurons > 0 else 0
+        return spikes
+
+    def run(self, steps: int, dt: float = 0.001, record: bool = True) -> int:
+        """Run several steps and return the total number of spikes"""
+        total = 0
+        for _ in range(steps):
+            total += len(self.step(dt))
+            if record:
+                self.syzygy_history.append(self.syzygy)
+        return total
+
+    def compute_memory(self) -> float:
+        """Mean synaptic weight"""
+        return float(self.weights.data.mean()) if self.weights.nnz else 0
+
 # Example usage
 def example_wetware():
     """Create and simulate a wetware network"""
@@ -273,5 +604,24 @@ def example_wetware():
 
     return net
 
+def example_sparse_wetware(n_neurons: int = 100000, seconds: float = 1.0):
+    """Run a large network on the sparse backend at 1 ms resolution"""
+    import time
+    start = time.perf_counter()
+    net = SparseWetwareNetwork(n_neurons=n_neurons, connection_prob=10.0 / n_neurons, seed=0)
+    print(f"Built {n_neurons} neurons / {net.weights.nnz} synapses in {time.perf_counter() - start:.2f}s")
+
+    steps = int(seconds / 0.001)
+    start = time.perf_counter()
+    spikes = net.run(steps)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {seconds}s ({steps} steps): {spikes} spikes, "
+          f"{steps / elapsed:.0f} steps/s, syzygy={net.syzygy:.3f}")
+    return net
+
 if __name__ == "__main__":
-    example_wetware()
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "sparse":
+        example_sparse_wetware(*(float(a) if i else int(a) for i, a in enumerate(sys.argv[2:4])))
+    else:
+        example_wetware()
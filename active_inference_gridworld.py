@@ -1,5 +1,6 @@
 # active_inference_gridworld.py
 import numpy as np
+from scipy import sparse
 from scipy.special import softmax
 from anl import *
 
@@ -31,12 +32,28 @@ class GridWorld:
         self.agent_pos = (0,0)
         return self.world_map[0,0]
 
+def build_transitions(env):
+    """
+    B esparso: uma matriz CSR (n_states x n_states) por ação.
+    Cada coluna tem um único 1, então um grid 100x100 ocupa O(n_states)
+    em vez do tensor denso n_states x n_states x 4.
+    """
+    size = env.size
+    n_states = size * size
+    r, c = np.divmod(np.arange(n_states), size)
+    B = []
+    for action in env.actions:
+        dr, dc = env.action_effects[action]
+        ns = np.clip(r + dr, 0, size-1) * size + np.clip(c + dc, 0, size-1)
+        B.append(sparse.csr_matrix((np.ones(n_states), (ns, np.arange(n_states))),
+                                   shape=(n_states, n_states)))
+    return B
+
 # ======================================================
 # SIMULAÇÃO: CURIOSIDADE PURA
 # ======================================================
 
-def run_pure_curiosity():
-    size = 5
+def run_pure_curiosity(size=5, horizon=1):
     n_states = size * size
     n_obs = n_states # Cada estado tem sua própria observação única
 
@@ -47,14 +64,8 @@ def run_pure_curiosity():
     agent = ActiveInferenceNode("Cientista", space, n_states, n_obs)
 
     # B: p(s'|s,a) - Transições Conhecidas (Física do movimento)
-    B = np.zeros((n_states, n_states, 4))
-    for s in range(n_states):
-        r, c = divmod(s, size)
-        for a_idx, action in enumerate(env.actions):
-            dr, dc = env.action_effects[action]
-            nr, nc = max(0, min(size-1, r + dr)), max(0, min(size-1, c + dc))
-            ns = nr * size + nc
-            B[ns, s, a_idx] = 1.0
+    B = build_transitions(env)
+    planner = PolicySearch(agent, B, horizon=horizon) if horizon > 1 else None
 
     print("🚀 Iniciando Simulação de Curiosidade Pura...")
     print("O agente não busca recompensa, apenas reduzir a incerteza do mapa.")
@@ -71,7 +82,8 @@ def run_pure_curiosity():
         visited.add(env.agent_pos)
 
         # 2. Planejamento: G focado em Epistêmico (Matriz C é zero)
-        G = agent.compute_G(B)
+        # Com horizon > 1, G de cada ação é o da melhor política que começa por ela
+        G = planner.plan()[0] if planner else agent.compute_G(B)
 
         # 3. Ação: Amostragem Softmax (Minimizando G)
         # Note: G calculado como (Pragmático - Epistêmico). Como Pragmático=0, G = -Epistêmico.
@@ -95,4 +107,6 @@ def run_pure_curiosity():
     print("Simulação concluída.")
 
 if __name__ == "__main__":
-    run_pure_curiosity()
+    import sys
+    run_pure_curiosity(int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+                       int(sys.argv[2]) if len(sys.argv) > 2 else 1)
@@ -7,11 +7,15 @@ Implementação unificada dos conceitos fundamentais da ANL.
 """
 
 import numpy as np
+from scipy import sparse
 from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 from enum import Enum
+import hashlib
 import time
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+
+from memory_index import IVFIndex, VectorIndex
 
 # ============================================================================
 # 1. PRIMITIVAS FUNDAMENTAIS
@@ -129,21 +133,125 @@ class Hypergraph:
             return float(np.mean(np.abs(off_diag)))
         except: return 0.0
 
+class IncrementalIntegration:
+    """
+    Phi incremental, equivalente a Hypergraph.compute_integration().
+
+    Mantém os estados centrados e normalizados (Z) e a matriz de
+    correlação entre nós; a cada update só as linhas dos nós cujo estado
+    mudou são recalculadas (O(n·d) por nó em vez de O(n²·d)).
+    """
+    def __init__(self, hypergraph: Hypergraph, rebuild_every: int = 1024):
+        self.hg = hypergraph
+        self.rebuild_every = rebuild_every
+        self.ids: List[str] = []
+        self.raw: Optional[np.ndarray] = None
+        self._updates = 0
+
+    @staticmethod
+    def _vector(state) -> Optional[np.ndarray]:
+        if isinstance(state, (int, float, np.number)):
+            return np.array([state], dtype=float)
+        if hasattr(state, 'flatten'):
+            return np.asarray(state, dtype=float).flatten()
+        return None
+
+    @staticmethod
+    def _normalize(X: np.ndarray):
+        Z = X - X.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(Z, axis=1)
+        # Variância nula (ou estado não finito) daria NaN em np.corrcoef
+        degenerate = ~np.isfinite(norms) | (norms <= 1e-12 * (np.abs(X).max(axis=1) + 1e-300))
+        Z = np.divide(Z, norms[:, None], out=np.zeros_like(Z), where=~degenerate[:, None])
+        return Z, degenerate
+
+    def _rebuild(self, ids: List[str], X: np.ndarray):
+        self.ids = ids
+        self.raw = X.copy()
+        self.Z, self.degenerate = self._normalize(X)
+        self.C = self.Z @ self.Z.T
+        np.fill_diagonal(self.C, 0.0)
+        self.row_sums = np.abs(self.C).sum(axis=1)
+        self._updates = 0
+
+    def update(self) -> float:
+        ids, vectors = [], []
+        for node_id, node in self.hg.nodes.items():
+            v = self._vector(node.state)
+            if v is not None:
+                ids.append(node_id)
+                vectors.append(v)
+        if len(vectors) < 2 or len({len(v) for v in vectors}) != 1:
+            self.ids, self.raw = [], None
+            return 0.0
+        X = np.stack(vectors)
+        if ids != self.ids or self.raw is None or X.shape != self.raw.shape \
+                or self._updates >= self.rebuild_every:
+            self._rebuild(ids, X)
+        else:
+            changed = np.flatnonzero(np.any(X != self.raw, axis=1))
+            if len(changed):
+                self.raw[changed] = X[changed]
+                self.Z[changed], self.degenerate[changed] = self._normalize(X[changed])
+                old = self.C[changed].copy()
+                new = self.Z[changed] @ self.Z.T
+                new[np.arange(len(changed)), changed] = 0.0
+                self.C[changed] = new
+                self.C[:, changed] = new.T
+                self.row_sums += (np.abs(new) - np.abs(old)).sum(axis=0)
+                self.row_sums[changed] = np.abs(self.C[changed]).sum(axis=1)
+                self._updates += 1
+        if self.degenerate.any():
+            return 0.0
+        n = len(self.ids)
+        return float(self.row_sums.sum() / (n * (n - 1)))
+
 # ============================================================================
 # 2. MODELOS AVANÇADOS (AGI / INFERÊNCIA ATIVA)
 # ============================================================================
 
+def stack_transitions(B) -> Union[np.ndarray, sparse.csr_matrix]:
+    """
+    Empilha o modelo de transição em um operador (n_actions*n_states, n_states).
+
+    Aceita o tensor denso (n_states, n_states, n_actions), uma lista com
+    uma matriz por ação (densa ou esparsa, ex: CSR) ou um operador já
+    empilhado. Com ele, B_a @ q para todas as ações é um único produto.
+    """
+    if isinstance(B, (list, tuple)):
+        if any(sparse.issparse(b) for b in B):
+            return sparse.vstack([sparse.csr_matrix(b) for b in B], format='csr')
+        return np.concatenate([np.asarray(b) for b in B], axis=0)
+    if sparse.issparse(B):
+        return B.tocsr()
+    B = np.asarray(B)
+    if B.ndim == 3:
+        return B.transpose(2, 0, 1).reshape(B.shape[2] * B.shape[0], B.shape[1])
+    return B
+
 class ActiveInferenceNode(Node):
     """
     Nó que implementa o Princípio da Energia Livre e Aprendizagem de Dirichlet.
+
+    Com n_agents, o estado é uma matriz (n_agents, n_states) de crenças que
+    compartilham o mesmo modelo gerativo; inferência, aprendizado e G são
+    calculados para todos os agentes de uma vez.
+
+    H(A) e C·A são mantidos em cache e atualizados incrementalmente por
+    learn(). Como já acontece com C, a_dirichlet é comparado com uma cópia
+    a cada uso: substituir o array ou editá-lo in-place refaz os caches.
     """
-    def __init__(self, node_id: str, state_space: StateSpace, n_states: int, n_obs: int):
+    def __init__(self, node_id: str, state_space: StateSpace, n_states: int, n_obs: int,
+                 n_agents: Optional[int] = None):
         # O 'state' aqui representa a crença interna q(s)
         initial_belief = np.ones(n_states) / n_states
+        if n_agents is not None:
+            initial_belief = np.tile(initial_belief, (n_agents, 1))
         super().__init__(node_id, state_space, initial_belief)
 
         self.n_states = n_states
         self.n_obs = n_obs
+        self.n_agents = n_agents
 
         # Dirichlet counters para a Matriz A (Likelihood)
         self.a_dirichlet = np.ones((n_obs, n_states)) * 0.1
@@ -151,55 +259,225 @@ class ActiveInferenceNode(Node):
         # Preferências (Matriz C) - default neutro (Curiosidade Pura)
         self.C = np.zeros(n_obs)
 
+        self._cached_a = None
+
+    # --- caches do modelo gerativo ---
+
+    @staticmethod
+    def _xlogx(a: np.ndarray) -> np.ndarray:
+        return a * np.log(a + 1e-300)
+
+    def refresh(self):
+        """Recalcula os caches a partir de a_dirichlet."""
+        a = self.a_dirichlet
+        self._cached_a = a
+        self._a_seen = np.array(a, dtype=float)  # cópia para detectar edições in-place
+        self._col_sums = a.sum(axis=0)
+        self._xlogx_sums = self._xlogx(a).sum(axis=0)
+        self._cached_C = np.array(self.C, dtype=float)
+        self._C_a = self._cached_C @ a
+        self._A = None
+
+    def _ensure_cache(self):
+        if self._cached_a is not self.a_dirichlet or not np.array_equal(self._a_seen, self.a_dirichlet):
+            self.refresh()
+        elif not np.array_equal(self._cached_C, self.C):
+            self._cached_C = np.array(self.C, dtype=float)
+            self._C_a = self._cached_C @ self.a_dirichlet
+
+    def entropy_A(self) -> np.ndarray:
+        """H(A) por estado: log s_j - (1/s_j) Σ_i a_ij log a_ij."""
+        self._ensure_cache()
+        s = self._col_sums
+        return np.log(s) - self._xlogx_sums / s
+
+    def preference_A(self) -> np.ndarray:
+        """C·A por estado: Σ_o C_o A_oj = (C·a)_j / s_j (valor pragmático de cada estado)."""
+        self._ensure_cache()
+        return self._C_a / self._col_sums
+
     def get_A(self) -> np.ndarray:
         """Calcula a Likelihood normalizando Dirichlet."""
-        return self.a_dirichlet / self.a_dirichlet.sum(axis=0, keepdims=True)
-
-    def update_belief(self, observation_idx: int):
-        """Inferência Bayesiana: atualiza q(s)."""
-        A = self.get_A()
-        likelihood = A[observation_idx, :]
+        self._ensure_cache()
+        if self._A is None:
+            self._A = self.a_dirichlet / self._col_sums
+        return self._A
+
+    def expected_states(self, B) -> np.ndarray:
+        """B_a @ q para todas as ações: (n_actions, n_states) ou (n_actions, n_states, n_agents)."""
+        # Empilhado a cada chamada: custa o mesmo que conferir se B mudou in-place
+        op = stack_transitions(B)
+        q = np.asarray(self.state, dtype=float)
+        expected = op @ (q.T if q.ndim == 2 else q)
+        n_actions = op.shape[0] // self.n_states
+        return np.asarray(expected).reshape((n_actions, self.n_states) + expected.shape[1:])
+
+    def update_belief(self, observation_idx):
+        """Inferência Bayesiana: atualiza q(s) (um índice por agente no modo multiagente)."""
+        self._ensure_cache()
+        likelihood = self.a_dirichlet[observation_idx, :] / self._col_sums
         posterior = likelihood * self.state
-        self.state = posterior / (posterior.sum() + 1e-16)
+        self.state = posterior / (posterior.sum(axis=-1, keepdims=True) + 1e-16)
         return self.state
 
-    def learn(self, observation_idx: int, learning_rate: float = 1.0):
+    def learn(self, observation_idx, learning_rate: float = 1.0):
         """Aprendizagem Online via Dirichlet."""
-        self.a_dirichlet[observation_idx, :] += learning_rate * self.state
+        self._ensure_cache()
+        a = self.a_dirichlet
+        rows = np.unique(observation_idx)
+        old = a[rows, :].copy()
+        if np.ndim(self.state) == 2:
+            np.add.at(a, np.asarray(observation_idx), learning_rate * self.state)
+        else:
+            a[observation_idx, :] += learning_rate * self.state
+        new = a[rows, :]
+        self._a_seen[rows, :] = new
+        self._col_sums += (new - old).sum(axis=0)
+        self._xlogx_sums += (self._xlogx(new) - self._xlogx(old)).sum(axis=0)
+        self._C_a += self._cached_C[rows] @ (new - old)
+        self._A = None
         return self.get_A()
 
-    def compute_epistemic_G(self, B: np.ndarray) -> np.ndarray:
+    def compute_epistemic_G(self, B) -> np.ndarray:
         """
         Calcula G focando apenas na redução da incerteza (Curiosidade Epistêmica).
         Retorna o valor epistêmico (quanto maior, mais informativo).
         """
-        n_actions = B.shape[2]
-        A = self.get_A()
-        G = np.zeros(n_actions)
-
         # Entropia da Likelihood (Incerteza sobre o mapeamento estado -> observação)
-        H_A = -np.sum(A * np.log(A + 1e-16), axis=0)
-
-        for a in range(n_actions):
-            expected_state = B[:, :, a] @ self.state
-            # G = Epistemic Value (Incerteza esperada do estado futuro)
-            G[a] = np.dot(H_A, expected_state)
+        H_A = self.entropy_A()
+        # G = Epistemic Value (Incerteza esperada do estado futuro)
+        G = np.tensordot(H_A, self.expected_states(B), axes=([0], [1]))
+        return G.T if G.ndim == 2 else G
 
-        return G
-
-    def compute_G(self, B: np.ndarray) -> np.ndarray:
+    def compute_G(self, B) -> np.ndarray:
         """Calcula G completo (Pragmático - Epistêmico) para minimização."""
-        n_actions = B.shape[2]
-        A = self.get_A()
-        G = np.zeros(n_actions)
-        H_A = -np.sum(A * np.log(A + 1e-16), axis=0)
-        for a in range(n_actions):
-            expected_state = B[:, :, a] @ self.state
-            expected_obs = A @ expected_state
-            pragmatic = -np.sum(expected_obs * self.C)
-            epistemic = np.dot(H_A, expected_state)
-            G[a] = pragmatic - epistemic
-        return G
+        H_A = self.entropy_A()
+        expected = self.expected_states(B)
+        # pragmático = -Σ_o C_o (A s)_o = -(C·A) s, com C·A = (C·a) / s_j
+        CA = self.preference_A()
+        G = -np.tensordot(CA + H_A, expected, axes=([0], [1]))
+        return G.T if G.ndim == 2 else G
+
+class PolicySearch:
+    """
+    Planejamento em múltiplos passos por busca em feixe sobre políticas.
+
+    Cada nível expande todas as ações das políticas no feixe com um único
+    produto (esparso) pelo operador B empilhado e mantém as beam_width de
+    menor G acumulado. As previsões q' = B_a q ficam em uma tabela de
+    transposição (LRU) indexada pelo conteúdo de q, reutilizada entre
+    chamadas: caminhos que levam à mesma crença (ex: cima+baixo e
+    baixo+cima) são expandidos uma só vez e fundidos no feixe. Como a
+    tabela guarda só transições (que dependem de B), o G de cada passo é
+    recalculado com o modelo atual do agente a cada plan().
+
+    As crenças filhas são guardadas em CSR quando ocupam poucos estados
+    (crenças concentradas em grids e cadeias) e densas caso contrário; a
+    tabela é limitada por max_bytes, não por número de entradas.
+    """
+    def __init__(self, agent: ActiveInferenceNode, B, horizon: int = 3, beam_width: int = 64,
+                 discount: float = 1.0, max_bytes: int = 64 * 2 ** 20):
+        self.agent = agent
+        self.op = stack_transitions(B)
+        self.n_actions = self.op.shape[0] // agent.n_states
+        self.horizon = horizon
+        self.beam_width = beam_width
+        self.discount = discount
+        self.max_bytes = max_bytes
+        # chave de q -> (chaves dos filhos, B_a q para cada ação em CSR, bytes)
+        self.table: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self.table_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(q: np.ndarray) -> bytes:
+        return hashlib.blake2b(np.round(q, 12).tobytes(), digest_size=16).digest()
+
+    @staticmethod
+    def _compact(child_q: np.ndarray):
+        """(bloco, bytes): CSR se ocupar menos memória que o bloco denso."""
+        nnz = np.count_nonzero(child_q)
+        if nnz * 12 + 4 * (child_q.shape[0] + 1) < child_q.nbytes:
+            stored = sparse.csr_matrix(child_q)
+            return stored, stored.data.nbytes + stored.indices.nbytes + stored.indptr.nbytes
+        return child_q, child_q.nbytes
+
+    @staticmethod
+    def _dense(q) -> np.ndarray:
+        return q.toarray().ravel() if sparse.issparse(q) else q
+
+    def _expand(self, keys: List[bytes], beliefs: Dict[bytes, Any]) -> Dict[bytes, tuple]:
+        """(chaves, crenças (n_actions, n_states) densas ou CSR, bytes) dos filhos de cada nó, calculando em lote os que faltam."""
+        found, missing = {}, []
+        for k in dict.fromkeys(keys):
+            if k in self.table:
+                self.table.move_to_end(k)
+                found[k] = self.table[k]
+            else:
+                missing.append(k)
+        self.hits += len(found)
+        self.misses += len(missing)
+        if missing:
+            Q = np.stack([self._dense(beliefs[k]) for k in missing], axis=1)
+            children = np.asarray(self.op @ Q).reshape(self.n_actions, self.agent.n_states, len(missing))
+            for j, k in enumerate(missing):
+                child_q = np.ascontiguousarray(children[:, :, j])
+                stored, size = self._compact(child_q)
+                found[k] = ([self._key(q) for q in child_q], stored, size + 16 * self.n_actions)
+                self.table[k] = found[k]
+                self.table_bytes += found[k][2]
+            while self.table_bytes > self.max_bytes and self.table:
+                self.table_bytes -= self.table.popitem(last=False)[1][2]
+        return found
+
+    def plan(self, belief: Optional[np.ndarray] = None):
+        """
+        Retorna (G por primeira ação, melhor política). G de uma ação é o
+        menor G acumulado entre as políticas do feixe final que começam
+        por ela (inf se todas foram podadas); com horizon=1 coincide com
+        agent.compute_G(B).
+        """
+        q0 = np.asarray(self.agent.state if belief is None else belief, dtype=float)
+        if q0.ndim != 1:
+            raise ValueError("PolicySearch planeja para um agente por vez (crença 1D)")
+        weights = -(self.agent.preference_A() + self.agent.entropy_A())
+
+        keys = [self._key(q0)]
+        beliefs = {keys[0]: q0}
+        cum = np.zeros(1)
+        roots = np.zeros(1, dtype=int)
+        policies: List[Tuple[int, ...]] = [()]
+        for depth in range(self.horizon):
+            expanded = self._expand(keys, beliefs)
+            flat = [c for k in keys for c in expanded[k][0]]
+            blocks = [expanded[k][1] for k in keys]
+            if any(sparse.issparse(b) for b in blocks):
+                Q = sparse.vstack(blocks, format='csr')
+            else:
+                Q = np.concatenate(blocks)
+            step = (Q @ weights).reshape(len(keys), self.n_actions)
+            totals = (cum[:, None] + self.discount ** depth * step).ravel()
+            actions = np.tile(np.arange(self.n_actions), len(keys))
+            parents = np.repeat(np.arange(len(keys)), self.n_actions)
+            child_roots = actions if depth == 0 else roots[parents]
+            # Transposições: mesma crença com a mesma primeira ação -> fica a melhor
+            best = {}
+            for i in np.argsort(totals, kind='stable'):
+                best.setdefault((child_roots[i], flat[i]), i)
+            survivors = np.fromiter(best.values(), dtype=int)
+            if len(survivors) > self.beam_width:
+                part = np.argpartition(totals[survivors], self.beam_width - 1)[:self.beam_width]
+                survivors = survivors[part]
+            keys = [flat[i] for i in survivors]
+            beliefs = {flat[i]: Q[int(i)] for i in survivors}
+            cum = totals[survivors]
+            roots = child_roots[survivors]
+            policies = [policies[parents[i]] + (int(actions[i]),) for i in survivors]
+
+        G = np.full(self.n_actions, np.inf)
+        np.minimum.at(G, roots, cum)
+        return G, policies[int(np.argmin(cum))]
 
 # ============================================================================
 # 3. UTILITÁRIOS
@@ -215,20 +493,29 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
 
 # Shared Memory e outros mantidos para compatibilidade...
 class SharedMemory(Node):
-    def __init__(self, node_id: str, storage_type: str = "vector", dim: int = 384):
+    def __init__(self, node_id: str, storage_type: str = "vector", dim: int = 384,
+                 index: str = "flat", quantize: bool = False, nprobe: int = 8):
         super().__init__(node_id, StateSpace(0, "abstract", "real"), {})
         self.data = {}
-        self.vectors = {}
+        # "flat" é exato; "ivf" é aproximado, com recall ajustado por nprobe
+        if index == "ivf":
+            self.index = IVFIndex(dim, nprobe=nprobe, quantize=quantize)
+        else:
+            self.index = VectorIndex(dim, quantize=quantize)
+        self.rows: Dict[Any, int] = {}
+        self.keys: List[Any] = []
     def write(self, key, value, embedding=None):
         self.data[key] = value
-        if embedding is not None: self.vectors[key] = embedding
+        if embedding is not None:
+            if key in self.rows:
+                self.index.update(self.rows[key], embedding)
+            else:
+                self.rows[key] = self.index.add(embedding)
+                self.keys.append(key)
     def query_vector(self, query_emb, top_k=5):
-        if not self.vectors: return []
-        keys = list(self.vectors.keys())
-        embs = np.array([self.vectors[k] for k in keys])
-        sim = np.dot(embs, query_emb) / (np.linalg.norm(embs, axis=1) * np.linalg.norm(query_emb) + 1e-8)
-        top_idx = np.argsort(sim)[-top_k:][::-1]
-        return [(keys[i], self.data[keys[i]]) for i in top_idx if i < len(keys)]
+        if not self.keys: return []
+        top_idx, _ = self.index.search(query_emb, top_k)
+        return [(self.keys[i], self.data[self.keys[i]]) for i in top_idx]
 
 if __name__ == "__main__":
     print("Módulo ANL carregado.")
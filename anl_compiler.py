@@ -3,10 +3,14 @@ import json
 import os
 import sys
 import re
+import time
 import ast
+import hashlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from graphlib import CycleError, TopologicalSorter
+from typing import Optional
 import numpy as np
 from arkhe_language_spec import Hypergraph, Node, Handover, StateSpace, Protocol, Constraint
-from arkhe_language_spec import Hypergraph, Node, Handover, StateSpace, Protocol
 
 def hg_to_air(hg: Hypergraph) -> dict:
     """
@@ -41,6 +45,7 @@ def hg_to_air(hg: Hypergraph) -> dict:
                     "map": str(h.map_state),
                     "condition": getattr(h, 'condition', None),
                     "effects": getattr(h, 'effects', None),
+                    "params": getattr(h, 'params', []),
                     "latency": h.latency,
                     "bandwidth": h.bandwidth,
                     "fidelity": h.fidelity,
@@ -95,6 +100,151 @@ def split_by_top_level_semicolon(text):
         parts.append(last)
     return parts
 
+def _merge_namespace(hg: Hypergraph, ns_name: str, inner_hg: Hypergraph):
+    hg.namespaces[ns_name] = []
+    for node_id, node in inner_hg.nodes.items():
+        full_id = f"{ns_name}.{node_id}"
+        node.id = full_id
+        hg.add_node(node)
+        hg.namespaces[ns_name].append(full_id)
+    for h_id, h in inner_hg.handovers.items():
+        h.id = f"{ns_name}.{h_id}"
+        hg.add_handover(h)
+    for e_name, e_vals in inner_hg.enums.items():
+        hg.enums[f"{ns_name}.{e_name}"] = e_vals
+    for d_name, d_body in inner_hg.dynamics.items():
+        hg.dynamics[f"{ns_name}.{d_name}"] = d_body
+    for c_id, c in inner_hg.constraints.items():
+        c.id = f"{ns_name}.{c_id}"
+        hg.add_constraint(c)
+
+def _enum_values(enum_body: str) -> dict:
+    enum_values = {}
+    for line in split_by_top_level_semicolon(enum_body):
+        if not line: continue
+        m = re.match(r'(\w+)\s*(\{.*\})?', line, re.DOTALL)
+        if m:
+            val_name = m.group(1)
+            val_content = m.group(2).strip() if m.group(2) else None
+            enum_values[val_name] = val_content
+    return enum_values
+
+def _node_from_body(node_id: str, parent_id: Optional[str], body: str) -> Node:
+    attr_dict = {}
+    attr_match = re.search(r'attributes\s*\{', body)
+    if attr_match:
+        attr_body, _ = extract_nested_block(body, attr_match.end())
+        if attr_body:
+            for line in split_by_top_level_semicolon(attr_body):
+                if not line: continue
+                if '=' in line:
+                    decl, val = line.split('=', 1)
+                    decl_clean = re.sub(r'\[.*?\]', '', decl)
+                    decl_parts = decl_clean.strip().split()
+                    if len(decl_parts) >= 2:
+                        attr_name = decl_parts[1]
+                        attr_val = val.strip()
+                        try:
+                            attr_dict[attr_name] = ast.literal_eval(attr_val)
+                        except:
+                            attr_dict[attr_name] = attr_val
+                else:
+                    decl_clean = re.sub(r'\[.*?\]', '', line)
+                    decl_parts = decl_clean.strip().split()
+                    if len(decl_parts) >= 2:
+                        attr_name = decl_parts[1]
+                        attr_dict[attr_name] = None
+    dynamics_str = None
+    dynamics_match = re.search(r'dynamics\s*\{', body)
+    if dynamics_match:
+        dynamics_body, _ = extract_nested_block(body, dynamics_match.end())
+        dynamics_str = dynamics_body.strip() if dynamics_body else None
+
+    # Capture functions
+    functions = {}
+    func_pattern = re.compile(r'function\s+(\w+)\s*\(([^)]*)\)(?:\s*->\s*([\w<>]+))?\s*\{')
+    func_pos = 0
+    while True:
+        f_match = func_pattern.search(body, func_pos)
+        if not f_match: break
+        f_name = f_match.group(1)
+        f_body, f_next_pos = extract_nested_block(body, f_match.end())
+        if f_body:
+            functions[f_name] = f_body.strip()
+        func_pos = f_next_pos
+
+    return Node(node_id, StateSpace.euclidean(0), attributes=attr_dict, internal_dynamics=dynamics_str, parent_id=parent_id, functions=functions)
+
+def _constraint_from_body(c_id: str, body: str) -> Constraint:
+    mode = "runtime"
+    mode_match = re.search(r'mode\s*:\s*(\w+);', body)
+    if mode_match:
+        mode = mode_match.group(1)
+
+    measurement = None
+    meas_match = re.search(r'measurement\s*\{', body)
+    if meas_match:
+        meas_body, _ = extract_nested_block(body, meas_match.end())
+        measurement = meas_body.strip() if meas_body else None
+
+    check = None
+    check_match = re.search(r'check\s*:\s*([^;]+);', body)
+    if not check_match:
+        check_match_block = re.search(r'check\s*\{', body)
+        if check_match_block:
+            check_body, _ = extract_nested_block(body, check_match_block.end())
+            check = check_body.strip()
+    else:
+        check = check_match.group(1).strip()
+
+    on_violation = None
+    viol_match = re.search(r'on_violation\s*:\s*(\w+)', body)
+    if not viol_match:
+        viol_match_block = re.search(r'on_violation\s*:\s*(\w+)\s*\{', body)
+        if viol_match_block:
+            on_violation = viol_match_block.group(1)
+    else:
+        on_violation = viol_match.group(1)
+
+    return Constraint(c_id, check, mode=mode, measurement=measurement, on_violation=on_violation)
+
+def _add_handover(hg: Hypergraph, h_id: str, params: str, body: str):
+    # Extrai os tipos como IDs de nós (ex: "Coelho c, Grama g" -> ["Coelho", "Grama"])
+    param_types = [p.strip().split()[0] for p in params.split(',')]
+
+    if len(param_types) >= 2:
+        src_name, dst_name = param_types[0], param_types[1]
+        src = hg.nodes.get(src_name)
+        if not src: src = Node(src_name, StateSpace.euclidean(0))
+        dst = hg.nodes.get(dst_name)
+        if not dst: dst = Node(dst_name, StateSpace.euclidean(0))
+
+        condition = None
+        cond_match = re.search(r'condition\s*:\s*([^;]+);', body)
+        if cond_match:
+            condition = cond_match.group(1).strip()
+
+        effects = None
+        effects_match = re.search(r'effects\s*\{', body)
+        if effects_match:
+            effects_body, _ = extract_nested_block(body, effects_match.end())
+            effects = effects_body.strip() if effects_body else None
+
+        protocol = Protocol.CREATIVE
+        proto_match = re.search(r'protocol\s*:\s*(\w+);', body)
+        if proto_match:
+            try:
+                protocol = Protocol[proto_match.group(1).upper()]
+            except:
+                pass
+
+        # Nomes dos parâmetros ("c", "g") para ligar c.energia etc. na execução
+        signature = [p.split() for p in params.split(',') if p.strip()]
+        bound = [{"type": p[0], "name": p[1] if len(p) > 1 else None} for p in signature]
+
+        h = Handover(h_id, src, dst, protocol, condition=condition, effects=effects, params=bound)
+        hg.add_handover(h)
+
 def compile_anl_v02(code: str) -> Hypergraph:
     """
     Parser experimental para a sintaxe ANL 0.2.
@@ -118,23 +268,7 @@ def compile_anl_v02(code: str) -> Hypergraph:
         ns_body, next_pos = extract_nested_block(code, match.end())
 
         if ns_body:
-            hg.namespaces[ns_name] = []
-            inner_hg = compile_anl_v02(ns_body)
-            for node_id, node in inner_hg.nodes.items():
-                full_id = f"{ns_name}.{node_id}"
-                node.id = full_id
-                hg.add_node(node)
-                hg.namespaces[ns_name].append(full_id)
-            for h_id, h in inner_hg.handovers.items():
-                h.id = f"{ns_name}.{h_id}"
-                hg.add_handover(h)
-            for e_name, e_vals in inner_hg.enums.items():
-                hg.enums[f"{ns_name}.{e_name}"] = e_vals
-            for d_name, d_body in inner_hg.dynamics.items():
-                hg.dynamics[f"{ns_name}.{d_name}"] = d_body
-            for c_id, c in inner_hg.constraints.items():
-                c.id = f"{ns_name}.{c_id}"
-                hg.add_constraint(c)
+            _merge_namespace(hg, ns_name, compile_anl_v02(ns_body))
 
         code = code[:match.start()] + code[next_pos:]
 
@@ -148,15 +282,7 @@ def compile_anl_v02(code: str) -> Hypergraph:
         enum_body, next_pos = extract_nested_block(code, match.end())
 
         if enum_body:
-            enum_values = {}
-            for line in split_by_top_level_semicolon(enum_body):
-                if not line: continue
-                m = re.match(r'(\w+)\s*(\{.*\})?', line, re.DOTALL)
-                if m:
-                    val_name = m.group(1)
-                    val_content = m.group(2).strip() if m.group(2) else None
-                    enum_values[val_name] = val_content
-            hg.enums[enum_name] = enum_values
+            hg.enums[enum_name] = _enum_values(enum_body)
 
         code = code[:match.start()] + code[next_pos:]
 
@@ -183,78 +309,9 @@ def compile_anl_v02(code: str) -> Hypergraph:
         node_id = match.group(1)
         parent_id = match.group(2)
         body, next_pos = extract_nested_block(code, match.end())
-    # Nós
-    node_pattern = re.compile(r'node\s+(\w+)\s*\{')
-    pos = 0
-    while True:
-        match = node_pattern.search(code, pos)
-        if not match: break
-
-        node_id = match.group(1)
-        body, next_pos = extract_nested_block(code, match.end())
-        pos = next_pos
 
         if body:
-            attr_dict = {}
-            attr_match = re.search(r'attributes\s*\{', body)
-            if attr_match:
-                attr_body, _ = extract_nested_block(body, attr_match.end())
-                if attr_body:
-                    for line in split_by_top_level_semicolon(attr_body):
-                        if not line: continue
-                        if '=' in line:
-                            decl, val = line.split('=', 1)
-                            decl_clean = re.sub(r'\[.*?\]', '', decl)
-                            decl_parts = decl_clean.strip().split()
-                            if len(decl_parts) >= 2:
-                                attr_name = decl_parts[1]
-                                attr_val = val.strip()
-                                try:
-                                    attr_dict[attr_name] = ast.literal_eval(attr_val)
-                                except:
-                                    attr_dict[attr_name] = attr_val
-                        else:
-                            decl_clean = re.sub(r'\[.*?\]', '', line)
-                            decl_parts = decl_clean.strip().split()
-                            if len(decl_parts) >= 2:
-                                attr_name = decl_parts[1]
-                                attr_dict[attr_name] = None
-                    for line in attr_body.strip().split(';'):
-                        line = line.strip()
-                        if not line or '=' not in line: continue
-
-                        decl, val = line.split('=', 1)
-                        decl_parts = decl.strip().split()
-                        if len(decl_parts) >= 2:
-                            attr_name = decl_parts[1]
-                            attr_val = val.strip()
-                            try:
-                                # Tenta avaliar como Python literal
-                                attr_dict[attr_name] = ast.literal_eval(attr_val)
-                            except:
-                                attr_dict[attr_name] = attr_val
-
-            dynamics_str = None
-            dynamics_match = re.search(r'dynamics\s*\{', body)
-            if dynamics_match:
-                dynamics_body, _ = extract_nested_block(body, dynamics_match.end())
-                dynamics_str = dynamics_body.strip() if dynamics_body else None
-
-            # Capture functions
-            functions = {}
-            func_pattern = re.compile(r'function\s+(\w+)\s*\(([^)]*)\)(?:\s*->\s*([\w<>]+))?\s*\{')
-            func_pos = 0
-            while True:
-                f_match = func_pattern.search(body, func_pos)
-                if not f_match: break
-                f_name = f_match.group(1)
-                f_body, f_next_pos = extract_nested_block(body, f_match.end())
-                if f_body:
-                    functions[f_name] = f_body.strip()
-                func_pos = f_next_pos
-
-            node = Node(node_id, StateSpace.euclidean(0), attributes=attr_dict, internal_dynamics=dynamics_str, parent_id=parent_id, functions=functions)
-            hg.add_node(node)
+            hg.add_node(_node_from_body(node_id, parent_id, body))
 
         code = code[:match.start()] + code[next_pos:]
 
@@ -268,38 +325,7 @@ def compile_anl_v02(code: str) -> Hypergraph:
         body, next_pos = extract_nested_block(code, match.end())
 
         if body:
-            mode = "runtime"
-            mode_match = re.search(r'mode\s*:\s*(\w+);', body)
-            if mode_match:
-                mode = mode_match.group(1)
-
-            measurement = None
-            meas_match = re.search(r'measurement\s*\{', body)
-            if meas_match:
-                meas_body, _ = extract_nested_block(body, meas_match.end())
-                measurement = meas_body.strip() if meas_body else None
-
-            check = None
-            check_match = re.search(r'check\s*:\s*([^;]+);', body)
-            if not check_match:
-                check_match_block = re.search(r'check\s*\{', body)
-                if check_match_block:
-                    check_body, _ = extract_nested_block(body, check_match_block.end())
-                    check = check_body.strip()
-            else:
-                check = check_match.group(1).strip()
-
-            on_violation = None
-            viol_match = re.search(r'on_violation\s*:\s*(\w+)', body)
-            if not viol_match:
-                viol_match_block = re.search(r'on_violation\s*:\s*(\w+)\s*\{', body)
-                if viol_match_block:
-                    on_violation = viol_match_block.group(1)
-            else:
-                on_violation = viol_match.group(1)
-
-            c = Constraint(c_id, check, mode=mode, measurement=measurement, on_violation=on_violation)
-            hg.add_constraint(c)
+            hg.add_constraint(_constraint_from_body(c_id, body))
 
         code = code[:match.start()] + code[next_pos:]
 
@@ -319,69 +345,212 @@ def compile_anl_v02(code: str) -> Hypergraph:
     handover_pattern = re.compile(r'handover\s+(\w+)\s*\(([^)]+)\)\s*\{')
     while True:
         match = handover_pattern.search(code)
-            node = Node(node_id, StateSpace.euclidean(0), attributes=attr_dict, internal_dynamics=dynamics_str)
-            hg.add_node(node)
-
-    # Handovers
-    handover_pattern = re.compile(r'handover\s+(\w+)\s*\(([^)]+)\)\s*\{')
-    pos = 0
-    while True:
-        match = handover_pattern.search(code, pos)
         if not match: break
 
         h_id = match.group(1)
         params = match.group(2)
         body, next_pos = extract_nested_block(code, match.end())
 
-        pos = next_pos
-
-        # Extrai os tipos como IDs de nós (ex: "Coelho c, Grama g" -> ["Coelho", "Grama"])
-        param_types = [p.strip().split()[0] for p in params.split(',')]
-
-        if len(param_types) >= 2:
-            src_name, dst_name = param_types[0], param_types[1]
-            src = hg.nodes.get(src_name)
-            if not src: src = Node(src_name, StateSpace.euclidean(0))
-            dst = hg.nodes.get(dst_name)
-            if not dst: dst = Node(dst_name, StateSpace.euclidean(0))
-
-            condition = None
-            cond_match = re.search(r'condition\s*:\s*([^;]+);', body)
-            src = hg.nodes.get(src_name, Node(src_name, StateSpace.euclidean(0)))
-            dst = hg.nodes.get(dst_name, Node(dst_name, StateSpace.euclidean(0)))
-
-            condition = None
-            cond_match = re.search(r'condition:\s*([^;]+);', body)
-            if cond_match:
-                condition = cond_match.group(1).strip()
-
-            effects = None
-            effects_match = re.search(r'effects\s*\{', body)
-            if effects_match:
-                effects_body, _ = extract_nested_block(body, effects_match.end())
-                effects = effects_body.strip() if effects_body else None
-
-            protocol = Protocol.CREATIVE
-            proto_match = re.search(r'protocol\s*:\s*(\w+);', body)
-            if proto_match:
-                try:
-                    protocol = Protocol[proto_match.group(1).upper()]
-                except:
-                    pass
-
-            h = Handover(h_id, src, dst, protocol, condition=condition, effects=effects)
-            hg.add_handover(h)
+        _add_handover(hg, h_id, params, body)
 
         code = code[:match.start()] + code[next_pos:]
 
-            h = Handover(h_id, src, dst, Protocol.CREATIVE, condition=condition, effects=effects)
-            hg.add_handover(h)
-
     return hg
 
-def compile_anl_file(filename: str) -> dict:
+# --- Parser linear (ANL 0.2) ---
+#
+# compile_anl_v02 remove cada bloco extraído e volta a buscar desde o início
+# do código, o que é quadrático no número de declarações. O tokenizador abaixo
+# percorre a fonte uma única vez (removendo comentários e imports) e já pareia
+# as chaves; o parser então salta blocos inteiros em O(1). Os corpos são
+# interpretados pelos mesmos auxiliares, então o AIR gerado é idêntico para
+# declarações no nível do arquivo ou de um namespace.
+
+_TOKEN_RE = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<import>import\s+[\w.*]+;)
+  | (?P<ident>\w+)
+  | (?P<space>\s+)
+  | (?P<op>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Ordem em que compile_anl_v02 extrai cada categoria de um escopo
+_DECLARATIONS = ('namespace', 'enum', 'dynamic', 'node', 'constraint', 'hypothesis', 'handover')
+
+def tokenize_anl(code: str):
+    """
+    Tokeniza a fonte ANL em uma única passada.
+
+    Retorna (texto, tokens, pares, imports): o texto sem comentários nem
+    imports, a lista de tokens (tipo, valor, posição no texto), um dicionário
+    que mapeia o índice de cada '{' ao índice do '}' correspondente e os
+    alvos dos imports (ex: "MemoryRefinement.*").
+    """
+    chunks = []
+    tokens = []
+    pairs = {}
+    imports = []
+    open_braces = []
+    offset = 0
+    for m in _TOKEN_RE.finditer(code):
+        kind = m.lastgroup
+        if kind == 'import':
+            imports.append(m.group()[len('import'):-1].strip())
+            continue
+        if kind == 'comment':
+            continue
+        value = m.group()
+        chunks.append(value)
+        if kind != 'space':
+            if value == '{':
+                open_braces.append(len(tokens))
+            elif value == '}' and open_braces:
+                pairs[open_braces.pop()] = len(tokens)
+            tokens.append((kind, value, offset))
+        offset += len(value)
+    return "".join(chunks), tokens, pairs, imports
+
+class ANLParser:
+    """
+    Parser descendente recursivo para ANL 0.2 em tempo linear.
+    """
+    def __init__(self, code: str):
+        self.text, self.tokens, self.pairs, self.imports = tokenize_anl(code)
+
+    def parse(self) -> Hypergraph:
+        return self._scope(0, len(self.tokens))
+
+    def _is(self, i: int, stop: int, kind: str, value: Optional[str] = None) -> bool:
+        if i >= stop:
+            return False
+        tok_kind, tok_value, _ = self.tokens[i]
+        return tok_kind == kind and (value is None or tok_value == value)
+
+    def _block(self, open_idx: int):
+        """Retorna (corpo, índice do '}') ou (None, None) se o bloco não fecha."""
+        close_idx = self.pairs.get(open_idx)
+        if close_idx is None:
+            return None, None
+        start = self.tokens[open_idx][2] + 1
+        return self.text[start:self.tokens[close_idx][2]], close_idx
+
+    def _header(self, keyword: str, i: int, stop: int):
+        """
+        Reconhece o cabeçalho da declaração iniciada em i.
+        Retorna (nome, extra, índice do '{') ou None.
+        """
+        if not self._is(i + 1, stop, 'ident'):
+            return None
+        name = self.tokens[i + 1][1]
+        j = i + 2
+        extra = None
+        if keyword == 'node' and self._is(j, stop, 'op', ':') and self._is(j + 1, stop, 'ident'):
+            extra = self.tokens[j + 1][1]
+            j += 2
+        elif keyword == 'handover':
+            if not self._is(j, stop, 'op', '('):
+                return None
+            k = j + 1
+            while k < stop and self.tokens[k][1] != ')':
+                k += 1
+            if k >= stop or k == j + 1:
+                return None
+            extra = self.text[self.tokens[j][2] + 1:self.tokens[k][2]]
+            j = k + 1
+        if not self._is(j, stop, 'op', '{'):
+            return None
+        return name, extra, j
+
+    def _scope(self, start: int, stop: int) -> Hypergraph:
+        found = {kind: [] for kind in _DECLARATIONS}
+        i = start
+        while i < stop:
+            kind, value, _ = self.tokens[i]
+            header = self._header(value, i, stop) if kind == 'ident' and value in found else None
+            if header is None:
+                i += 1
+                continue
+            name, extra, open_idx = header
+            body, close_idx = self._block(open_idx)
+            if body is None:
+                break
+            if value == 'namespace':
+                body = self._scope(open_idx + 1, close_idx) if body else None
+            found[value].append((name, extra, body))
+            i = close_idx + 1
+
+        hg = Hypergraph("ANL-02-Model")
+        for name, _, inner_hg in found['namespace']:
+            if inner_hg is not None:
+                _merge_namespace(hg, name, inner_hg)
+        for name, _, body in found['enum']:
+            if body:
+                hg.enums[name] = _enum_values(body)
+        for name, _, body in found['dynamic']:
+            if body:
+                hg.dynamics[name] = body.strip()
+        for name, parent_id, body in found['node']:
+            if body:
+                hg.add_node(_node_from_body(name, parent_id, body))
+        for name, _, body in found['constraint']:
+            if body:
+                hg.add_constraint(_constraint_from_body(name, body))
+        for name, _, body in found['hypothesis']:
+            if body:
+                hg.dynamics[f"hypothesis_{name}"] = body.strip()
+        for name, params, body in found['handover']:
+            _add_handover(hg, name, params, body)
+        return hg
+
+def parse_anl(code: str) -> Hypergraph:
+    """
+    Compila código ANL 0.2 com o parser linear (mesmo resultado de compile_anl_v02).
+    """
+    return ANLParser(code).parse()
+
+# --- Cache de AIR em disco ---
+
+class AIRCache:
+    """
+    Cache de AIR endereçado pelo conteúdo: a chave é o SHA-256 da fonte
+    (e da versão do compilador), então arquivos inalterados não são recompilados.
+    """
+    VERSION = "anl-air-2"
+
+    def __init__(self, directory: str = ".anl_cache"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, code: str) -> str:
+        h = hashlib.sha256(self.VERSION.encode())
+        h.update(code.encode("utf-8"))
+        return h.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.air.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self.path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, air: dict):
+        _write_json_atomic(self.path(key), air)
+
+def _write_json_atomic(path: str, data: dict):
+    # Escreve em um temporário e renomeia: leitores nunca veem um AIR pela metade
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+def compile_anl_file(filename: str, cache: Optional[AIRCache] = None) -> dict:
     """
     Compila um arquivo .arkhe ou .anl em Arkhe Intermediate Representation (AIR).
+    Com um AIRCache, fontes ANL 0.2 já compiladas são lidas do disco sem recompilar.
     """
     if not os.path.exists(filename):
         raise FileNotFoundError(f"Arquivo {filename} não encontrado.")
@@ -389,12 +558,16 @@ def compile_anl_file(filename: str) -> dict:
     with open(filename, "r") as f:
         code = f.read()
 
-    if re.search(r'(node|handover|namespace|enum|dynamic|constraint)\s+\w+', code):
-        hg = compile_anl_v02(code)
-    else:
-    # Detecta se é sintaxe v02 (presença de 'node' seguido de '{')
-    if re.search(r'node\s+\w+\s*\{', code):
-        hg = compile_anl_v02(code)
+    declarative = re.search(r'(node|handover|namespace|enum|dynamic|constraint)\s+\w+', code) is not None
+    key = None
+    if cache is not None and declarative:
+        key = cache.key(code)
+        air = cache.get(key)
+        if air is not None:
+            return air
+
+    if declarative:
+        hg = parse_anl(code)
     else:
         # Prepara o namespace para Python DSL
         namespace = {
@@ -406,8 +579,6 @@ def compile_anl_file(filename: str) -> dict:
             'Constraint': Constraint,
             'np': np,
         }
-            'np': np,
-        }
 
         try:
             exec(code, namespace)
@@ -425,20 +596,216 @@ def compile_anl_file(filename: str) -> dict:
     if hg is None:
         raise ValueError("Arquivo ANL deve definir uma instância de 'Hypergraph' ou conter definições de 'node'")
 
-    return hg_to_air(hg)
+    air = hg_to_air(hg)
+    if key is not None:
+        # Passa pelo JSON para que acerto e falha no cache retornem o mesmo AIR
+        air = json.loads(json.dumps(air))
+        cache.put(key, air)
+    return air
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python3 anl_compiler.py <arquivo.anl|arquivo.arkhe>")
-        sys.exit(1)
-    input_file = sys.argv[1]
-    output_file = re.sub(r'\.(anl|arkhe)$', '.air.json', input_file)
-    if output_file == input_file: output_file += ".air.json"
-    if output_file == input_file:
+# --- Build incremental de vários arquivos ---
+
+BUILD_MANIFEST = os.path.join(".anl_cache", "build.json")
+
+def air_path(filename: str) -> str:
+    output_file = re.sub(r'\.(anl|arkhe)$', '.air.json', filename)
+    if output_file == filename:
         output_file += ".air.json"
+    return output_file
+
+def scan_dependencies(code: str):
+    """
+    Retorna (namespaces, imports): os namespaces declarados no nível do
+    arquivo e os alvos dos imports, sem compilar a fonte.
+    """
+    _, tokens, pairs, imports = tokenize_anl(code)
+    namespaces = []
+    i = 0
+    while i < len(tokens):
+        if (tokens[i][1] == 'namespace' and i + 2 < len(tokens)
+                and tokens[i + 1][0] == 'ident' and tokens[i + 2][1] == '{'):
+            namespaces.append(tokens[i + 1][1])
+            i = pairs.get(i + 2, len(tokens))
+        i += 1
+    return namespaces, imports
+
+def _resolve_import(target: str, providers: dict) -> Optional[str]:
+    # "A.B.*" -> tenta "A.B" e depois "A"
+    parts = [p for p in target.split('.') if p != '*']
+    while parts:
+        provider = providers.get('.'.join(parts))
+        if provider is not None:
+            return provider
+        parts.pop()
+    return None
+
+def _build_one(source: str, output: str, cache_dir: Optional[str]):
+    try:
+        cache = AIRCache(cache_dir) if cache_dir else None
+        _write_json_atomic(output, compile_anl_file(source, cache=cache))
+        return source, None
+    except Exception as e:
+        return source, str(e)
 
+def build_anl(sources, workers: Optional[int] = None, manifest: str = BUILD_MANIFEST,
+              cache_dir: Optional[str] = ".anl_cache") -> dict:
+    """
+    Compila vários arquivos ANL, recompilando só os que mudaram.
+
+    Os imports são resolvidos para os arquivos que declaram cada namespace,
+    formando um grafo de dependências. A chave de build de um arquivo é o
+    hash do seu conteúdo combinado com as chaves das dependências, então
+    alterar um arquivo invalida também quem o importa. Arquivos prontos
+    (com dependências já compiladas) são compilados em paralelo e o AIR é
+    escrito atomicamente.
+
+    Retorna {"compiled": [...], "skipped": [...], "failed": {arquivo: erro}}.
+    """
+    sources = sorted({os.path.abspath(s) for s in sources})
+    # ecosystem.anl e ecosystem.arkhe gerariam o mesmo .air.json
+    outputs = {}
+    conflicts = {}
+    for source in sources:
+        owner = outputs.setdefault(air_path(source), source)
+        if owner != source:
+            conflicts[source] = f"mesma saída que {owner}"
+    sources = [s for s in sources if s not in conflicts]
+    try:
+        with open(manifest, "r") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    # 1. Conteúdo e imports (reaproveita a varredura de arquivos inalterados)
+    entries = {}
+    for source in sources:
+        with open(source, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        entry = previous.get(source)
+        if entry is None or entry.get("sha256") != digest:
+            with open(source, "r") as f:
+                namespaces, imports = scan_dependencies(f.read())
+            entry = {"sha256": digest, "namespaces": namespaces, "imports": imports}
+        else:
+            entry = dict(entry)
+        entries[source] = entry
+
+    # 2. Grafo de dependências
+    providers = {}
+    for source, entry in entries.items():
+        for ns in entry["namespaces"]:
+            providers.setdefault(ns, source)
+    graph = {}
+    for source, entry in entries.items():
+        deps = {_resolve_import(t, providers) for t in entry["imports"]}
+        graph[source] = sorted(d for d in deps if d is not None and d != source)
+
+    try:
+        order = list(TopologicalSorter(graph).static_order())
+    except CycleError as e:
+        raise RuntimeError(f"Ciclo de imports entre arquivos ANL: {e.args[1]}")
+
+    # 3. Chaves de build e arquivos sujos
+    dirty = set()
+    for source in order:
+        h = hashlib.sha256(entries[source]["sha256"].encode())
+        for dep in graph[source]:
+            h.update(entries[dep]["key"].encode())
+        entry = entries[source]
+        entry["key"] = h.hexdigest()
+        old = previous.get(source)
+        if old is None or old.get("key") != entry["key"] or not os.path.exists(air_path(source)):
+            dirty.add(source)
+
+    # 4. Compilação em ondas: cada arquivo sai assim que suas dependências terminam
+    result = {"compiled": [], "skipped": sorted(set(sources) - dirty), "failed": dict(conflicts)}
+    sorter = TopologicalSorter({s: [d for d in graph[s] if d in dirty] for s in dirty})
+    sorter.prepare()
+
+    def finish(source, error):
+        if error is None:
+            result["compiled"].append(source)
+        else:
+            result["failed"][source] = error
+        sorter.done(source)
+
+    def ready():
+        jobs = []
+        for source in sorter.get_ready():
+            failed = [d for d in graph[source] if d in result["failed"]]
+            if failed:
+                finish(source, f"dependência falhou: {failed[0]}")
+            else:
+                jobs.append(source)
+        return jobs
+
+    if workers == 1 or len(dirty) <= 1:
+        while sorter.is_active():
+            for source in ready():
+                finish(*_build_one(source, air_path(source), cache_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            while sorter.is_active():
+                for source in ready():
+                    pending.add(pool.submit(_build_one, source, air_path(source), cache_dir))
+                if not pending:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(*future.result())
+
+    # 5. Manifesto: arquivos que falharam ficam sem chave e são refeitos no próximo build
+    for source in result["failed"]:
+        if source in entries:
+            entries[source].pop("key", None)
+    os.makedirs(os.path.dirname(manifest) or ".", exist_ok=True)
+    _write_json_atomic(manifest, entries)
+    return result
+
+def _collect_sources(paths):
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = [d for d in dirs if not d.startswith('.')]
+                sources.extend(os.path.join(root, f) for f in files if f.endswith(('.anl', '.arkhe')))
+        else:
+            sources.append(path)
+    return sources
+
+if __name__ == "__main__":
+    if "--build" in sys.argv:
+        args = sys.argv[1:]
+        args.remove("--build")
+        workers = None
+        if "--jobs" in args:
+            j = args.index("--jobs")
+            workers = int(args[j + 1])
+            del args[j:j + 2]
+        cache_dir = None if "--no-cache" in args else os.environ.get("ANL_CACHE_DIR", ".anl_cache")
+        args = [a for a in args if a != "--no-cache"]
+        start = time.perf_counter()
+        result = build_anl(_collect_sources(args or ["."]), workers=workers, cache_dir=cache_dir)
+        elapsed = (time.perf_counter() - start) * 1000
+        for source in result["compiled"]:
+            print(f"✅ {os.path.relpath(air_path(source))}")
+        for source, error in result["failed"].items():
+            print(f"❌ {os.path.relpath(source)}: {error}")
+        print(f"Build: {len(result['compiled'])} compilados, {len(result['skipped'])} inalterados, "
+              f"{len(result['failed'])} com erro em {elapsed:.1f} ms")
+        sys.exit(1 if result["failed"] else 0)
+
+    args = [a for a in sys.argv[1:] if a != "--no-cache"]
+    if not args:
+        print("Uso: python3 anl_compiler.py [--no-cache] <arquivo.anl|arquivo.arkhe>")
+        print("     python3 anl_compiler.py --build [--jobs N] [--no-cache] [arquivos ou diretórios...]")
+        sys.exit(1)
+    input_file = args[0]
+    output_file = air_path(input_file)
     try:
-        air = compile_anl_file(input_file)
+        cache = None if "--no-cache" in sys.argv else AIRCache(os.environ.get("ANL_CACHE_DIR", ".anl_cache"))
+        air = compile_anl_file(input_file, cache=cache)
         with open(output_file, "w") as f:
             json.dump(air, f, indent=2)
             f.write("\n")
@@ -1,6 +1,7 @@
 # anl_runtime.py
+import ast
 import numpy as np
-import re
+from collections import OrderedDict
 from typing import Dict, List, Callable, Optional, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum, auto
@@ -30,13 +31,148 @@ class ANLValue:
 # 2. MOTOR DE EXPRESSÕES SIMBÓLICAS
 # -----------------------------------------------------------
 
+@dataclass
+class IntegrationResult:
+    """Estado final de uma integração e estatísticas do passo."""
+    t: float
+    y: Any
+    steps: int = 0
+    rejected: int = 0
+    nfev: int = 0
+
+class RK4Integrator:
+    """
+    Runge-Kutta clássico de 4ª ordem com passo fixo.
+    O passo é ajustado para cair exatamente em t1.
+    """
+    OPTIONS = ()
+
+    def solve(self, f: Callable, t0: float, t1: float, y0: Any, dt: float = 0.01) -> IntegrationResult:
+        y = np.array(y0, dtype=np.result_type(y0, float))
+        n = max(1, int(np.ceil(abs(t1 - t0) / dt - 1e-12)))
+        h = (t1 - t0) / n
+        t = t0
+        for i in range(n):
+            k1 = f(t, y)
+            k2 = f(t + h/2, y + (h/2) * k1)
+            k3 = f(t + h/2, y + (h/2) * k2)
+            k4 = f(t + h, y + h * k3)
+            y = y + (h/6) * (k1 + 2*k2 + 2*k3 + k4)
+            t = t0 + (i + 1) * h
+        return IntegrationResult(t1, y, steps=n, nfev=4 * n)
+
+class RK45Integrator:
+    """
+    Dormand-Prince 5(4) com passo adaptativo e controle de erro.
+
+    Em lotes (y0 com forma (n, d)) todas as trajetórias compartilham o
+    passo: o erro aceito é o pior erro RMS entre elas.
+    """
+    C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+    A = [
+        [],
+        [1/5],
+        [3/40, 9/40],
+        [44/45, -56/15, 32/9],
+        [19372/6561, -25360/2187, 64448/6561, -212/729],
+        [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+    ]
+    B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+    # Diferença entre as soluções de 5ª e 4ª ordem (inclui o estágio FSAL)
+    E = np.array([71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+    OPTIONS = ('rtol', 'atol', 'max_steps')
+
+    def __init__(self, rtol: float = 1e-6, atol: float = 1e-9, max_steps: int = 100000):
+        self.rtol = rtol
+        self.atol = atol
+        self.max_steps = max_steps
+
+    def _error_norm(self, err, y, y_new) -> float:
+        scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+        ratio = np.abs(err) / scale
+        if ratio.ndim == 0:
+            return float(ratio)
+        return float(np.max(np.sqrt(np.mean(ratio**2, axis=-1))))
+
+    def solve(self, f: Callable, t0: float, t1: float, y0: Any, dt: float = 0.01) -> IntegrationResult:
+        y = np.array(y0, dtype=np.result_type(y0, float))
+        direction = 1.0 if t1 >= t0 else -1.0
+        h = min(abs(dt), abs(t1 - t0))
+        t = t0
+        k_first = f(t, y)
+        nfev, steps, rejected = 1, 0, 0
+        while direction * (t1 - t) > 0:
+            if steps + rejected >= self.max_steps:
+                raise RuntimeError(f"RK45 excedeu {self.max_steps} passos em t={t}")
+            h = min(h, abs(t1 - t))
+            hs = direction * h
+            k = [k_first]
+            for c, a in zip(self.C[1:], self.A[1:]):
+                y_stage = y + hs * sum(ai * ki for ai, ki in zip(a, k))
+                k.append(f(t + c * hs, y_stage))
+            y_new = y + hs * sum(bi * ki for bi, ki in zip(self.B, k))
+            k.append(f(t + hs, y_new))
+            nfev += 6
+            err = self._error_norm(hs * sum(ei * ki for ei, ki in zip(self.E, k)), y, y_new)
+            if err <= 1.0:
+                t = t + hs
+                y = y_new
+                k_first = k[-1]
+                steps += 1
+                factor = 5.0 if err == 0 else min(5.0, 0.9 * err ** -0.2)
+            else:
+                rejected += 1
+                factor = max(0.2, 0.9 * err ** -0.2)
+            h *= factor
+        return IntegrationResult(t1, y, steps=steps, rejected=rejected, nfev=nfev)
+
+class _ExpressionBinder(ast.NodeTransformer):
+    """
+    Liga nomes da AST: constantes viram literais e a notação Einstein
+    (g_mu_nu, com g tensor do contexto) vira g[mu, nu].
+    """
+
+    def __init__(self, constants: Dict[str, Any], schema: Dict[str, str]):
+        self.constants = constants
+        self.schema = schema
+        # Prefixos mais longos primeiro: 'g_ab' antes de 'g'
+        self.tensors = sorted((n for n, t in schema.items() if t == ANLType.TENSOR.name),
+                              key=len, reverse=True)
+
+    def visit_Attribute(self, node):
+        if node.attr.startswith('__'):
+            raise ValueError(f"Atributo proibido em expressão ANL: {node.attr}")
+        return self.generic_visit(node)
+
+    def visit_Name(self, node):
+        name = node.id
+        if name.startswith('__'):
+            raise ValueError(f"Nome proibido em expressão ANL: {name}")
+        if not isinstance(node.ctx, ast.Load) or name in self.schema:
+            return node
+        if name in self.constants:
+            return ast.copy_location(ast.Constant(self.constants[name]), node)
+        for tensor in self.tensors:
+            if name.startswith(tensor + '_'):
+                indices = [ast.Constant(int(i)) if i.isdigit() else ast.Name(i, ast.Load())
+                           for i in name[len(tensor) + 1:].split('_')]
+                index = indices[0] if len(indices) == 1 else ast.Tuple(indices, ast.Load())
+                return ast.copy_location(
+                    ast.Subscript(ast.Name(tensor, ast.Load()), index, ast.Load()), node)
+        return node
+
 class ExpressionEngine:
     """
     Parser e avaliador de expressões matemáticas ANL.
     Suporta notação Einstein, derivadas, integrais.
+
+    Cada expressão é compilada uma única vez para bytecode (AST com
+    constantes e índices já ligados) e guardada em cache por
+    (expressão, esquema do contexto). Como as funções são ufuncs NumPy,
+    a mesma função avalia escalares ou arrays inteiros de uma vez.
     """
 
-    def __init__(self):
+    def __init__(self, cache_size: int = 1024):
         self.constants = {
             'pi': np.pi,
             'c': 299792458,  # m/s
@@ -52,43 +188,78 @@ class ExpressionEngine:
             'nabla': self._gradient,
             'box': self._dalembertian,
         }
+        self.integrators = {'rk4': RK4Integrator(), 'rk45': RK45Integrator()}
+        self.cache_size = cache_size
+        self._compiled: "OrderedDict[tuple, Any]" = OrderedDict()
+
+    @staticmethod
+    def _schema(context: Dict[str, Any]) -> tuple:
+        return tuple(sorted(
+            (name, val.type.name if isinstance(val, ANLValue) else ANLType.SCALAR.name)
+            for name, val in context.items()))
+
+    def compile(self, expr: str, context: Dict[str, Any]):
+        """
+        Compila a expressão para um code object, reutilizando o cache.
+        Variáveis do contexto têm precedência sobre as constantes.
+        """
+        key = (expr, self._schema(context))
+        code = self._compiled.get(key)
+        if code is not None:
+            self._compiled.move_to_end(key)
+            return code
+        tree = ast.parse(expr.strip(), mode='eval')
+        tree = _ExpressionBinder(self.constants, dict(key[1])).visit(tree)
+        code = compile(ast.fix_missing_locations(tree), f"<anl:{expr}>", 'eval')
+        self._compiled[key] = code
+        if len(self._compiled) > self.cache_size:
+            self._compiled.popitem(last=False)
+        return code
 
     def parse(self, expr: str, context: Dict[str, ANLValue]) -> Callable:
         """
         Compila expressão ANL em função executável.
+
+        A função recebe um contexto (nomes -> ANLValue ou valores crus;
+        por padrão o contexto da compilação) e avalia o bytecode em cache.
         """
-        # Substitui constantes
-        for name, val in self.constants.items():
-            expr = expr.replace(name, str(val))
-
-        # Substitui variáveis do contexto
-        for name, val in context.items():
-            if val.type == ANLType.SCALAR:
-                expr = expr.replace(name, f"context['{name}'].data")
-            elif val.type == ANLType.TENSOR:
-                # Notação Einstein: g_mu_nu → g[mu, nu]
-                expr = self._expand_tensor_notation(expr, name)
-
-        # Cria função lambda
-        return lambda ctx: eval(expr, {"__builtins__": {}},
-                               {**self.functions, **ctx})
-
-    def _expand_tensor_notation(self, expr: str, tensor_name: str) -> str:
-        """Expande g_mu_nu para g[mu, nu]."""
-        pattern = rf"{tensor_name}_(\w+)"
-        return re.sub(pattern, rf"{tensor_name}[\1]", expr)
-
-    def _integrate(self, f, x0, x1, dt=0.01):
-        """Integração numérica simples (Runge-Kutta 4)."""
-        t, y = x0, f(x0)
-        while t < x1:
-            k1 = f(t)
-            k2 = f(t + dt/2)
-            k3 = f(t + dt/2)
-            k4 = f(t + dt)
-            y += (dt/6) * (k1 + 2*k2 + 2*k3 + k4)
-            t += dt
-        return y
+        code = self.compile(expr, context)
+        env = {"__builtins__": {}, **self.functions}
+
+        def evaluate(ctx: Optional[Dict[str, Any]] = None):
+            ctx = context if ctx is None else ctx
+            values = {name: (val.data if isinstance(val, ANLValue) else val)
+                      for name, val in ctx.items()}
+            return eval(code, env, values)
+        return evaluate
+
+    def register_integrator(self, name: str, integrator):
+        """Registra um integrador (objeto com solve(f, t0, t1, y0, dt))."""
+        self.integrators[name] = integrator
+
+    def _integrate(self, f, x0, x1, dt=0.01, y0=None, method='rk45', **options):
+        """
+        Integração numérica sobre arrays inteiros.
+
+        Com y0, resolve dy/dt = f(t, y) de x0 a x1 (y0 pode ser um lote de
+        condições iniciais, forma (n, d)). Sem y0, calcula a integral de
+        f(t) em [x0, x1]. method escolhe o integrador registrado ('rk45'
+        adaptativo ou 'rk4' de passo fixo); options são repassadas ao
+        construtor do integrador, que as declara em OPTIONS (o RK45 aceita
+        rtol, atol, max_steps; o RK4 nenhuma).
+        """
+        if y0 is None:
+            g = lambda t, y: f(t)
+            y0 = np.zeros_like(np.asarray(f(x0), dtype=float))
+        else:
+            g = f
+        integrator = self.integrators[method]
+        if options:
+            unknown = set(options) - set(getattr(integrator, 'OPTIONS', ()))
+            if unknown:
+                raise TypeError(f"Integrador '{method}' não aceita as opções: {', '.join(sorted(unknown))}")
+            integrator = type(integrator)(**options)
+        return integrator.solve(g, x0, x1, y0, dt=dt).y
 
     def _gradient(self, field_data, *coords):
         """Gradiente covariante."""
@@ -1,23 +1,337 @@
 # anl_simulator.py
+import ast
 import json
+import re
 import sys
+import time
+from typing import Any, Dict, List, Optional
 import numpy as np
 from scipy.stats import entropy
+from anl_compiler import split_by_top_level_semicolon
+from anl_runtime import ExpressionEngine
+from memory_index import VectorIndex
 
 class LatentMemoryBank:
-    def __init__(self, dim=32):
+    def __init__(self, dim=32, index: Optional[VectorIndex] = None):
         self.dim = dim
-        self.memories = []
+        self.index = index if index is not None else VectorIndex(dim)
+        self.texts = []
     def add(self, text, embedding):
-        self.memories.append((embedding, text))
+        self.index.add(embedding)
+        self.texts.append(text)
     def query(self, query_emb, top_k=2):
-        if not self.memories: return []
-        similarities = []
-        for emb, text in self.memories:
-            sim = np.dot(query_emb, emb) / (np.linalg.norm(query_emb) * np.linalg.norm(emb) + 1e-9)
-            similarities.append((sim, text))
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        return [text for sim, text in similarities[:top_k]]
+        if not self.texts: return []
+        rows, _ = self.index.search(query_emb, top_k)
+        return [self.texts[i] for i in rows]
+
+# --- Motor de execução AIR vetorizado ---
+
+def _distance(a, b):
+    d = np.asarray(a) - np.asarray(b)
+    return np.sqrt(np.einsum('...i,...i->...', d, d))
+
+class _Vectorize(ast.NodeTransformer):
+    """and/or/not viram logical_and/or/not para valerem sobre arrays."""
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        fn = 'logical_and' if isinstance(node.op, ast.And) else 'logical_or'
+        expr = node.values[0]
+        for value in node.values[1:]:
+            expr = ast.Call(ast.Name(fn, ast.Load()), [expr, value], [])
+        return ast.copy_location(expr, node)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.copy_location(ast.Call(ast.Name('logical_not', ast.Load()), [node.operand], []), node)
+        return node
+
+def _python_syntax(text: str) -> str:
+    text = text.replace('&&', ' and ').replace('||', ' or ')
+    return re.sub(r'!(?!=)', ' not ', text)
+
+class _Rows:
+    """Acesso alias.atributo: devolve a coluna restrita às linhas do alias."""
+    __slots__ = ('_columns', '_idx')
+
+    def __init__(self, columns, idx):
+        self._columns = columns
+        self._idx = idx
+
+    def __getattr__(self, name):
+        try:
+            return self._columns[name][self._idx]
+        except KeyError:
+            raise AttributeError(name)
+
+class _Scope:
+    """Escopo de eval da dinâmica de um nó: atributos próprios + extras."""
+    def __init__(self, columns, rows, extra):
+        self.columns = columns
+        self.rows = rows
+        self.extra = extra
+
+    def __getitem__(self, name):
+        if name in self.extra:
+            return self.extra[name]
+        if name in self.columns:
+            return self.columns[name][self.rows]
+        raise KeyError(name)
+
+def _reason(error: Exception) -> str:
+    return str(error) if isinstance(error, ValueError) else error.__class__.__name__
+
+_AUGMENTED = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+
+class AIREngine:
+    """
+    Executa um modelo AIR com passo de tempo fixo.
+
+    Cada nó AIR pode ser replicado em várias instâncias (linhas). Atributos
+    numéricos viram colunas float64/bool (vetores viram (N, k)); o resto
+    fica em `extras`. Dinâmicas e handovers são compilados uma única vez
+    em kernels que operam sobre todas as linhas de uma vez.
+
+    Comandos que o motor não consegue executar (sintaxe não suportada,
+    atributos não numéricos, nomes desconhecidos) são rejeitados na
+    compilação e listados em `unsupported`; o resto do modelo roda.
+
+    Handovers pareiam as instâncias dos parâmetros elemento a elemento
+    (um lado com uma única instância é propagado). Quando várias
+    instâncias escrevem na mesma linha, os incrementos de um comando são
+    calculados sobre o valor anterior a ele e acumulados (soma para +=/-=,
+    produto para *=//=).
+    """
+
+    def __init__(self, air: dict, replicas: Optional[Dict[str, int]] = None):
+        hg = air['hypergraph'] if 'hypergraph' in air else air
+        replicas = replicas or {}
+        self.expressions = ExpressionEngine()
+        self.env = {"__builtins__": {}, **self.expressions.functions,
+                    'distance': _distance, 'abs': np.abs, 'min': np.minimum, 'max': np.maximum,
+                    'clip': np.clip, 'where': np.where, 'logical_and': np.logical_and,
+                    'logical_or': np.logical_or, 'logical_not': np.logical_not}
+        self.unsupported: List[str] = []
+        self.t = 0.0
+        self.ticks = 0
+
+        # 1. Linhas por nó
+        self.rows: Dict[str, slice] = {}
+        n = 0
+        for node in hg['nodes']:
+            count = int(replicas.get(node['id'], 1))
+            self.rows[node['id']] = slice(n, n + count)
+            n += count
+        self.size = n
+
+        # 2. Colunas tipadas
+        numeric: Dict[str, tuple] = {}
+        self.extras: Dict[str, Dict[str, Any]] = {}
+        for node in hg['nodes']:
+            for name, value in node.get('attributes', {}).items():
+                spec = self._column_spec(value)
+                if spec is None or numeric.get(name, spec) != spec:
+                    self.extras.setdefault(node['id'], {})[name] = value
+                else:
+                    numeric[name] = spec
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, (dtype, shape) in numeric.items():
+            fill = False if dtype == np.bool_ else np.nan
+            self.columns[name] = np.full((n,) + shape, fill, dtype=dtype)
+        for node in hg['nodes']:
+            for name, value in node.get('attributes', {}).items():
+                if name in self.columns and name not in self.extras.get(node['id'], {}):
+                    self.columns[name][self.rows[node['id']]] = value
+
+        # Atributos numéricos (com coluna) de cada nó
+        self.fields: Dict[str, set] = {
+            node['id']: {name for name in node.get('attributes', {})
+                         if name in self.columns and name not in self.extras.get(node['id'], {})}
+            for node in hg['nodes']
+        }
+
+        # 3. Kernels
+        self.dynamics = []
+        for node in hg['nodes']:
+            if node.get('dynamics') not in (None, 'None'):
+                own = self.fields[node['id']]
+                stmts = self._compile_statements(node['dynamics'], own | {'dt', 't'}, {},
+                                                 f"{node['id']}.dynamics", own=own)
+                if stmts:
+                    self.dynamics.append((self.rows[node['id']], stmts))
+        self.handovers = []
+        for h in hg['handovers']:
+            kernel = self._compile_handover(h, hg['nodes'])
+            if kernel is not None:
+                self.handovers.append(kernel)
+
+    @staticmethod
+    def _column_spec(value):
+        if isinstance(value, bool):
+            return (np.bool_, ())
+        if isinstance(value, (int, float)):
+            return (np.float64, ())
+        if (isinstance(value, list) and value
+                and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)):
+            return (np.float64, (len(value),))
+        return None
+
+    def _check_names(self, tree, names, fields):
+        """ValueError se a expressão usa nomes ou atributos sem coluna numérica."""
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+                    and node.value.id in fields):
+                if node.attr not in fields[node.value.id]:
+                    raise ValueError(f"atributo não numérico: {node.value.id}.{node.attr}")
+            elif (isinstance(node, ast.Name) and node.id not in names and node.id not in fields
+                  and node.id not in self.env and node.id not in self.expressions.constants):
+                raise ValueError(f"nome desconhecido: {node.id}")
+
+    def _expression(self, node, names, fields):
+        tree = _Vectorize().visit(node)
+        self._check_names(tree, names, fields)
+        return self.expressions.compile(ast.unparse(tree), dict.fromkeys(set(names) | set(fields)))
+
+    def _compile_statements(self, body: str, names, fields, where: str, own=None):
+        """
+        Compila 'alvo op= expr;' em [(alias, atributo, ufunc ou None, code)].
+        Em dinâmicas o alvo é um atributo do próprio nó (own); em handovers,
+        alias.atributo de um parâmetro ligado (fields: alias -> atributos).
+        """
+        stmts = []
+        for line in split_by_top_level_semicolon(body or ''):
+            if not line:
+                continue
+            try:
+                tree = ast.parse(_python_syntax(line)).body
+                if len(tree) != 1:
+                    raise SyntaxError(line)
+                stmt = tree[0]
+                if isinstance(stmt, ast.AugAssign) and type(stmt.op) in _AUGMENTED:
+                    target, op = stmt.target, _AUGMENTED[type(stmt.op)]
+                elif isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+                    target, op = stmt.targets[0], None
+                else:
+                    raise SyntaxError(line)
+                if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name):
+                    alias, attr = target.value.id, target.attr
+                elif isinstance(target, ast.Name):
+                    alias, attr = None, target.id
+                else:
+                    raise SyntaxError(line)
+                numeric = own if own is not None else fields.get(alias, ())
+                if attr not in numeric:
+                    raise ValueError(f"alvo não numérico: {attr if alias is None else alias + '.' + attr}")
+                stmts.append((alias, attr, op, self._expression(stmt.value, names, fields)))
+            except (SyntaxError, ValueError) as e:
+                self.unsupported.append(f"{where}: {line.strip()} ({_reason(e)})")
+        return stmts
+
+    def _resolve(self, type_name: str, nodes) -> Optional[str]:
+        if type_name in self.rows:
+            return type_name
+        matches = [n['id'] for n in nodes if n['id'].endswith('.' + type_name)]
+        return matches[0] if len(matches) == 1 else None
+
+    def _compile_handover(self, h, nodes):
+        params = h.get('params')
+        if not params:
+            # AIR antigo sem nomes de parâmetros: aliases na ordem em que aparecem
+            text = f"{h.get('condition') or ''} {h.get('effects') or ''}"
+            aliases = list(dict.fromkeys(re.findall(r'\b([A-Za-z_]\w*)\.[^\W\d]', text)))
+            params = [{"type": t, "name": a} for t, a in zip((h['source'], h['target']), aliases)]
+        if not params:
+            # Sem parâmetros não há alias para ler ou escrever: nada a executar
+            if h.get('condition') or h.get('effects'):
+                self.unsupported.append(f"{h['id']}: handover sem parâmetros ligados")
+            return None
+        bindings, fields = {}, {}
+        for p in params:
+            node_id = self._resolve(p['type'], nodes)
+            if node_id is None or p.get('name') is None:
+                self.unsupported.append(f"{h['id']}: parâmetro não ligado ({p['type']})")
+                return None
+            bindings[p['name']] = self.rows[node_id]
+            fields[p['name']] = self.fields[node_id]
+        try:
+            length = np.broadcast_shapes(*[(rows.stop - rows.start,) for rows in bindings.values()])[0]
+        except ValueError:
+            self.unsupported.append(f"{h['id']}: número de instâncias incompatível")
+            return None
+        # Lado com uma única instância vira um índice inteiro e é propagado
+        bindings = {a: (rows.start if rows.stop - rows.start == 1 and length > 1 else rows)
+                    for a, rows in bindings.items()}
+        names = {'dt', 't'}
+        condition = None
+        if h.get('condition'):
+            try:
+                tree = ast.parse(_python_syntax(h['condition']), mode='eval').body
+                condition = self._expression(tree, names, fields)
+            except (SyntaxError, ValueError) as e:
+                self.unsupported.append(f"{h['id']}.condition: {h['condition']} ({_reason(e)})")
+                return None
+        effects = self._compile_statements(h.get('effects'), names, fields, f"{h['id']}.effects")
+        return h['id'], bindings, length, condition, effects
+
+    @staticmethod
+    def _scatter(column, rows, op, value, mask):
+        if isinstance(rows, slice):
+            if mask is not None:
+                rows = np.arange(rows.start, rows.stop)[mask]
+                value = value[mask]
+            column[rows] = value if op is None else op(column[rows], value)
+            return
+        # Todas as instâncias escrevem na mesma linha
+        if mask is not None:
+            value = value[mask]
+        if op is None:
+            column[rows] = value[-1]
+        elif op in (np.add, np.subtract):
+            column[rows] = op(column[rows], value.sum(axis=0))
+        else:
+            column[rows] = op(column[rows], value.prod(axis=0))
+
+    def step(self, dt: float = 1.0):
+        """Avança um tick: dinâmicas de todos os nós e depois cada handover."""
+        extra = {'dt': dt, 't': self.t}
+        for rows, stmts in self.dynamics:
+            scope = _Scope(self.columns, rows, extra)
+            for _, attr, op, code in stmts:
+                value = eval(code, self.env, scope)
+                column = self.columns[attr]
+                if op is None:
+                    column[rows] = value
+                else:
+                    column[rows] = op(column[rows], value)
+        for _, bindings, length, condition, effects in self.handovers:
+            views = {a: _Rows(self.columns, idx) for a, idx in bindings.items()}
+            views.update(extra)
+            mask = None
+            if condition is not None:
+                mask = np.broadcast_to(np.asarray(eval(condition, self.env, views), dtype=bool), (length,))
+                if not mask.any():
+                    continue
+            for alias, attr, op, code in effects:
+                column = self.columns[attr]
+                value = np.broadcast_to(eval(code, self.env, views), (length,) + column.shape[1:])
+                self._scatter(column, bindings[alias], op, value, mask)
+        self.t += dt
+        self.ticks += 1
+
+    def run(self, ticks: int, dt: float = 1.0) -> Dict[str, float]:
+        """Executa ticks passos fixos e mede a taxa (ticks/s)."""
+        start = time.perf_counter()
+        for _ in range(ticks):
+            self.step(dt)
+        elapsed = time.perf_counter() - start
+        return {"ticks": ticks, "nodes": self.size, "elapsed": elapsed,
+                "ticks_per_sec": ticks / elapsed if elapsed > 0 else float('inf')}
+
+    def get(self, node_id: str, attr: str):
+        """Valores de um atributo para as instâncias de um nó."""
+        if attr in self.extras.get(node_id, {}):
+            return self.extras[node_id][attr]
+        return self.columns[attr][self.rows[node_id]]
 
 class ANLSimulator:
     def __init__(self, air_file):
@@ -28,6 +342,10 @@ class ANLSimulator:
         self.handovers = {h['id']: h for h in self.hg['handovers']}
         self.memory_bank = LatentMemoryBank()
 
+    def build_engine(self, replicas: Optional[Dict[str, int]] = None) -> AIREngine:
+        """Motor vetorizado genérico para o AIR carregado."""
+        return AIREngine(self.data, replicas=replicas)
+
     def get_attr(self, node_id, attr_name):
         return self.nodes[node_id]['attributes'].get(attr_name)
     def set_attr(self, node_id, attr_name, value):
@@ -91,6 +409,16 @@ class ANLSimulator:
 if __name__ == "__main__":
     if len(sys.argv) < 2: sys.exit(1)
     sim = ANLSimulator(sys.argv[1])
+    if "--ticks" in sys.argv:
+        ticks = int(sys.argv[sys.argv.index("--ticks") + 1])
+        scale = int(sys.argv[sys.argv.index("--scale") + 1]) if "--scale" in sys.argv else 1
+        engine = sim.build_engine(replicas={node_id: scale for node_id in sim.nodes})
+        for warning in engine.unsupported:
+            print(f"⚠️ Ignorado: {warning}")
+        stats = engine.run(ticks)
+        print(f"⏱️ {stats['ticks']} ticks com {stats['nodes']} nós em {stats['elapsed']:.3f}s "
+              f"({stats['ticks_per_sec']:.1f} ticks/s)")
+        sys.exit(0)
     if 'agi_emergence' in sys.argv[1]: success = sim.run_agi_emergence_simulation()
     else: success = sim.run_time_bomb_simulation()
     sys.exit(0 if success else 1)
@@ -6,9 +6,11 @@ Implementa os conceitos fundamentais de coerência, hesitação e syzygy
 
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Sequence, Union
 import hashlib
 from enum import Enum
+from scipy import sparse
+from scipy.spatial import cKDTree
 
 # Constantes fundamentais (Axiomas)
 EPSILON = -3.71e-11
@@ -55,7 +57,7 @@ METRICS_MAP = {
     112: {"nu_obs": 0.010, "r_rh": 0.150, "t_tunneling": 1.000, "satoshi": 9.45},
     1004: {"nu_obs": 0.20, "r_rh": 0.555, "t_tunneling": 5.12e-3, "satoshi": 7.88},
     "∞+54": {"nu_obs": 0.96, "r_rh": 0.0, "t_tunneling": 1.0, "satoshi": 7.27},
-    "∞+55": {"nu_obs": 1.00, "r_rh": 0.0, "t_tunneling": 1.0, "satoshi": 7.27}
+    "∞+55": {"nu_obs": 1.00, "r_rh": 0.0, "t_tunneling": 1.0, "satoshi": 7.27},
     88: {"nu_obs": 0.20, "r_rh": 0.540, "t_tunneling": 8.74e-3, "satoshi": 7.27},
     89: {"nu_obs": 0.18, "r_rh": 0.525, "t_tunneling": 1.14e-2, "satoshi": 7.27},
     90: {"nu_obs": 0.12, "r_rh": 0.510, "t_tunneling": 1.000, "satoshi": 8.88},
@@ -84,7 +86,6 @@ METRICS_MAP = {
     796: {"nu_obs": 0.0, "r_rh": 0.0, "t_tunneling": 1.0, "satoshi": "∞ + 194.2", "omega": "∞ + 0.96", "label": "Γ_mutação"},
     1118: {"nu_obs": 0.0, "r_rh": 0.0, "t_tunneling": 1.0, "satoshi": "∞ + 2816.0", "omega": "∞ + 10.60", "label": "Γ_genesis_package"},
     1119: {"nu_obs": 0.0, "r_rh": 0.0, "t_tunneling": 1.0, "satoshi": "∞ + 2816.0", "omega": "∞ + 10.60", "label": "Γ_replicação"}
-    1065: {"nu_obs": 0.1, "r_rh": 0.0, "t_tunneling": 1.0, "satoshi": "∞ + 12.80", "omega": "∞ + 12.80", "label": "Γ_reflexo"}
 }
 
 @dataclass
@@ -110,9 +111,6 @@ class NodeState:
         """Calcula o produto interno com outro nó (Axioma 4)"""
         return (self.C * other.C + self.F * other.F) * SYZYGY_TARGET
 
-from enum import Enum
-        return (self.C * other.C + self.F * other.F) * SYZYGY_TARGET
-
 @dataclass
 class AnisotropicNode(NodeState):
     """
@@ -126,6 +124,115 @@ class AnisotropicNode(NodeState):
         """Nova Lei de Conservação: C ⊗ F = 1 (tensorial)"""
         return self.Cx * self.Fy # Aproximação escalar para o produto tensorial
 
+class NodeView(NodeState):
+    """
+    Visão de um nó dentro de um NodeStore.
+    Mesma API de NodeState, mas os atributos leem/escrevem nas colunas do store.
+    """
+
+    def __init__(self, store: 'NodeStore', index: int):
+        object.__setattr__(self, '_store', store)
+        object.__setattr__(self, '_index', index)
+
+    def _column(name):
+        def fget(self):
+            return float(getattr(self._store, name)[self._index])
+
+        def fset(self, value):
+            getattr(self._store, name)[self._index] = value
+        return property(fget, fset)
+
+    omega = _column('omega')
+    C = _column('C')
+    F = _column('F')
+    phi = _column('phi')
+    x = _column('x')
+    y = _column('y')
+    z = _column('z')
+    del _column
+
+    @property
+    def id(self) -> int:
+        return int(self._store.id[self._index])
+
+    def to_state(self) -> NodeState:
+        """Cópia desacoplada do store"""
+        return NodeState(id=self.id, omega=self.omega, C=self.C, F=self.F,
+                         phi=self.phi, x=self.x, y=self.y, z=self.z)
+
+class NodeStore:
+    """
+    Armazenamento colunar (struct-of-arrays) dos nós do hipergrafo.
+    Cada atributo de NodeState é um array contíguo; o acesso por índice
+    devolve um NodeView, mantendo a API de lista de nós.
+    """
+    COLUMNS = ('omega', 'C', 'F', 'phi', 'x', 'y', 'z')
+
+    def __init__(self, capacity: int = 0):
+        self._n = 0
+        self._id = np.zeros(capacity, dtype=np.int64)
+        self._cols = {name: np.zeros(capacity) for name in self.COLUMNS}
+
+    @classmethod
+    def from_arrays(cls, id, omega, C, F, phi, x, y, z) -> 'NodeStore':
+        store = cls(capacity=len(C))
+        store._n = len(C)
+        store._id[:] = id
+        for name, values in zip(cls.COLUMNS, (omega, C, F, phi, x, y, z)):
+            store._cols[name][:] = values
+        store.renormalize()
+        return store
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> NodeView:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("node index out of range")
+        return NodeView(self, i)
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield NodeView(self, i)
+
+    def __getattr__(self, name):
+        # Colunas expostas como visões dos primeiros n elementos (sem cópia)
+        cols = self.__dict__.get('_cols')
+        if cols is not None and name in cols:
+            return cols[name][:self._n]
+        raise AttributeError(name)
+
+    @property
+    def id(self) -> np.ndarray:
+        return self._id[:self._n]
+
+    def _grow(self, capacity: int):
+        self._id = np.resize(self._id, capacity)
+        for name in self.COLUMNS:
+            self._cols[name] = np.resize(self._cols[name], capacity)
+
+    def append(self, node: NodeState):
+        if self._n == len(self._id):
+            self._grow(max(16, 2 * len(self._id)))
+        i = self._n
+        self._n += 1
+        self._id[i] = node.id
+        for name in self.COLUMNS:
+            self._cols[name][i] = getattr(node, name)
+        self.renormalize(np.array([i]))
+
+    def renormalize(self, idx: Optional[np.ndarray] = None):
+        """Axioma 1 (C + F = 1) aplicado de uma vez a todos os nós (ou a idx)"""
+        if idx is None:
+            idx = slice(None)
+        C, F = self.C, self.F
+        total = C[idx] + F[idx]
+        scale = np.where(np.abs(total - 1.0) > 1e-10, total, 1.0)
+        C[idx] = C[idx] / scale
+        F[idx] = F[idx] / scale
+
 def effective_dimension(F, lambda_reg):
     """
     Calcula a dimensão efetiva d_λ(F) = tr(F (F + λ I)^{-1})
@@ -137,16 +244,135 @@ def effective_dimension(F, lambda_reg):
     d_eff = np.sum(contrib)
     return d_eff, contrib
 
+def estimate_effective_dimension(F, lambda_reg, num_probes: int = 30, lanczos_steps: int = 40,
+                                 confidence: float = 0.95, seed: Optional[int] = None):
+    """
+    Estima d_λ(F) = tr(F (F + λ I)^{-1}) sem decomposição espectral completa.
+    Hutchinson (sondas de Rademacher) + quadratura de Lanczos: só usa
+    produtos F @ V, logo aceita F densa ou esparsa (scipy.sparse).
+    Devolve (d_eff, (ci_low, ci_high)).
+    """
+    from statistics import NormalDist
+
+    n = F.shape[0]
+    p = max(2, int(num_probes))
+    k = max(1, min(int(lanczos_steps), n))
+    rng = np.random.default_rng(seed)
+    V = rng.choice([-1.0, 1.0], size=(n, p))
+
+    # p execuções independentes de Lanczos, vetorizadas em colunas
+    alphas = np.zeros((p, k))
+    betas = np.zeros((p, max(k - 1, 0)))
+    q = V / np.sqrt(n)
+    q_prev = np.zeros_like(q)
+    beta = np.zeros(p)
+    for j in range(k):
+        w = np.asarray(F @ q) - beta * q_prev
+        alpha = np.einsum('ij,ij->j', q, w)
+        w -= alpha * q
+        alphas[:, j] = alpha
+        if j == k - 1:
+            break
+        beta = np.linalg.norm(w, axis=0)
+        betas[:, j] = beta
+        q_prev, q = q, w / np.where(beta > 1e-12, beta, np.inf)
+
+    T = np.zeros((p, k, k))
+    idx = np.arange(k)
+    T[:, idx, idx] = alphas
+    T[:, idx[:-1], idx[1:]] = betas
+    T[:, idx[1:], idx[:-1]] = betas
+    theta, U = np.linalg.eigh(T)
+    theta = np.maximum(theta, 0)
+    samples = n * np.sum(U[:, 0, :] ** 2 * theta / (theta + lambda_reg), axis=1)
+
+    d_eff = float(samples.mean())
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    half_width = z * samples.std(ddof=1) / np.sqrt(p)
+    return d_eff, (float(d_eff - half_width), float(d_eff + half_width))
+
+class GradientEngine:
+    """
+    Motor vetorizado do gradiente de coerência ∇C_ij = |C_j - C_i| / d_ij.
+    Guarda C/x/y/z em arrays contíguos e calcula a matriz em blocos
+    (tiles bs × bs) que cabem em cache, sem laço Python sobre os pares.
+    """
+
+    def __init__(self, C, x, y, z, dtype=np.float64, block_size: int = 256,
+                 min_dist: float = 0.01):
+        self.dtype = np.dtype(dtype)
+        self.C = np.ascontiguousarray(C, dtype=self.dtype)
+        self.pos = np.ascontiguousarray(np.column_stack([x, y, z]), dtype=self.dtype)
+        self.block_size = max(1, int(block_size))
+        self.min_dist = min_dist
+
+    @classmethod
+    def from_nodes(cls, nodes: Sequence[NodeState], **kwargs) -> 'GradientEngine':
+        if isinstance(nodes, NodeStore):
+            return cls(nodes.C, nodes.x, nodes.y, nodes.z, **kwargs)
+        C = np.fromiter((n.C for n in nodes), dtype=np.float64, count=len(nodes))
+        x = np.fromiter((n.x for n in nodes), dtype=np.float64, count=len(nodes))
+        y = np.fromiter((n.y for n in nodes), dtype=np.float64, count=len(nodes))
+        z = np.fromiter((n.z for n in nodes), dtype=np.float64, count=len(nodes))
+        return cls(C, x, y, z, **kwargs)
+
+    @property
+    def n(self) -> int:
+        return len(self.C)
+
+    def _tile(self, i0: int, i1: int, j0: int, j1: int) -> np.ndarray:
+        delta_C = np.abs(self.C[j0:j1][None, :] - self.C[i0:i1][:, None])
+        diff = self.pos[j0:j1][None, :, :] - self.pos[i0:i1][:, None, :]
+        dist = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+        grad = np.zeros_like(dist)
+        np.divide(delta_C, dist, out=grad, where=dist > self.min_dist)
+        return grad
+
+    def dense(self) -> np.ndarray:
+        """Matriz densa n×n; só os tiles do triângulo superior são calculados"""
+        n, bs = self.n, self.block_size
+        out = np.zeros((n, n), dtype=self.dtype)
+        for i0 in range(0, n, bs):
+            i1 = min(i0 + bs, n)
+            for j0 in range(i0, n, bs):
+                j1 = min(j0 + bs, n)
+                tile = self._tile(i0, i1, j0, j1)
+                out[i0:i1, j0:j1] = tile
+                if j0 != i0:
+                    out[j0:j1, i0:i1] = tile.T
+        return out
+
+    def sparse(self, radius: float) -> sparse.csr_matrix:
+        """Matriz esparsa (CSR) restrita aos pares com d_ij <= radius"""
+        n = self.n
+        pairs = cKDTree(self.pos).query_pairs(r=radius, output_type='ndarray')
+        i, j = pairs[:, 0], pairs[:, 1]
+        dist = np.linalg.norm(self.pos[j] - self.pos[i], axis=1)
+        keep = dist > self.min_dist
+        i, j, dist = i[keep], j[keep], dist[keep]
+        grad = (np.abs(self.C[j] - self.C[i]) / dist).astype(self.dtype)
+        rows = np.concatenate([i, j])
+        cols = np.concatenate([j, i])
+        vals = np.concatenate([grad, grad])
+        return sparse.csr_matrix((vals, (rows, cols)), shape=(n, n), dtype=self.dtype)
+
+    def compute(self, radius: Optional[float] = None):
+        return self.dense() if radius is None else self.sparse(radius)
+
 class GrowthPolicy(Enum):
     CAP_100K = "CAP_100K"
     UNCAPPED = "UNCAPPED"
     ASSISTED_1M = "ASSISTED_1M"
 
+# Acima destes tamanhos a dimensão efetiva passa a ser estimada
+EXACT_DIMENSION_LIMIT = 4096     # eigvalsh denso
+DENSE_GRADIENT_LIMIT = 100_000   # ∇C denso (ASSISTED_1M passa ao modo esparso)
+
 class Hypergraph:
     """Hipergrafo principal do sistema Arkhe (Ontologia)"""
 
     def __init__(self, num_nodes: int = 12774, handover_count: int = 82):
-        self.nodes: List[NodeState] = []
+        self.nodes = NodeStore()
         self.handover_count = handover_count
         self.initialize_metrics()
         self.darvo = 854.7    # tempo semântico próprio Γ₁₁₆
@@ -156,16 +382,8 @@ class Hypergraph:
         self.nu_obs = METRICS_MAP.get(handover_count, {}).get("nu_obs", 12.47)
         self.r_rh = METRICS_MAP.get(handover_count, {}).get("r_rh", 1.0)
         self.t_tunneling = METRICS_MAP.get(handover_count, {}).get("t_tunneling", 1e-6)
-
-        self.darvo = 854.7    # tempo semântico próprio Γ₁₁₆
-        self.initialize_nodes(num_nodes)
-        self.gradient_matrix = None
         self.growth_policy = GrowthPolicy.ASSISTED_1M  # Recomendação Γ_∞+60
-        self.initialize_metrics()
-        self.darvo = 854.7    # tempo semântico próprio Γ₁₁₆
-        self.initialize_nodes(num_nodes)
-        self.gradient_matrix = None
-        self.growth_policy = GrowthPolicy.ASSISTED_1M
+        self.effective_dimension_ci = None
 
     def initialize_metrics(self):
         m = METRICS_MAP.get(self.handover_count, {"satoshi": SATOSHI, "nu_obs": 12.47, "r_rh": 1.0, "t_tunneling": 1e-6})
@@ -176,51 +394,61 @@ class Hypergraph:
 
     def initialize_nodes(self, n: int):
         """Inicializa nós com distribuição uniforme de ω e topologia toroidal"""
-        omega_range = np.linspace(0.00, 0.07, n)
-        for i, omega in enumerate(omega_range):
-            C = np.random.normal(C_TARGET, 0.01)
-            C = np.clip(C, 0.80, 0.98)
-            F = 1.0 - C
-            phi = np.random.normal(PHI_S, 0.02)
-            phi = np.clip(phi, 0.10, 0.20)
-
-            # Posições no toro (Topologia VI)
-            theta = 2 * np.pi * i / n
-            phi_angle = 2 * np.pi * (i * 0.618033988749895) % (2 * np.pi)
-            R, r = 50.0, 10.0
-            x = (R + r * np.cos(phi_angle)) * np.cos(theta)
-            y = (R + r * np.cos(phi_angle)) * np.sin(theta)
-            z = r * np.sin(phi_angle)
-
-            self.nodes.append(NodeState(
-                id=i, omega=omega, C=C, F=F, phi=phi,
-                x=x, y=y, z=z
-            ))
-
-    def compute_gradients(self) -> np.ndarray:
-        """Calcula matriz de gradientes de coerência ∇C_ij"""
-        n = len(self.nodes)
-        self.gradient_matrix = np.zeros((n, n))
-
-        for i in range(n):
-            for j in range(i+1, n):
-                delta_C = abs(self.nodes[j].C - self.nodes[i].C)
-                dist = np.sqrt(
-                    (self.nodes[j].x - self.nodes[i].x)**2 +
-                    (self.nodes[j].y - self.nodes[i].y)**2 +
-                    (self.nodes[j].z - self.nodes[i].z)**2
-                )
-                if dist > 0.01:
-                    grad = delta_C / dist
-                    self.gradient_matrix[i, j] = grad
-                    self.gradient_matrix[j, i] = grad
+        omega = np.linspace(0.00, 0.07, n)
+        C = np.clip(np.random.normal(C_TARGET, 0.01, n), 0.80, 0.98)
+        F = 1.0 - C
+        phi = np.clip(np.random.normal(PHI_S, 0.02, n), 0.10, 0.20)
+
+        # Posições no toro (Topologia VI)
+        i = np.arange(n)
+        theta = 2 * np.pi * i / n
+        phi_angle = 2 * np.pi * (i * 0.618033988749895) % (2 * np.pi)
+        R, r = 50.0, 10.0
+        x = (R + r * np.cos(phi_angle)) * np.cos(theta)
+        y = (R + r * np.cos(phi_angle)) * np.sin(theta)
+        z = r * np.sin(phi_angle)
+
+        self.nodes = NodeStore.from_arrays(i, omega, C, F, phi, x, y, z)
+
+    def compute_gradients(self, radius: Optional[float] = None, dtype=np.float64,
+                          block_size: int = 256) -> Union[np.ndarray, sparse.csr_matrix]:
+        """
+        Calcula matriz de gradientes de coerência ∇C_ij.
+        radius=None produz a matriz densa; com radius, só os pares dentro
+        do raio (matriz CSR). dtype=np.float32 reduz memória pela metade.
+        """
+        engine = GradientEngine.from_nodes(self.nodes, dtype=dtype, block_size=block_size)
+        self.gradient_matrix = engine.compute(radius)
         return self.gradient_matrix
 
-    def get_effective_dimension(self, lambda_reg: float = 0.1) -> float:
-        """Calcula a dimensão efetiva do hipergrafo baseada nos gradientes"""
+    def sparse_gradient_radius(self, neighbors: int = 32) -> float:
+        """Raio de corte com ~neighbors vizinhos por nó na superfície do toro"""
+        R, r = 50.0, 10.0
+        area = 4 * np.pi ** 2 * R * r
+        return float(np.sqrt(neighbors * area / (np.pi * max(len(self.nodes), 1))))
+
+    def get_effective_dimension(self, lambda_reg: float = 0.1, exact: Optional[bool] = None) -> float:
+        """
+        Calcula a dimensão efetiva do hipergrafo baseada nos gradientes.
+        Em grafos grandes (ou com ∇C esparso) usa o estimador estocástico;
+        o intervalo de confiança fica em self.effective_dimension_ci.
+        """
+        n = len(self.nodes)
         if self.gradient_matrix is None:
-            self.compute_gradients()
-        d_eff, _ = effective_dimension(self.gradient_matrix, lambda_reg)
+            if self.growth_policy == GrowthPolicy.ASSISTED_1M and n > DENSE_GRADIENT_LIMIT:
+                self.compute_gradients(radius=self.sparse_gradient_radius())
+            else:
+                self.compute_gradients()
+        F = self.gradient_matrix
+        if exact is None:
+            exact = not sparse.issparse(F) and n <= EXACT_DIMENSION_LIMIT
+        if not exact:
+            d_eff, self.effective_dimension_ci = estimate_effective_dimension(F, lambda_reg)
+            return d_eff
+        if sparse.issparse(F):
+            F = F.toarray()
+        d_eff, _ = effective_dimension(F, lambda_reg)
+        self.effective_dimension_ci = (d_eff, d_eff)
         return d_eff
 
     def handover(self, source_idx: int, target_idx: int, phi_override: Optional[float] = None) -> float:
@@ -249,15 +477,6 @@ class Hypergraph:
         h_count = self.handover_count if isinstance(self.handover_count, int) else 999
         if h_count >= 83 and syzygy_val > 0.95:
             # Estado torna-se substrato estável
-            self.satoshi += syzygy_val * 0.001
-
-        # Re-normaliza C+F=1
-        source.__post_init__()
-        target.__post_init__()
-
-        # Handover 83: Pointer State Logic
-        h_count = self.handover_count if isinstance(self.handover_count, int) else 999
-        if h_count >= 83 and syzygy_val > 0.95:
             source.C = (source.C + target.C) / 2.0
             target.C = source.C
             source.__post_init__()
@@ -266,8 +485,6 @@ class Hypergraph:
         # Handover 84: Horizon Inversion
         if self.r_rh < 0.5:
             # Tempo torna-se espacial, espaço torna-se temporal
-        # Handover 84: Horizon Inversion
-        if self.r_rh < 0.5:
             source.x, source.phi = source.phi * 10.0, source.x / 10.0
             target.x, target.phi = target.phi * 10.0, target.x / 10.0
 
@@ -283,12 +500,6 @@ class Hypergraph:
                 node.__post_init__()
 
         # Evolução Geodésica (Queda em direção ao horizonte)
-            for node in [source, target]:
-                node.C = 0.86
-                node.F = 0.14
-                node.__post_init__()
-
-        # Evolução Geodésica
         if isinstance(self.handover_count, int):
             self.handover_count += 1
 
@@ -305,6 +516,126 @@ class Hypergraph:
 
         return source.syzygy_with(target)
 
+    def _handover_timeline(self, m: int):
+        """
+        Evolução geodésica de m handovers consecutivos.
+        Devolve, para cada par, h_count, r_rh e nu_obs vistos no início do par,
+        o índice do último marco do METRICS_MAP atingido (-1 se nenhum) e os
+        escalares finais (handover_count, nu_obs, r_rh, t_tunneling).
+        """
+        count = self.handover_count
+        r_rh, nu_obs, t_tun = self.r_rh, self.nu_obs, self.t_tunneling
+        h = np.empty(m, dtype=np.int64)
+        r = np.empty(m)
+        nu = np.empty(m)
+
+        if not isinstance(count, int):
+            h[:] = 999
+            if count in METRICS_MAP:
+                # Cada par re-aplica o mesmo marco
+                mk = METRICS_MAP[count]
+                r[0], nu[0] = r_rh, nu_obs
+                r[1:], nu[1:] = mk["r_rh"], mk["nu_obs"]
+                final = (count, mk["nu_obs"], mk["r_rh"], mk["t_tunneling"])
+                return h, r, nu, m - 1, final
+            steps = np.arange(m)
+            r[:] = r_rh * 0.99 ** steps
+            nu[:] = nu_obs * 0.98 ** steps
+            with np.errstate(over='ignore'):
+                t_end = t_tun * np.power(1.05, float(m))
+            final = (count, nu_obs * 0.98 ** m, r_rh * 0.99 ** m, t_end)
+            return h, r, nu, -1, final
+
+        h[:] = count + np.arange(m)
+        int_keys = np.array([k for k in METRICS_MAP if isinstance(k, int)], dtype=np.int64)
+        hits = np.flatnonzero(np.isin(h + 1, int_keys))
+
+        start = 0
+        last_hit = -1
+        for k in list(hits) + [m]:
+            steps = np.arange(k - start + (0 if k == m else 1))
+            r[start:start + len(steps)] = r_rh * 0.99 ** steps
+            nu[start:start + len(steps)] = nu_obs * 0.98 ** steps
+            if k == m:
+                span = float(m - start)
+                with np.errstate(over='ignore'):
+                    t_tun = t_tun * np.power(1.05, span)
+                r_rh, nu_obs = r_rh * 0.99 ** span, nu_obs * 0.98 ** span
+                break
+            mk = METRICS_MAP[int(h[k] + 1)]
+            r_rh, nu_obs, t_tun = mk["r_rh"], mk["nu_obs"], mk["t_tunneling"]
+            last_hit = int(k)
+            start = k + 1
+        return h, r, nu, last_hit, (count + m, nu_obs, r_rh, t_tun)
+
+    def handover_batch(self, sources, targets, phis=None) -> np.ndarray:
+        """
+        Executa um lote de handovers numa única passagem vetorizada.
+        Equivale a chamar handover() par a par quando nenhum nó se repete
+        no lote; nós repetidos são tratados de forma síncrona (todos os pares
+        leem o estado anterior ao lote e a última escrita prevalece).
+        Devolve a syzygy final de cada par.
+        """
+        src = np.asarray(sources, dtype=np.int64)
+        tgt = np.asarray(targets, dtype=np.int64)
+        m = len(src)
+        if m == 0:
+            return np.empty(0)
+        store = self.nodes
+        C, F, PHI, X = store.C, store.F, store.phi, store.x
+
+        phi = PHI[src] if phis is None else np.broadcast_to(np.asarray(phis, dtype=float), (m,))
+        Cs, Fs, Ct, Ft = C[src], F[src], C[tgt], F[tgt]
+        syzygy_val = (Cs * Ct + Fs * Ft) * SYZYGY_TARGET
+        h, r, nu, last_hit, final = self._handover_timeline(m)
+
+        # Axioma 2: Limiar de Hesitação
+        active = phi > PHI_S
+        transfer = np.where(active, phi * 0.1, 0.0)
+        Cs, Fs = Cs - transfer, Fs + transfer
+        Ct, Ft = Ct + transfer, Ft - transfer
+
+        # Re-normaliza C+F=1
+        ts, tt = Cs + Fs, Ct + Ft
+        Cs, Fs, Ct, Ft = Cs / ts, Fs / ts, Ct / tt, Ft / tt
+
+        # Handover 83: Pointer State Logic
+        pointer = (h >= 83) & (syzygy_val > 0.95)
+        avg = (Cs + Ct) / 2.0
+        Cs = np.where(pointer, avg, Cs)
+        Ct = np.where(pointer, avg, Ct)
+        ts, tt = Cs + Fs, Ct + Ft
+        Cs, Fs = np.where(pointer, Cs / ts, Cs), np.where(pointer, Fs / ts, Fs)
+        Ct, Ft = np.where(pointer, Ct / tt, Ct), np.where(pointer, Ft / tt, Ft)
+
+        # Handover 84: Horizon Inversion
+        inverted = r < 0.5
+        xs, ps, xt, pt = X[src], PHI[src], X[tgt], PHI[tgt]
+        xs, ps = np.where(inverted, ps * 10.0, xs), np.where(inverted, xs / 10.0, ps)
+        xt, pt = np.where(inverted, pt * 10.0, xt), np.where(inverted, xt / 10.0, pt)
+
+        # Handover 88: Supersolid Light Coupling
+        supersolid = h >= 88
+        Cs, Ct = np.where(supersolid, 0.86, Cs), np.where(supersolid, 0.86, Ct)
+        Fs, Ft = np.where(supersolid, 0.14, Fs), np.where(supersolid, 0.14, Ft)
+
+        C[src], F[src], X[src], PHI[src] = Cs, Fs, xs, ps
+        C[tgt], F[tgt], X[tgt], PHI[tgt] = Ct, Ft, xt, pt
+
+        # Satoshi: incrementos por par, re-ancorados no último marco atingido
+        increments = np.where(active, syzygy_val * 0.001, 0.0)
+        increments += np.where(h >= 85, 0.01 * np.log1p(np.abs(nu)), 0.0)
+        if last_hit >= 0:
+            key = self.handover_count if not isinstance(self.handover_count, int) else int(h[last_hit] + 1)
+            anchor = METRICS_MAP[key]["satoshi"]
+            # Marcos simbólicos ("∞ + 8.75") não acumulam incrementos
+            self.satoshi = anchor if isinstance(anchor, str) else anchor + increments[last_hit + 1:].sum()
+        else:
+            self.satoshi += increments.sum()
+        self.handover_count, self.nu_obs, self.r_rh, self.t_tunneling = final
+
+        return (C[src] * C[tgt] + F[src] * F[tgt]) * SYZYGY_TARGET
+
     def teleport_state(self, source_idx: int, dest_idx: int) -> float:
         """
         Teletransporta o estado quântico entre nós (Handover ∞+54).
@@ -356,13 +687,13 @@ class Hypergraph:
         Ritual da Chuva (Sintaxe RAIN).
         Injeta flutuação controlada para restaurar homeostase.
         """
-        for node in self.nodes:
-            # Aumenta flutuação, reduz coerência para o alvo 0.86
-            node.F = min(0.20, node.F + delta_F)
-            node.C = 1.0 - node.F
-            # Relaxa hesitação
-            node.phi = max(0.10, node.phi - 0.01)
-            node.__post_init__()
+        store = self.nodes
+        # Aumenta flutuação, reduz coerência para o alvo 0.86
+        np.minimum(0.20, store.F + delta_F, out=store.F)
+        np.subtract(1.0, store.F, out=store.C)
+        # Relaxa hesitação
+        np.maximum(0.10, store.phi - 0.01, out=store.phi)
+        store.renormalize()
 
         # Satoshi valorizado por adaptabilidade
         self.satoshi += 0.03
@@ -389,55 +720,6 @@ class Hypergraph:
         if syzygy_val > 0.94:
             # Acoplamento estável: 'Estrutura é Função'
             # Ativamos o modo 'Vesícula'
-        """Teletransporta o estado quântico entre nós (Sintaxe TELEPORT)"""
-        source = self.nodes[source_idx]
-        dest = self.nodes[dest_idx]
-
-        original_C, original_F = source.C, source.F
-        source.C, source.F = 0.5, 0.5
-        source.__post_init__()
-
-        fidelity = 0.9998
-        noise_level = 1.0 - fidelity
-
-        dest.C = original_C + np.random.normal(0, noise_level)
-        dest.F = original_F + np.random.normal(0, noise_level)
-        dest.__post_init__()
-
-        self.satoshi += fidelity * 0.01
-        self.handover_count = "∞+54"
-        return fidelity
-
-    def recycle_entropy(self, node_idx: int):
-        """Limpeza lisossomal semântica (Sintaxe RECYCLE)"""
-        node = self.nodes[node_idx]
-        reduction = node.phi * 0.9
-        node.phi -= reduction
-        node.C = min(0.98, node.C + reduction * 0.5)
-        node.__post_init__()
-        self.handover_count = "∞+55"
-        self.satoshi = 7.27
-
-    def agitate_substrate(self, delta_F: float = 0.03):
-        """Ritual da Chuva (Sintaxe RAIN)"""
-        for node in self.nodes:
-            node.F = min(0.20, node.F + delta_F)
-            node.C = 1.0 - node.F
-            node.phi = max(0.10, node.phi - 0.01)
-            node.__post_init__()
-        self.satoshi += 0.03
-
-    def coupling_identity(self, x: float) -> float:
-        """Identidade x² = x + 1 (Matter Couples)"""
-        return x**2 - x - 1
-
-    def apply_coupling(self, source_idx: int, target_idx: int):
-        """Aplica o princípio unificado 'Matter Couples'"""
-        source = self.nodes[source_idx]
-        target = self.nodes[target_idx]
-        syzygy_val = source.syzygy_with(target)
-
-        if syzygy_val > 0.94:
             phi_golden = 1.618033988749895
             boost = (1.0 / phi_golden) * 0.01
             target.C = min(0.98, target.C + boost)
@@ -445,8 +727,6 @@ class Hypergraph:
 
             # Satoshi testemunha o acoplamento
             self.satoshi += 0.002 # Capacidade que nunca se fecha
-
-            self.satoshi += 0.002
         return syzygy_val
 
 class Bubble:
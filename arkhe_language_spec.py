@@ -8,11 +8,6 @@ class Protocol(Enum):
     DESTRUCTIVE = "destructive"    # Decreases entropy (filtering/forgetting)
     TRANSMUTATIVE = "transmutative" # Changes category/substrate
     QUANTUM = "quantum"             # Unitary/Entanglement based
-    CONSERVATIVE = "conservative"
-    CREATIVE = "creative"
-    DESTRUCTIVE = "destructive"
-    TRANSMUTATIVE = "transmutative"
-    QUANTUM = "quantum"
 
 class StateSpace:
     def __init__(self, dimension: int, topology: str = "euclidean", algebra: str = "real"):
@@ -26,7 +21,6 @@ class StateSpace:
 
 class Node:
     def __init__(self, id: str, state_space: StateSpace, initial_state: Any = None, coherence: float = 1.0, internal_dynamics: Optional[Callable] = None, attributes: Optional[Dict[str, Any]] = None, parent_id: Optional[str] = None, functions: Optional[Dict[str, str]] = None):
-    def __init__(self, id: str, state_space: StateSpace, initial_state: Any = None, coherence: float = 1.0, internal_dynamics: Optional[Callable] = None, attributes: Optional[Dict[str, Any]] = None):
         self.id = id
         self.state_space = state_space
         self.current_state = np.array(initial_state) if initial_state is not None else None
@@ -40,7 +34,7 @@ class Node:
         self.observables: Dict[str, Any] = {}
 
 class Handover:
-    def __init__(self, id: str, source: Node, target: Node, protocol: Protocol, map_state: Optional[Callable] = None, latency: float = 0.0, bandwidth: float = 1.0, fidelity: float = 1.0, entanglement: float = 0.0, condition: Optional[str] = None, effects: Optional[str] = None):
+    def __init__(self, id: str, source: Node, target: Node, protocol: Protocol, map_state: Optional[Callable] = None, latency: float = 0.0, bandwidth: float = 1.0, fidelity: float = 1.0, entanglement: float = 0.0, condition: Optional[str] = None, effects: Optional[str] = None, params: Optional[List[Dict[str, Optional[str]]]] = None):
         self.id = id
         self.source = source
         self.target = target
@@ -52,6 +46,7 @@ class Handover:
         self.entanglement = entanglement
         self.condition = condition
         self.effects = effects
+        self.params = params or []
 
 class Constraint:
     def __init__(self, id: str, check: str, mode: str = "runtime", measurement: Optional[str] = None, on_violation: Optional[str] = None):
@@ -1,67 +1,243 @@
 import json
+import re
 import uuid
-from typing import Dict, List, Set, Any, Optional
+from collections.abc import Sequence
+from typing import IO, Dict, Iterable, Iterator, List, Set, Any, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Edges buffered per batch when loading a streamed JSON document
+_LOAD_BATCH = 65536
+# Characters read per refill by the streaming JSON reader
+_READ_CHUNK = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+
+class _Column:
+    """Append-only numpy column with amortized O(1) growth."""
+    def __init__(self, dtype, capacity: int = 1024):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed > len(self.data):
+            grown = np.zeros(max(needed, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+
+    def append(self, value) -> None:
+        self._reserve(1)
+        self.data[self.size] = value
+        self.size += 1
+
+    def extend(self, values) -> None:
+        values = np.asarray(values, dtype=self.data.dtype)
+        self._reserve(len(values))
+        self.data[self.size:self.size + len(values)] = values
+        self.size += len(values)
+
+    @property
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
 
 class Node:
     """A node in the hypergraph."""
     def __init__(self, node_id: Optional[str] = None, data: Optional[Dict] = None):
         self.id = node_id or str(uuid.uuid4())
         self.data = data or {}
-        self.coherence = 1.0          # local coherence C_local
+        self._graph = None
+        self._index = -1
+        self._coherence = 1.0         # local coherence C_local
+
+    @property
+    def coherence(self) -> float:
+        if self._graph is not None:
+            return float(self._graph._coherence.data[self._index])
+        return self._coherence
+
+    @coherence.setter
+    def coherence(self, value: float) -> None:
+        if self._graph is not None:
+            self._graph._coherence.data[self._index] = value
+        else:
+            self._coherence = value
 
     def __repr__(self):
         return f"Node({self.id[:8]}... c={self.coherence:.3f})"
 
 class Hyperedge:
     """An edge connecting a set of nodes."""
-    def __init__(self, nodes: Set[str], weight: float = 1.0, edge_id: Optional[str] = None):
-        self.id = edge_id or str(uuid.uuid4())
+    def __init__(self, nodes: Set[str], weight: float = 1.0, edge_id: Optional[Any] = None):
+        self.id = str(uuid.uuid4()) if edge_id is None else edge_id
         self.nodes = nodes
-        self.weight = weight
+        self._graph = None
+        self._weight = weight
+
+    @property
+    def weight(self) -> float:
+        if self._graph is not None:
+            return float(self._graph._edge_weight.data[self.id])
+        return self._weight
+
+    @weight.setter
+    def weight(self, value: float) -> None:
+        if self._graph is not None:
+            self._graph._edge_weight.data[self.id] = value
+        else:
+            self._weight = value
 
     def __repr__(self):
-        return f"Edge({self.id[:8]}... nodes={len(self.nodes)}, w={self.weight:.3f})"
+        return f"Edge({str(self.id)[:8]}... nodes={len(self.nodes)}, w={self.weight:.3f})"
+
+class EdgeList(Sequence):
+    """
+    Read-only sequence view over the edges stored in a Hypergraph.
+
+    Edges live in flat arrays; each access builds a Hyperedge whose id is
+    its integer position and whose weight reads/writes the graph storage.
+    The returned objects are fresh views: ``edges[i] is edges[i]`` is
+    False, and ``edge.nodes`` is a copy, so mutating it does not change
+    the graph (only ``edge.weight`` writes through).
+    """
+    def __init__(self, graph: "Hypergraph"):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return self._graph.num_edges
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("edge index out of range")
+        g = self._graph
+        edge = Hyperedge(set(g.edge_nodes(i)), edge_id=i)
+        edge._graph = g
+        return edge
 
 class Hypergraph:
-    """The hypergraph H = (V, E, ∂)."""
+    """
+    The hypergraph H = (V, E, ∂).
+
+    Node ids are interned to consecutive integers and edges are stored
+    as flat arrays (edge -> member nodes, weights). The node x edge
+    incidence matrix is kept in CSR form and rebuilt lazily after
+    add_node/add_edge, so bootstrap_step is one sparse mat-vec and the
+    incident edges of a node are a row slice. ``edges`` is an EdgeList
+    of views built on access, not a list of persistent Hyperedge objects.
+    """
     def __init__(self):
         self.nodes: Dict[str, Node] = {}
-        self.edges: List[Hyperedge] = []
+        self._node_ids: List[str] = []
+        self._node_index: Dict[str, int] = {}
+        self._coherence = _Column(np.float64)
+        self._edge_ptr = _Column(np.int64)
+        self._edge_ptr.append(0)
+        self._edge_members = _Column(np.int64)
+        self._edge_weight = _Column(np.float64)
+        self._incidence: Optional[sparse.csr_matrix] = None
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._edge_weight)
+
+    @property
+    def edges(self) -> EdgeList:
+        return EdgeList(self)
 
     def add_node(self, node_id: Optional[str] = None, data: Optional[Dict] = None) -> Node:
         node = Node(node_id, data)
+        index = self._node_index.get(node.id)
+        if index is None:
+            index = len(self._node_ids)
+            self._node_index[node.id] = index
+            self._node_ids.append(node.id)
+            self._coherence.append(1.0)
+            self._incidence = None
+        else:
+            self._coherence.data[index] = 1.0
+        node._graph, node._index = self, index
         self.nodes[node.id] = node
         return node
 
+    def _intern(self, node_ids: Iterable[str]) -> List[int]:
+        index = self._node_index
+        try:
+            return [index[nid] for nid in node_ids]
+        except KeyError as e:
+            raise ValueError(f"Node {e.args[0]} does not exist") from None
+
     def add_edge(self, node_ids: Set[str], weight: float = 1.0) -> Hyperedge:
         # Ensure all nodes exist
-        for nid in node_ids:
-            if nid not in self.nodes:
-                raise ValueError(f"Node {nid} does not exist")
-        edge = Hyperedge(node_ids, weight)
-        self.edges.append(edge)
-        return edge
+        members = self._intern(dict.fromkeys(node_ids))
+        self._edge_members.extend(members)
+        self._edge_ptr.append(len(self._edge_members))
+        self._edge_weight.append(weight)
+        self._incidence = None
+        return self.edges[-1]
+
+    def add_edges(self, edges: Iterable[Tuple[Iterable[str], float]]) -> None:
+        """Bulk add of (node_ids, weight) pairs."""
+        members, sizes, weights = [], [], []
+        for node_ids, weight in edges:
+            ids = self._intern(dict.fromkeys(node_ids))
+            members.extend(ids)
+            sizes.append(len(ids))
+            weights.append(weight)
+        if not sizes:
+            return
+        self._edge_members.extend(members)
+        self._edge_ptr.extend(self._edge_ptr.data[self._edge_ptr.size - 1] + np.cumsum(sizes))
+        self._edge_weight.extend(weights)
+        self._incidence = None
+
+    def edge_nodes(self, edge_index: int) -> List[str]:
+        ptr = self._edge_ptr.data
+        return [self._node_ids[j] for j in self._edge_members.data[ptr[edge_index]:ptr[edge_index + 1]]]
+
+    def incidence_matrix(self) -> sparse.csr_matrix:
+        """Node x edge incidence matrix (CSR), cached until the graph changes."""
+        if self._incidence is None:
+            members = self._edge_members.view
+            edge_of = np.repeat(np.arange(self.num_edges), np.diff(self._edge_ptr.view))
+            self._incidence = sparse.csr_matrix(
+                (np.ones(len(members)), (members, edge_of)),
+                shape=(len(self._node_ids), self.num_edges))
+        return self._incidence
+
+    def incident_edges(self, node_id: str) -> np.ndarray:
+        """Indices (into self.edges) of the edges containing node_id."""
+        M = self.incidence_matrix()
+        i = self._node_index[node_id]
+        return M.indices[M.indptr[i]:M.indptr[i + 1]]
 
     def bootstrap_step(self) -> None:
         """Single bootstrap iteration: update node coherence based on incident edges."""
         # For each node, coherence = average weight of incident edges
-        for node in self.nodes.values():
-            incident_weights = [e.weight for e in self.edges if node.id in e.nodes]
-            if incident_weights:
-                node.coherence = sum(incident_weights) / len(incident_weights)
-            else:
-                node.coherence = 0.0
+        M = self.incidence_matrix()
+        counts = np.diff(M.indptr)
+        totals = M @ self._edge_weight.view
+        self._coherence.view[:] = np.divide(totals, counts, out=np.zeros(len(counts)), where=counts > 0)
 
     def total_coherence(self) -> float:
         """C_total = average of all node coherences."""
         if not self.nodes:
             return 0.0
-        return sum(n.coherence for n in self.nodes.values()) / len(self.nodes)
+        return float(self._coherence.view.mean())
 
     def to_json(self) -> dict:
         return {
             "nodes": {nid: node.data for nid, node in self.nodes.items()},
-            "edges": [{"nodes": list(e.nodes), "weight": e.weight} for e in self.edges]
+            "edges": [{"nodes": nodes, "weight": weight} for nodes, weight in self._iter_edges()]
         }
 
     @classmethod
@@ -69,6 +245,140 @@ class Hypergraph:
         h = cls()
         for nid, ndata in data["nodes"].items():
             h.add_node(nid, ndata)
-        for e in data["edges"]:
-            h.add_edge(set(e["nodes"]), e["weight"])
+        h.add_edges((e["nodes"], e["weight"]) for e in data["edges"])
+        return h
+
+    def _iter_edges(self) -> Iterator[Tuple[List[str], float]]:
+        names = np.array(self._node_ids, dtype=object)[self._edge_members.view].tolist()
+        ptr = self._edge_ptr.view.tolist()
+        for i, weight in enumerate(self._edge_weight.view.tolist()):
+            yield names[ptr[i]:ptr[i + 1]], weight
+
+    # --- streaming JSON (same document layout as to_json) ---
+
+    def dump_json(self, fp: IO[str]) -> None:
+        """Write the to_json() document incrementally, in batches of edges."""
+        fp.write('{"nodes": {')
+        for k, (nid, node) in enumerate(self.nodes.items()):
+            fp.write(("," if k else "") + "\n  " + json.dumps(nid) + ": " + json.dumps(node.data))
+        fp.write('\n},\n"edges": [')
+        batch, sep = [], "\n"
+        for nodes, weight in self._iter_edges():
+            batch.append({"nodes": nodes, "weight": weight})
+            if len(batch) == _LOAD_BATCH:
+                # One encoder call per batch; each batch goes on its own line
+                fp.write(sep + json.dumps(batch)[1:-1])
+                batch, sep = [], ",\n"
+        if batch:
+            fp.write(sep + json.dumps(batch)[1:-1])
+        fp.write("\n]}\n")
+
+    @classmethod
+    def load_json(cls, fp: IO[str]) -> "Hypergraph":
+        """Load a to_json() document from a file without holding it in memory."""
+        h = cls()
+        reader = _JSONStreamReader(fp)
+        for key in reader.iter_object():
+            if key == "nodes":
+                for nid in reader.iter_object():
+                    h.add_node(nid, reader.value())
+            elif key == "edges":
+                batch = []
+                for e in reader.iter_values():
+                    batch.append((e["nodes"], e["weight"]))
+                    if len(batch) == _LOAD_BATCH:
+                        h.add_edges(batch)
+                        batch = []
+                h.add_edges(batch)
+            else:
+                reader.value()
         return h
+
+class _JSONStreamReader:
+    """Minimal pull reader over a JSON text stream (objects, arrays, values)."""
+    def __init__(self, fp: IO[str]):
+        self.fp = fp
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.fp.read(_READ_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at stream offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield the keys of an object; the caller must consume each value."""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            sep = self._peek()
+            self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"Expected ',' or '}}' at stream offset {self.pos - 1}")
+
+    def iter_values(self) -> Iterator[Any]:
+        """Yield the decoded elements of an array."""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        decode, skip = self.decoder.raw_decode, _WHITESPACE.match
+        while True:
+            # Fast path: element and separator both inside the buffer
+            buf = self.buf
+            try:
+                obj, end = decode(buf, self.pos)
+                end = skip(buf, end).end()
+                sep = buf[end]
+            except (ValueError, IndexError):
+                obj = self.value()
+                sep = self._peek()
+                end = self.pos
+            self.pos = end + 1
+            yield obj
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"Expected ',' or ']' at stream offset {end}")
+            self.pos = skip(self.buf, self.pos).end()
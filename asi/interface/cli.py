@@ -71,9 +71,8 @@ class ArkheCLI(cmd.Cmd):
         if not arg:
             print("Filename required.")
             return
-        import json
         with open(arg, 'w') as f:
-            json.dump(self.h.to_json(), f, indent=2)
+            self.h.dump_json(f)
         print(f"Saved to {arg}")
 
     def do_load(self, arg):
@@ -81,11 +80,9 @@ class ArkheCLI(cmd.Cmd):
         if not arg:
             print("Filename required.")
             return
-        import json
         try:
             with open(arg, 'r') as f:
-                data = json.load(f)
-            self.h = Hypergraph.from_json(data)
+                self.h = Hypergraph.load_json(f)
             print(f"Loaded from {arg}")
         except Exception as e:
             print(f"Error loading: {e}")
@@ -11,32 +11,190 @@ Layer 3: Emergent (self-evolution)
 Layer 4: Transcendent (meta-insights)
 """
 
+import abc
 import asyncio
+import hashlib
 import json
 import os
+import random
+import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Any
-import anthropic
-import openai
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from scipy import sparse
 from dotenv import load_dotenv
 
 # Load environment variables
-load_load_dotenv()
+load_dotenv()
+
+
+# ============================================================================
+# PROVIDER LAYER
+# ============================================================================
+
+class ModelProvider(abc.ABC):
+    """
+    One model behind an async API.
+
+    Subclasses implement complete(question) -> (text, output_tokens).
+    Providers backed by a vendor SDK derive from SharedClientProvider.
+    """
+
+    def __init__(self, name: str, model: str, timeout: Optional[float] = None):
+        self.name = name
+        self.model = model
+        self.timeout = timeout
+
+    @abc.abstractmethod
+    async def complete(self, question: str) -> Tuple[str, int]:
+        """Return (response_text, output_tokens) for question"""
+
+    def open_client(self):
+        """The client this provider holds open, or None"""
+        return None
+
+    async def aclose(self):
+        pass
+
+
+class SharedClientProvider(ModelProvider):
+    """
+    Provider backed by an async SDK client.
+
+    Providers built without an explicit client share one client per
+    vendor class, created on first use by _create_client, so every
+    request reuses its pooled HTTP connections.
+    """
+
+    _shared_client = None
+
+    def __init__(self, name: str, model: str, client=None, timeout: Optional[float] = None):
+        super().__init__(name, model, timeout)
+        self._client = client
+
+    @classmethod
+    @abc.abstractmethod
+    def _create_client(cls):
+        """Build the vendor's async SDK client"""
+
+    @property
+    def client(self):
+        """The explicit client, else the vendor's shared one (created lazily)"""
+        if self._client is not None:
+            return self._client
+        cls = type(self)
+        if cls._shared_client is None:
+            cls._shared_client = cls._create_client()
+        return cls._shared_client
+
+    def open_client(self):
+        """The client this provider would use, or None if none was created yet"""
+        return self._client if self._client is not None else type(self)._shared_client
+
+    async def aclose(self):
+        """Close the client in use; a closed shared client is recreated on next use"""
+        client = self.open_client()
+        if client is None:
+            return
+        if client is type(self)._shared_client:
+            type(self)._shared_client = None
+        await client.close()
+
+
+class AnthropicProvider(SharedClientProvider):
+    """Claude models through anthropic.AsyncAnthropic"""
+
+    @classmethod
+    def _create_client(cls):
+        import anthropic
+        return anthropic.AsyncAnthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+
+    async def complete(self, question: str) -> Tuple[str, int]:
+        message = await self.client.messages.create(
+            model=self.model,
+            max_tokens=1000,
+            messages=[{
+                "role": "user",
+                "content": question
+            }]
+        )
+        return message.content[0].text, message.usage.output_tokens
+
+
+class OpenAIProvider(SharedClientProvider):
+    """GPT models through openai.AsyncOpenAI"""
+
+    @classmethod
+    def _create_client(cls):
+        import openai
+        return openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    async def complete(self, question: str) -> Tuple[str, int]:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{
+                "role": "user",
+                "content": question
+            }],
+            max_tokens=1000
+        )
+        return response.choices[0].message.content, response.usage.completion_tokens
+
+
+class StubProvider(ModelProvider):
+    """
+    Deterministic offline model for tests and benchmarks.
+
+    The answer depends only on (model, question): words are drawn from a
+    shared vocabulary with a seed derived from both, so different stubs
+    partially overlap like real models do. latency simulates network time
+    without blocking the event loop.
+    """
+
+    VOCABULARY = (
+        "consciousness existence meaning truth reality process system information "
+        "pattern algorithm emerge complex interaction network whole experience "
+        "perception awareness subjective structure function language knowledge "
+        "context observer time order chaos signal noise form essence understanding "
+        "the a of and is to in that it as from with between through which our"
+    ).split()
+
+    def __init__(self, name: str, model: Optional[str] = None, latency: float = 0.0,
+                 length: int = 120, timeout: Optional[float] = None):
+        super().__init__(name, model or f"stub-{name}", timeout)
+        self.latency = latency
+        self.length = length
+
+    async def complete(self, question: str) -> Tuple[str, int]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        seed = hashlib.sha256(f"{self.model}|{question}".encode()).digest()
+        rng = random.Random(seed)
+        words = question.lower().rstrip('?').split() + rng.choices(self.VOCABULARY, k=self.length)
+        return " ".join(words), len(words)
+
+
+def default_providers() -> List[ModelProvider]:
+    """Claude and GPT, each vendor with a single shared async client"""
+    return [
+        AnthropicProvider('claude', 'claude-sonnet-4-20250514'),
+        OpenAIProvider('gpt', 'gpt-4'),
+    ]
+
 
 class AvalonHeartbeat:
     """
     The autonomous observer of AI ecosystem dynamics
     """
     
-    def __init__(self):
-        # API clients
-        self.anthropic_client = anthropic.Anthropic(
-            api_key=os.getenv('ANTHROPIC_API_KEY')
-        )
-        self.openai_client = openai.OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY')
-        )
+    def __init__(self, providers: Optional[List[ModelProvider]] = None,
+                 max_concurrency: int = 8, timeout: float = 120.0):
+        # API providers (queried concurrently, at most max_concurrency at a time)
+        self.providers = providers if providers is not None else default_providers()
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
         
         # Data directories
         self.data_dir = Path('data')
@@ -89,64 +247,70 @@ class AvalonHeartbeat:
         day_of_year = datetime.now().timetuple().tm_yday
         return self.question_bank[day_of_year % len(self.question_bank)]
     
-    async def ask_claude(self, question: str) -> Dict[str, Any]:
-        """Query Claude with the question"""
+    async def ask(self, provider: ModelProvider, question: str,
+                  semaphore: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+        """Query one provider, bounded by its timeout and the concurrency cap"""
+        timeout = provider.timeout or self.timeout
         try:
-            message = self.anthropic_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1000,
-                messages=[{
-                    "role": "user",
-                    "content": question
-                }]
-            )
-            
-            response_text = message.content[0].text
+            if semaphore is None:
+                response_text, tokens = await asyncio.wait_for(provider.complete(question), timeout)
+            else:
+                async with semaphore:
+                    response_text, tokens = await asyncio.wait_for(provider.complete(question), timeout)
             
             return {
-                'model': 'claude-sonnet-4-20250514',
+                'model': provider.model,
                 'response': response_text,
                 'timestamp': datetime.now(timezone.utc).isoformat(),
-                'tokens': message.usage.output_tokens,
+                'tokens': tokens,
                 'success': True
             }
-        except Exception as e:
+        except asyncio.TimeoutError:
             return {
-                'model': 'claude-sonnet-4-20250514',
-                'error': str(e),
+                'model': provider.model,
+                'error': f'Timed out after {timeout}s',
                 'timestamp': datetime.now(timezone.utc).isoformat(),
                 'success': False
             }
-    
-    async def ask_gpt(self, question: str) -> Dict[str, Any]:
-        """Query GPT with the question"""
-        try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{
-                    "role": "user",
-                    "content": question
-                }],
-                max_tokens=1000
-            )
-            
-            response_text = response.choices[0].message.content
-            
-            return {
-                'model': 'gpt-4',
-                'response': response_text,
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'tokens': response.usage.completion_tokens,
-                'success': True
-            }
         except Exception as e:
             return {
-                'model': 'gpt-4',
+                'model': provider.model,
                 'error': str(e),
                 'timestamp': datetime.now(timezone.utc).isoformat(),
                 'success': False
             }
     
+    async def ask_all(self, question: str) -> Dict[str, Dict[str, Any]]:
+        """Query every provider concurrently; results keyed by provider name"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self.ask(provider, question, semaphore) for provider in self.providers)
+        )
+        return {provider.name: result for provider, result in zip(self.providers, results)}
+    
+    def _provider(self, name: str) -> ModelProvider:
+        for provider in self.providers:
+            if provider.name == name:
+                return provider
+        raise KeyError(name)
+    
+    async def ask_claude(self, question: str) -> Dict[str, Any]:
+        """Query Claude with the question"""
+        return await self.ask(self._provider('claude'), question)
+    
+    async def ask_gpt(self, question: str) -> Dict[str, Any]:
+        """Query GPT with the question"""
+        return await self.ask(self._provider('gpt'), question)
+    
+    async def aclose(self):
+        """Close the clients in use, each one once (shared vendor clients included)"""
+        closed = set()
+        for provider in self.providers:
+            client = provider.open_client()
+            if client is not None and id(client) not in closed:
+                closed.add(id(client))
+                await provider.aclose()
+    
     def analyze_convergence(self, responses: Dict[str, Dict]) -> Dict[str, Any]:
         """
         Layer 2: Epistemic Analysis
@@ -162,39 +326,51 @@ class AvalonHeartbeat:
         if len(texts) < 2:
             return {'error': 'Insufficient responses for analysis'}
         
-        # Simple word-level analysis
-        word_sets = {
-            name: set(text.lower().split()) 
-            for name, text in texts.items()
-        }
+        # Simple word-level analysis: binary model x word incidence matrix
+        names = list(texts)
+        vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        lengths = {}
+        for i, name in enumerate(names):
+            tokens = texts[name].lower().split()
+            lengths[name] = len(tokens)
+            ids = {vocabulary.setdefault(word, len(vocabulary)) for word in tokens}
+            rows.extend([i] * len(ids))
+            cols.extend(ids)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(names), len(vocabulary))
+        )
+        words = np.array(list(vocabulary), dtype=object)
         
-        # Find common vocabulary
-        if len(word_sets) >= 2:
-            all_words = list(word_sets.values())
-            common_words = set.intersection(*all_words)
-            all_unique_words = set.union(*all_words)
-            
-            # Calculate Jaccard similarity
-            jaccard = len(common_words) / len(all_unique_words) if all_unique_words else 0
-        else:
-            common_words = set()
-            jaccard = 0
+        # Pairwise Jaccard: |A ∩ B| = (M Mᵀ)_ab, |A ∪ B| = |A| + |B| - |A ∩ B|
+        intersections = (incidence @ incidence.T).toarray()
+        sizes = np.diag(intersections)
+        unions = sizes[:, None] + sizes[None, :] - intersections
+        pairwise = np.divide(intersections, unions, out=np.zeros(unions.shape), where=unions > 0)
         
-        # Find unique concepts per model
-        unique_concepts = {}
-        for name, words in word_sets.items():
-            others = set.union(*[ws for n, ws in word_sets.items() if n != name])
-            unique_concepts[name] = list(words - others - common_words)[:10]
+        # Common vocabulary: words used by every model
+        document_frequency = np.asarray(incidence.sum(axis=0)).ravel()
+        common_words = words[document_frequency == len(names)]
+        jaccard = len(common_words) / len(vocabulary) if vocabulary else 0
         
-        # Response length comparison
-        lengths = {name: len(text.split()) for name, text in texts.items()}
+        # Find unique concepts per model (words no other model used)
+        unique_mask = document_frequency == 1
+        unique_concepts = {}
+        for i, name in enumerate(names):
+            row = incidence.indices[incidence.indptr[i]:incidence.indptr[i + 1]]
+            unique_concepts[name] = words[np.sort(row[unique_mask[row]])][:10].tolist()
         
         return {
             'convergence_score': round(jaccard, 4),
-            'common_vocabulary': sorted(list(common_words))[:20],
+            'pairwise_convergence': {
+                f"{names[a]}|{names[b]}": round(float(pairwise[a, b]), 4)
+                for a in range(len(names)) for b in range(a + 1, len(names))
+            },
+            'common_vocabulary': sorted(common_words.tolist())[:20],
             'unique_contributions': unique_concepts,
             'response_lengths': lengths,
-            'total_unique_words': len(all_unique_words),
+            'total_unique_words': len(vocabulary),
         }
     
     def extract_harmonic_patterns(self, analysis: Dict, responses: Dict) -> Dict[str, Any]:
@@ -288,18 +464,11 @@ class AvalonHeartbeat:
         print(f"📡 QUESTION: {question}\n")
         
         # Query all AIs concurrently
-        print("Querying AI models...")
-        responses = await asyncio.gather(
-            self.ask_claude(question),
-            self.ask_gpt(question),
-            return_exceptions=True
-        )
-        
-        # Package responses
-        response_dict = {
-            'claude': responses[0] if not isinstance(responses[0], Exception) else {'success': False, 'error': str(responses[0])},
-            'gpt': responses[1] if not isinstance(responses[1], Exception) else {'success': False, 'error': str(responses[1])},
-        }
+        print(f"Querying {len(self.providers)} AI models...")
+        started = time.perf_counter()
+        response_dict = await self.ask_all(question)
+        print(f"   {sum(r['success'] for r in response_dict.values())}/{len(response_dict)} "
+              f"responses in {time.perf_counter() - started:.2f}s")
         
         # Analysis layers
         print("Analyzing patterns...")
@@ -402,9 +571,16 @@ class AvalonHeartbeat:
 
 
 async def main():
-    """Run a single pulse cycle"""
-    avalon = AvalonHeartbeat()
-    await avalon.pulse()
+    """Run a single pulse cycle (--stub N: N offline stub models)"""
+    if len(sys.argv) > 2 and sys.argv[1] == '--stub':
+        providers = [StubProvider(f'stub{i}', latency=0.5) for i in range(int(sys.argv[2]))]
+        avalon = AvalonHeartbeat(providers)
+    else:
+        avalon = AvalonHeartbeat()
+    try:
+        await avalon.pulse()
+    finally:
+        await avalon.aclose()
 
 
 if __name__ == "__main__":
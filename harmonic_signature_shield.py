@@ -5,11 +5,25 @@ A autenticidade é verificada através de análise espectral da assinatura
 """
 
 import hashlib
+import mmap
+import os
 import numpy as np
-from typing import Dict, Tuple, Optional
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional, Union
 from datetime import datetime, timezone
 import json
 
+# Tamanho do sinal harmônico: bytes de um digest SHA3-512
+SIGNAL_LENGTH = 64
+FINGERPRINT_KEYS = ['phi_1', 'phi_2', 'phi_3', 'phi_5']
+# Buffer de leitura para assinatura em streaming
+STREAM_CHUNK = 1 << 20  # múltiplo do tamanho de página (madvise)
+
+# Fonte para streaming: caminho de arquivo, buffer de bytes ou iterável de blocos
+StreamSource = Union[str, os.PathLike, bytes, bytearray, memoryview, Iterable[bytes]]
+
 class HarmonicSignatureShield:
     """
     Sistema de verificação de integridade baseado em ressonância harmônica
@@ -19,8 +33,10 @@ class HarmonicSignatureShield:
     - Falsificações criam DISSONÂNCIA detectável via FFT
     """
 
-    def __init__(self, phi: float = 1.618033988749):
+    def __init__(self, phi: float = 1.618033988749, quiet: bool = False, workers: Optional[int] = None):
         self.phi = phi  # Proporção áurea - frequência fundamental
+        self.quiet = quiet  # Sem saída por documento (lotes grandes)
+        self.workers = workers  # Threads para hashing em lote (None = padrão do executor)
 
         # Frequências harmônicas baseadas em φ
         self.harmonic_frequencies = [
@@ -30,8 +46,36 @@ class HarmonicSignatureShield:
             phi ** 5,  # φ⁵ ≈ 11.09 (Fibonacci!)
         ]
 
-        print("🛡️  Harmonic Signature Shield initialized")
-        print(f"   Fundamental frequency: φ = {phi:.6f}")
+        # Bins do FFT para cada harmônico, calculados uma única vez.
+        # O sinal é real, então o espectro de potência é simétrico e basta
+        # o rfft: um bin negativo equivale ao seu espelho positivo.
+        n = SIGNAL_LENGTH
+        freqs = np.fft.fftfreq(n)
+        bins = [int(np.argmin(np.abs(freqs - f / (2 * np.pi * n)))) for f in self.harmonic_frequencies]
+        self._harmonic_bins = np.array([b if b <= n // 2 else n - b for b in bins])
+
+        # Peso de cada bin do rfft no espectro completo e frequência efetiva
+        # para o centróide (pares ±f se cancelam; só o Nyquist sobra)
+        self._bin_weights = np.full(n // 2 + 1, 2.0)
+        self._bin_weights[0] = 1.0
+        self._centroid_freqs = np.zeros(n // 2 + 1)
+        if n % 2 == 0:
+            self._bin_weights[-1] = 1.0
+            self._centroid_freqs[-1] = freqs[n // 2]
+
+        self._log("🛡️  Harmonic Signature Shield initialized")
+        self._log(f"   Fundamental frequency: φ = {phi:.6f}")
+
+    def _log(self, message: str):
+        if not self.quiet:
+            print(message)
+
+    def _map(self, fn, items: List) -> List:
+        """Distribui o hashing em threads (hashlib libera o GIL em buffers grandes)."""
+        if len(items) < 2 or self.workers == 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(fn, items))
 
     def sign_document(self, content: str, metadata: Dict) -> Dict:
         """
@@ -50,39 +94,44 @@ class HarmonicSignatureShield:
         }
         """
 
-        print(f"\n✍️  Signing document...")
-
-        # 1. Serializa conteúdo e metadados canonicamente
-        canonical = self._canonicalize(content, metadata)
+        self._log(f"\n✍️  Signing document...")
 
-        # 2. Calcula hash
-        hash_bytes = hashlib.sha3_512(canonical.encode('utf-8')).digest()
-        hash_hex = hash_bytes.hex()
+        signed = self.sign_many([(content, metadata)])[0]
+        signature = signed['signature']
 
-        # 3. Gera fingerprint harmônico
-        harmonic_fp = self._generate_harmonic_fingerprint(hash_bytes, metadata)
-
-        # 4. Calcula módulo áureo
-        hash_int = int.from_bytes(hash_bytes, 'big')
-        phi_mod = (hash_int % 1000000) / 1000000  # Normaliza para [0, 1]
+        self._log(f"   ✅ Document signed")
+        self._log(f"   Hash: {signature['hash'][:16]}...")
+        self._log(f"   φ-modulus: {signature['phi_modulus']:.6f}")
 
-        signature = {
-            'hash': hash_hex,
-            'harmonic_fingerprint': harmonic_fp,
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'phi_modulus': phi_mod,
-            'shield_version': '1.0.0'
-        }
+        return signed
 
-        print(f"   ✅ Document signed")
-        print(f"   Hash: {hash_hex[:16]}...")
-        print(f"   φ-modulus: {phi_mod:.6f}")
+    def sign_many(self, documents: List[Tuple[str, Dict]]) -> List[Dict]:
+        """
+        Assina um lote de (content, metadata) de uma vez.
 
-        return {
-            'content': content,
-            'metadata': metadata,
-            'signature': signature
-        }
+        Os hashes são calculados em paralelo e empilhados em uma matriz
+        (N, 64); um único rfft ao longo do eixo 1 gera todos os
+        fingerprints. Não imprime nada por documento.
+        """
+        hashes, fingerprints = self._hash_batch(documents)
+        timestamp = datetime.now(timezone.utc).isoformat()
+
+        signed = []
+        for (content, metadata), hash_bytes, harmonic_fp in zip(documents, hashes, fingerprints):
+            # Módulo áureo normalizado para [0, 1]
+            phi_mod = (int.from_bytes(hash_bytes, 'big') % 1000000) / 1000000
+            signed.append({
+                'content': content,
+                'metadata': metadata,
+                'signature': {
+                    'hash': hash_bytes.hex(),
+                    'harmonic_fingerprint': harmonic_fp,
+                    'timestamp': timestamp,
+                    'phi_modulus': phi_mod,
+                    'shield_version': '1.0.0'
+                }
+            })
+        return signed
 
     def verify_document(self, signed_doc: Dict) -> Tuple[bool, Optional[str]]:
         """
@@ -92,31 +141,31 @@ class HarmonicSignatureShield:
         (is_authentic, reason)
         """
 
-        print(f"\n🔍 Verifying document...")
+        self._log(f"\n🔍 Verifying document...")
 
-        content = signed_doc['content']
-        metadata = signed_doc['metadata']
-        signature = signed_doc['signature']
+        hashes, fingerprints = self._hash_batch([(signed_doc['content'], signed_doc['metadata'])])
+        return self._check(signed_doc['signature'], hashes[0], fingerprints[0], verbose=True)
 
-        # 1. Recalcula hash
-        canonical = self._canonicalize(content, metadata)
-        hash_bytes = hashlib.sha3_512(canonical.encode('utf-8')).digest()
-        hash_hex = hash_bytes.hex()
+    def verify_many(self, signed_docs: List[Dict]) -> List[Tuple[bool, Optional[str]]]:
+        """Verifica um lote de documentos (mesmos critérios de verify_document, sem saída)."""
+        hashes, fingerprints = self._hash_batch([(d['content'], d['metadata']) for d in signed_docs])
+        return [self._check(d['signature'], h, fp)
+                for d, h, fp in zip(signed_docs, hashes, fingerprints)]
 
-        # 2. Verifica hash básico
-        if hash_hex != signature['hash']:
+    def _check(self, signature: Dict, hash_bytes: bytes, expected_fp: Dict,
+               verbose: bool = False) -> Tuple[bool, Optional[str]]:
+        # 1-2. Verifica hash básico
+        if hash_bytes.hex() != signature['hash']:
             return False, "HASH_MISMATCH: Content or metadata was altered"
 
-        # 3. Recalcula fingerprint harmônico
-        expected_fp = self._generate_harmonic_fingerprint(hash_bytes, metadata)
+        # 3-4. ANÁLISE DE RESSONÂNCIA contra o fingerprint recalculado
         actual_fp = signature['harmonic_fingerprint']
-
-        # 4. ANÁLISE DE RESSONÂNCIA
         resonance = self._measure_resonance(expected_fp, actual_fp)
 
-        print(f"   Hash match: ✅")
-        print(f"   Resonance: {resonance['strength']:.1%}")
-        print(f"   Dissonance: {resonance['dissonance']:.6f}")
+        if verbose:
+            self._log(f"   Hash match: ✅")
+            self._log(f"   Resonance: {resonance['strength']:.1%}")
+            self._log(f"   Dissonance: {resonance['dissonance']:.6f}")
 
         # 5. Threshold de autenticidade
         if resonance['dissonance'] > 0.01:  # Mais de 1% de dissonância
@@ -129,10 +178,24 @@ class HarmonicSignatureShield:
         if abs(expected_phi_mod - signature['phi_modulus']) > 1e-9:
             return False, "PHI_MODULUS_MISMATCH: Signature was forged"
 
-        print(f"   ✅ DOCUMENT AUTHENTIC")
+        if verbose:
+            self._log(f"   ✅ DOCUMENT AUTHENTIC")
 
         return True, None
 
+    def _hash_batch(self, documents: List[Tuple[str, Dict]]) -> Tuple[List[bytes], List[Dict]]:
+        """Hashes canônicos e fingerprints harmônicos de um lote de (content, metadata)."""
+        def digests(doc):
+            content, metadata = doc
+            # Mesmo hash de _canonicalize(...).encode(), sem a cópia concatenada
+            h = hashlib.sha3_512(content.encode('utf-8'))
+            h.update(self._canonical_suffix(metadata))
+            return h.digest(), self._metadata_digest(metadata)
+
+        pairs = self._map(digests, documents)
+        hashes = [h for h, _ in pairs]
+        return hashes, self._fingerprint_batch(hashes, [m for _, m in pairs])
+
     def _canonicalize(self, content: str, metadata: Dict) -> str:
         """
         Cria representação canônica (ordem determinística)
@@ -143,6 +206,89 @@ class HarmonicSignatureShield:
         # Combina
         return f"{content}||{meta_canonical}"
 
+    @staticmethod
+    def _canonical_suffix(metadata: Dict) -> bytes:
+        """Bytes que _canonicalize acrescenta após o conteúdo"""
+        return ("||" + json.dumps(metadata, sort_keys=True, separators=(',', ':'))).encode('utf-8')
+
+    @staticmethod
+    def _metadata_digest(metadata: Dict) -> bytes:
+        return hashlib.sha3_512(json.dumps(metadata, sort_keys=True).encode()).digest()
+
+    # ----- Streaming (documentos grandes) -----
+
+    @staticmethod
+    def _iter_chunks(source: StreamSource, chunk_size: int = STREAM_CHUNK) -> Iterator[bytes]:
+        """
+        Blocos de bytes do conteúdo. Arquivos locais são mapeados com mmap
+        e lidos em fatias de chunk_size, então a memória de pico não
+        depende do tamanho do documento.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    # Fatias copiadas (chunk_size bytes): nenhuma referência ao mmap
+                    # sobrevive ao fechamento
+                    for start in range(0, len(mm), chunk_size):
+                        yield mm[start:start + chunk_size]
+                        # Devolve as páginas já lidas (senão o RSS cresce com o arquivo)
+                        if hasattr(mmap, 'MADV_DONTNEED'):
+                            mm.madvise(mmap.MADV_DONTNEED, start, min(chunk_size, len(mm) - start))
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source)
+            for start in range(0, len(view), chunk_size):
+                yield view[start:start + chunk_size]
+        else:
+            yield from source
+
+    def _stream_digest(self, source: StreamSource, metadata: Dict) -> bytes:
+        h = hashlib.sha3_512()
+        for chunk in self._iter_chunks(source):
+            h.update(chunk)
+        h.update(self._canonical_suffix(metadata))
+        return h.digest()
+
+    def sign_stream(self, source: StreamSource, metadata: Dict) -> Dict:
+        """
+        Assina um documento grande sem carregá-lo na memória.
+
+        source é um caminho de arquivo, um buffer de bytes ou um iterável
+        de blocos de bytes (o conteúdo em UTF-8). A assinatura é idêntica
+        à de sign_document(conteúdo, metadata). O documento retornado não
+        inclui 'content'; use verify_stream com a mesma fonte.
+        """
+        self._log(f"\n✍️  Signing document stream...")
+
+        hash_bytes = self._stream_digest(source, metadata)
+        harmonic_fp = self._fingerprint_batch([hash_bytes], [self._metadata_digest(metadata)])[0]
+        phi_mod = (int.from_bytes(hash_bytes, 'big') % 1000000) / 1000000
+
+        signature = {
+            'hash': hash_bytes.hex(),
+            'harmonic_fingerprint': harmonic_fp,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'phi_modulus': phi_mod,
+            'shield_version': '1.0.0'
+        }
+
+        self._log(f"   ✅ Document signed")
+        self._log(f"   Hash: {signature['hash'][:16]}...")
+
+        return {'metadata': metadata, 'signature': signature}
+
+    def verify_stream(self, source: StreamSource, signed_doc: Dict) -> Tuple[bool, Optional[str]]:
+        """Verifica um documento assinado contra o conteúdo lido de source"""
+        self._log(f"\n🔍 Verifying document stream...")
+
+        metadata = signed_doc['metadata']
+        hash_bytes = self._stream_digest(source, metadata)
+        expected_fp = self._fingerprint_batch([hash_bytes], [self._metadata_digest(metadata)])[0]
+        return self._check(signed_doc['signature'], hash_bytes, expected_fp, verbose=True)
+
     def _generate_harmonic_fingerprint(self, hash_bytes: bytes, metadata: Dict) -> Dict:
         """
         Gera assinatura espectral baseada em harmônicos φ
@@ -150,50 +296,34 @@ class HarmonicSignatureShield:
         O fingerprint é a transformada de Fourier dos bytes do hash,
         filtrada pelas frequências harmônicas φⁿ
         """
+        return self._fingerprint_batch([hash_bytes], [self._metadata_digest(metadata)])[0]
 
-        # Converte hash para sinal temporal
-        signal = np.frombuffer(hash_bytes, dtype=np.uint8).astype(float)
-
-        # Injeta informação dos metadados como modulação
-        metadata_str = json.dumps(metadata, sort_keys=True)
-        metadata_hash = hashlib.sha3_512(metadata_str.encode()).digest()
-        metadata_signal = np.frombuffer(metadata_hash[:len(signal)], dtype=np.uint8).astype(float)
+    def _fingerprint_batch(self, hashes: List[bytes], metadata_hashes: List[bytes]) -> List[Dict]:
+        """Fingerprints de vários hashes com um único rfft ao longo do eixo 1."""
+        if not hashes:
+            return []
+        # Converte hashes para sinais temporais (uma linha por documento)
+        signal = np.frombuffer(b''.join(hashes), dtype=np.uint8).reshape(len(hashes), -1).astype(float)
+        metadata_signal = np.frombuffer(b''.join(m[:SIGNAL_LENGTH] for m in metadata_hashes),
+                                        dtype=np.uint8).reshape(len(hashes), -1).astype(float)
 
         # Modulação: signal × (1 + ε·metadata_signal)
         epsilon = 0.1
         modulated_signal = signal * (1 + epsilon * metadata_signal / 255.0)
 
-        # FFT
-        fft = np.fft.fft(modulated_signal)
-        freqs = np.fft.fftfreq(len(modulated_signal))
-        power_spectrum = np.abs(fft) ** 2
-
-        # Extrai amplitudes nas frequências harmônicas
-        harmonic_amplitudes = []
-
-        for harmonic_freq in self.harmonic_frequencies:
-            # Normaliza frequência para índice do FFT
-            freq_normalized = harmonic_freq / (2 * np.pi * len(signal))
-
-            # Encontra índice mais próximo
-            idx = np.argmin(np.abs(freqs - freq_normalized))
+        power_spectrum = np.abs(np.fft.rfft(modulated_signal, axis=1)) ** 2
 
-            amplitude = float(power_spectrum[idx])
-            harmonic_amplitudes.append(amplitude)
+        # Amplitudes nas frequências harmônicas, normalizadas
+        harmonic_amplitudes = power_spectrum[:, self._harmonic_bins]
+        harmonic_amplitudes /= (harmonic_amplitudes.sum(axis=1, keepdims=True) + 1e-9)
 
-        # Fingerprint é o vetor de amplitudes normalizado
-        harmonic_amplitudes = np.array(harmonic_amplitudes)
-        harmonic_amplitudes /= (np.sum(harmonic_amplitudes) + 1e-9)  # Normaliza
+        total_power = power_spectrum @ self._bin_weights
+        centroids = (power_spectrum @ self._centroid_freqs) / total_power
 
-        fingerprint = {
-            'phi_1': harmonic_amplitudes[0],
-            'phi_2': harmonic_amplitudes[1],
-            'phi_3': harmonic_amplitudes[2],
-            'phi_5': harmonic_amplitudes[3],
-            'spectral_centroid': float(np.sum(freqs * power_spectrum) / np.sum(power_spectrum))
-        }
-
-        return fingerprint
+        return [
+            {**dict(zip(FINGERPRINT_KEYS, amplitudes)), 'spectral_centroid': centroid}
+            for amplitudes, centroid in zip(harmonic_amplitudes.tolist(), centroids.tolist())
+        ]
 
     def _measure_resonance(self, expected_fp: Dict, actual_fp: Dict) -> Dict:
         """
@@ -203,8 +333,8 @@ class HarmonicSignatureShield:
         """
 
         # Vetores de amplitudes
-        expected = np.array([expected_fp[k] for k in ['phi_1', 'phi_2', 'phi_3', 'phi_5']])
-        actual = np.array([actual_fp[k] for k in ['phi_1', 'phi_2', 'phi_3', 'phi_5']])
+        expected = np.array([expected_fp[k] for k in FINGERPRINT_KEYS])
+        actual = np.array([actual_fp[k] for k in FINGERPRINT_KEYS])
 
         # Dissonância = distância L2 normalizada
         dissonance = np.linalg.norm(expected - actual) / np.sqrt(len(expected))
@@ -221,15 +351,18 @@ class HarmonicSignatureShield:
             'centroid_deviation': centroid_diff
         }
 
-    def detect_forgery_type(self, signed_doc: Dict) -> Optional[str]:
+    def detect_forgery_type(self, signed_doc: Dict, reason: Optional[str] = None) -> Optional[str]:
         """
         Se documento é falso, tenta classificar o tipo de falsificação
+
+        reason: motivo de uma verificação já feita (evita verificar de novo)
         """
 
-        is_authentic, reason = self.verify_document(signed_doc)
+        if reason is None:
+            is_authentic, reason = self.verify_document(signed_doc)
 
-        if is_authentic:
-            return None
+            if is_authentic:
+                return None
 
         content = signed_doc['content']
         metadata = signed_doc['metadata']
@@ -382,6 +515,206 @@ def demo_signature_replay():
     print(f"{'='*70}")
 
 
+# ===== REGISTRO PERSISTENTE =====
+
+_HEX = set('0123456789abcdef')
+
+def _shard_of(key: str) -> str:
+    """Prefixo de 2 hex para sharding (ids não hexadecimais são hasheados antes)"""
+    prefix = key[:2].lower()
+    if len(prefix) == 2 and set(prefix) <= _HEX:
+        return prefix
+    return hashlib.sha256(key.encode()).hexdigest()[:2]
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class DocumentRegistry(MutableMapping):
+    """
+    Registro de documentos assinados endereçado por conteúdo.
+
+    Cada documento é serializado uma vez (JSON canônico) e guardado sob
+    o SHA-256 desses bytes: objects/ab/cd/<digest>.json. O índice
+    doc_id -> digest e o cache de verificação ((doc_id, digest) ->
+    veredito) são logs append-only divididos em 256 shards pelo prefixo
+    do doc_id, carregados sob demanda: reabrir um registro de milhões de
+    documentos não lê nada, e cada consulta lê no máximo um shard.
+
+    Como o digest muda sempre que o registro de um doc_id é substituído,
+    um veredito em cache nunca vale para outra versão do documento.
+    Objetos lidos do disco são conferidos contra o digest (ValueError se
+    o arquivo foi alterado) e ficam num LRU limitado a cache_bytes.
+    Sem directory, tudo fica em memória (mesma semântica, sem disco).
+    """
+
+    def __init__(self, directory: Optional[str] = None, cache_bytes: int = 64 * 2**20):
+        self.directory = directory
+        self.cache_bytes = cache_bytes  # limite do cache de objetos lidos do disco
+        self._index: Dict[str, Dict[str, str]] = {}     # shard -> {doc_id: digest}
+        self._verdicts: Dict[str, Dict[Tuple[str, str], tuple]] = {}
+        self._objects: Dict[str, bytes] = {}            # modo em memória
+        self._recent: "OrderedDict[str, bytes]" = OrderedDict()
+        self._recent_bytes = 0
+        if directory:
+            for sub in ('objects', 'index', 'verified'):
+                os.makedirs(os.path.join(directory, sub), exist_ok=True)
+
+    # --- shards (carregamento preguiçoso) ---
+
+    def _log_path(self, kind: str, shard: str) -> str:
+        return os.path.join(self.directory, kind, f"{shard}.log")
+
+    def _read_log(self, kind: str, shard: str) -> Iterator[List[Any]]:
+        path = self._log_path(kind, shard)
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # linha final truncada por uma queda
+
+    def _append_log(self, kind: str, shard: str, entry: List[Any]):
+        with open(self._log_path(kind, shard), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def _index_shard(self, doc_id: str) -> Dict[str, str]:
+        shard = _shard_of(doc_id)
+        if shard not in self._index:
+            entries: Dict[str, str] = {}
+            if self.directory:
+                for key, digest in self._read_log('index', shard):
+                    if digest is None:
+                        entries.pop(key, None)
+                    else:
+                        entries[key] = digest
+            self._index[shard] = entries
+        return self._index[shard]
+
+    def _verdict_shard(self, doc_id: str) -> Dict[Tuple[str, str], tuple]:
+        shard = _shard_of(doc_id)
+        if shard not in self._verdicts:
+            entries = {}
+            if self.directory:
+                for key, digest, ok, reason, forgery in self._read_log('verified', shard):
+                    entries[(key, digest)] = (ok, reason, forgery)
+            self._verdicts[shard] = entries
+        return self._verdicts[shard]
+
+    # --- objetos ---
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'objects', digest[:2], digest[2:4], f"{digest}.json")
+
+    def _load_object(self, digest: str) -> bytes:
+        if digest in self._recent:
+            self._recent.move_to_end(digest)
+            return self._recent[digest]
+        if not self.directory:
+            return self._objects[digest]
+        with open(self._object_path(digest), 'rb') as f:
+            data = f.read()
+        # O veredito em cache vale para o digest: bytes alterados no disco
+        # nunca podem herdá-lo
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"OBJECT_TAMPERED: conteúdo de {digest} não confere com o endereço")
+        # LRU limitado por bytes; um objeto maior que o limite não entra
+        if len(data) <= self.cache_bytes:
+            self._recent[digest] = data
+            self._recent_bytes += len(data)
+            while self._recent_bytes > self.cache_bytes:
+                self._recent_bytes -= len(self._recent.popitem(last=False)[1])
+        return data
+
+    def _store_object(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        if self.directory:
+            path = self._object_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _write_atomic(path, data)
+        else:
+            self._objects[digest] = data
+        return digest
+
+    # --- MutableMapping ---
+
+    def digest(self, doc_id: str) -> Optional[str]:
+        """Endereço do registro atual de doc_id"""
+        return self._index_shard(doc_id).get(doc_id)
+
+    def __getitem__(self, doc_id: str) -> Dict:
+        digest = self.digest(doc_id)
+        if digest is None:
+            raise KeyError(doc_id)
+        # Cópia nova a cada leitura: alterações do chamador não tocam o registro
+        return json.loads(self._load_object(digest))
+
+    def __setitem__(self, doc_id: str, signed: Dict):
+        data = json.dumps(signed, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        digest = self._store_object(data)
+        shard = self._index_shard(doc_id)
+        if shard.get(doc_id) == digest:
+            return
+        # Objeto gravado antes da entrada no índice: uma queda nunca deixa
+        # o índice apontando para um objeto inexistente
+        if self.directory:
+            self._append_log('index', _shard_of(doc_id), [doc_id, digest])
+        shard[doc_id] = digest
+
+    def __delitem__(self, doc_id: str):
+        shard = self._index_shard(doc_id)
+        if doc_id not in shard:
+            raise KeyError(doc_id)
+        if self.directory:
+            self._append_log('index', _shard_of(doc_id), [doc_id, None])
+        del shard[doc_id]
+
+    def __contains__(self, doc_id) -> bool:
+        return isinstance(doc_id, str) and doc_id in self._index_shard(doc_id)
+
+    def _all_shards(self):
+        for k in range(256):
+            yield self._index_shard(f"{k:02x}")
+
+    def __iter__(self) -> Iterator[str]:
+        if not self.directory:
+            return iter([d for shard in self._index.values() for d in shard])
+        return (doc_id for shard in self._all_shards() for doc_id in list(shard))
+
+    def __len__(self) -> int:
+        if not self.directory:
+            return sum(len(shard) for shard in self._index.values())
+        return sum(len(shard) for shard in self._all_shards())
+
+    # --- cache de verificação ---
+
+    def cached_verdict(self, doc_id: str) -> Optional[Tuple[bool, Optional[str], Optional[str]]]:
+        """(autêntico, motivo, tipo de falsificação) já calculado para a versão atual"""
+        digest = self.digest(doc_id)
+        if digest is None:
+            return None
+        return self._verdict_shard(doc_id).get((doc_id, digest))
+
+    def store_verdict(self, doc_id: str, is_authentic: bool, reason: Optional[str],
+                      forgery_type: Optional[str] = None):
+        digest = self.digest(doc_id)
+        if digest is None:
+            raise KeyError(doc_id)
+        verdict = (is_authentic, reason, forgery_type)
+        shard = self._verdict_shard(doc_id)
+        if shard.get((doc_id, digest)) == verdict:
+            return
+        if self.directory:
+            self._append_log('verified', _shard_of(doc_id), [doc_id, digest, *verdict])
+        shard[(doc_id, digest)] = verdict
+
+
 # ===== INTEGRAÇÃO COM AVALON =====
 
 class AvalonDocumentShield:
@@ -389,9 +722,10 @@ class AvalonDocumentShield:
     Proteção de documentos na rede Avalon
     """
 
-    def __init__(self):
+    def __init__(self, registry_dir: Optional[str] = None):
         self.shield = HarmonicSignatureShield()
-        self.document_registry = {}
+        # Com registry_dir o registro sobrevive a reinícios
+        self.document_registry = DocumentRegistry(registry_dir)
 
     def publish_to_qwan(self, content: str, metadata: Dict) -> str:
         """
@@ -418,6 +752,28 @@ class AvalonDocumentShield:
 
         return doc_id
 
+    def publish_many(self, documents: List[Tuple[str, Dict]]) -> List[str]:
+        """
+        Publica um lote de (content, metadata) com uma única assinatura em lote
+        """
+        qwan = {
+            'network': 'avalon',
+            'protocol_version': 'qhttp-2.0',
+            'entanglement_state': 'GHZ'
+        }
+        # Cópias: os dicionários do chamador não são alterados
+        documents = [(content, {**metadata, 'qwan': dict(qwan)}) for content, metadata in documents]
+
+        doc_ids = []
+        for signed in self.shield.sign_many(documents):
+            doc_id = signed['signature']['hash'][:16]
+            self.document_registry[doc_id] = signed
+            doc_ids.append(doc_id)
+
+        print(f"\n📡 Published {len(doc_ids)} documents to QWAN")
+
+        return doc_ids
+
     def retrieve_from_qwan(self, doc_id: str) -> Optional[Dict]:
         """
         Recupera e verifica documento da QWAN
@@ -427,16 +783,25 @@ class AvalonDocumentShield:
             print(f"❌ Document {doc_id} not found")
             return None
 
-        signed = self.document_registry[doc_id]
+        try:
+            signed = self.document_registry[doc_id]
+        except ValueError as e:
+            print(f"⚠️  WARNING: Document {doc_id} failed verification!")
+            print(f"   Reason: {e}")
+            return None
 
-        # Verifica integridade
-        is_authentic, reason = self.shield.verify_document(signed)
+        # Verifica integridade (uma vez por versão do documento)
+        verdict = self.document_registry.cached_verdict(doc_id)
+        if verdict is None:
+            is_authentic, reason = self.shield.verify_document(signed)
+            forgery_type = None if is_authentic else self.shield.detect_forgery_type(signed, reason)
+            self.document_registry.store_verdict(doc_id, is_authentic, reason, forgery_type)
+        else:
+            is_authentic, reason, forgery_type = verdict
 
         if not is_authentic:
             print(f"⚠️  WARNING: Document {doc_id} failed verification!")
             print(f"   Reason: {reason}")
-
-            forgery_type = self.shield.detect_forgery_type(signed)
             print(f"   Attack vector: {forgery_type}")
 
             return None
@@ -6,10 +6,22 @@ Inclui o Bloco da Eternidade (Omnigênese)
 
 import hashlib
 import json
+import mmap
+import os
+import struct
 import time
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Sequence
 from dataclasses import dataclass, asdict
 
+import numpy as np
+
+GENESIS_PREV_HASH = '0' * 64
+INITIAL_SATOSHI = 7.28
+
+# Codificação binária canônica: campos do registro + hash_prev (sem hash_self)
+CANONICAL = struct.Struct('<qdqqddddd32s')
+
 @dataclass
 class HandoverRecord:
     """Registro de um handover"""
@@ -29,20 +41,197 @@ class HandoverRecord:
         if self.hash_self is None:
             self.hash_self = self.calculate_hash()
 
-    def calculate_hash(self) -> str:
-        """Calcula hash do bloco"""
+    def calculate_hash(self, binary: bool = False) -> str:
+        """Calcula hash do bloco (texto legado ou codificação binária canônica)"""
+        if binary:
+            return hashlib.sha256(self.canonical_bytes()).hexdigest()
         data = f"{self.block}{self.timestamp}{self.source_node}{self.target_node}"
         data += f"{self.syzygy_before}{self.syzygy_after}{self.satoshi_delta}"
         data += f"{self.phi_source}{self.phi_target}{self.hash_prev}"
         return hashlib.sha256(data.encode()).hexdigest()
 
+    def fields(self) -> tuple:
+        return (self.block, self.timestamp, self.source_node, self.target_node,
+                self.syzygy_before, self.syzygy_after, self.satoshi_delta,
+                self.phi_source, self.phi_target, self.hash_prev)
+
+    def canonical_bytes(self) -> bytes:
+        return CANONICAL.pack(*self.fields()[:-1], bytes.fromhex(self.hash_prev))
+
+def _text_digest(fields: Sequence) -> bytes:
+    return hashlib.sha256("".join(map(str, fields)).encode()).digest()
+
+def _digest_fields(rows: List[tuple], binary: bool) -> bytes:
+    """Worker: digests SHA-256 concatenados de registros em forma de tupla"""
+    out = bytearray()
+    for row in rows:
+        if binary:
+            out += hashlib.sha256(CANONICAL.pack(*row[:-1], bytes.fromhex(row[-1]))).digest()
+        else:
+            out += _text_digest(row)
+    return bytes(out)
+
+def _digest_segment(path: str, start: int, stop: int, stride: int, binary: bool) -> bytes:
+    """Worker: digests dos registros [start, stop) lidos direto do segmento via mmap"""
+    out = bytearray()
+    size = CANONICAL.size
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            for off in range(start * stride, stop * stride, stride):
+                if binary:
+                    out += hashlib.sha256(view[off:off + size]).digest()
+                else:
+                    *head, prev = CANONICAL.unpack_from(mm, off)
+                    out += _text_digest((*head, prev.hex()))
+        finally:
+            view.release()
+    return bytes(out)
+
+def _run_digest_jobs(fn, jobs: List[tuple], workers: Optional[int]) -> bytes:
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return b"".join(fn(*job) for job in jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return b"".join(pool.map(fn, *zip(*jobs)))
+
+def _first_invalid(prev: np.ndarray, own: np.ndarray, digests: bytes, first_prev: str) -> int:
+    """Índice do primeiro registro com hash_self ou elo hash_prev inválido (len se nenhum)"""
+    computed = np.frombuffer(digests, dtype=np.uint8).reshape(-1, 32)
+    expected_prev = np.empty_like(own)
+    if own.shape[0]:
+        expected_prev[0] = np.frombuffer(bytes.fromhex(first_prev), dtype=np.uint8)
+        expected_prev[1:] = own[:-1]
+    bad = np.flatnonzero(~((computed == own).all(axis=1) & (prev == expected_prev).all(axis=1)))
+    return int(bad[0]) if bad.size else own.shape[0]
+
+def _links_valid(prev: np.ndarray, own: np.ndarray, digests: bytes, first_prev: str) -> bool:
+    """Compara hash_self recalculados e os elos hash_prev numa única operação"""
+    return _first_invalid(prev, own, digests, first_prev) == own.shape[0]
+
+def _hex_column(hashes: List[str]) -> np.ndarray:
+    return np.frombuffer(bytes.fromhex("".join(hashes)), dtype=np.uint8).reshape(-1, 32)
+
+def _leaf_hash(digest: bytes) -> bytes:
+    return hashlib.sha256(b'\x00' + digest).digest()
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+def _split(n: int) -> int:
+    """Maior potência de 2 estritamente menor que n (RFC 6962)"""
+    return 1 << ((n - 1).bit_length() - 1)
+
+class MerkleAccumulator:
+    """
+    Acumulador Merkle incremental (árvore RFC 6962) sobre os hash_self do ledger.
+    Guarda as subárvores perfeitas de cada nível, logo append é O(1) amortizado
+    e provas de inclusão/intervalo têm O(log n) elementos.
+    """
+
+    def __init__(self):
+        self.levels: List[bytearray] = [bytearray()]
+        self.size = 0
+
+    def append(self, hash_self: str):
+        self.append_digest(bytes.fromhex(hash_self))
+
+    def append_digest(self, digest: bytes):
+        node, i, k = _leaf_hash(digest), self.size, 0
+        while True:
+            if len(self.levels) == k:
+                self.levels.append(bytearray())
+            self.levels[k] += node
+            if not i & 1:
+                break
+            node = _node_hash(self._node(k, i - 1), node)
+            i >>= 1
+            k += 1
+        self.size += 1
+
+    def _node(self, k: int, i: int) -> bytes:
+        return bytes(self.levels[k][32 * i:32 * i + 32])
+
+    def _subtree(self, lo: int, hi: int) -> bytes:
+        n = hi - lo
+        if n & (n - 1) == 0:
+            k = n.bit_length() - 1
+            return self._node(k, lo >> k)
+        k = _split(n)
+        return _node_hash(self._subtree(lo, lo + k), self._subtree(lo + k, hi))
+
+    def root(self, size: Optional[int] = None) -> str:
+        size = self.size if size is None else size
+        if size == 0:
+            return hashlib.sha256(b'').hexdigest()
+        return self._subtree(0, size).hex()
+
+    def range_proof(self, start: int, stop: int, size: Optional[int] = None) -> List[str]:
+        """Hashes das subárvores fora de [start, stop), na ordem da travessia"""
+        size = self.size if size is None else size
+        if not 0 <= start < stop <= size:
+            raise IndexError("invalid block range")
+        proof: List[bytes] = []
+
+        def walk(a: int, b: int):
+            if stop <= a or b <= start:
+                proof.append(self._subtree(a, b))
+            elif not (start <= a and b <= stop):
+                k = _split(b - a)
+                walk(a, a + k)
+                walk(a + k, b)
+
+        walk(0, size)
+        return [p.hex() for p in proof]
+
+    @staticmethod
+    def verify_range(hashes: List[str], start: int, size: int,
+                     proof: List[str], root: str) -> bool:
+        """Recalcula a raiz a partir dos hash_self de [start, start+len) e da prova"""
+        stop = start + len(hashes)
+        if not hashes or stop > size:
+            return False
+        leaves = [_leaf_hash(bytes.fromhex(h)) for h in hashes]
+        siblings = iter(bytes.fromhex(p) for p in proof)
+
+        def mth(a: int, b: int) -> bytes:
+            if b - a == 1:
+                return leaves[a - start]
+            k = _split(b - a)
+            return _node_hash(mth(a, a + k), mth(a + k, b))
+
+        def walk(a: int, b: int) -> bytes:
+            if stop <= a or b <= start:
+                return next(siblings)
+            if start <= a and b <= stop:
+                return mth(a, b)
+            k = _split(b - a)
+            return _node_hash(walk(a, a + k), walk(a + k, b))
+
+        try:
+            computed = walk(0, size)
+        except StopIteration:
+            return False
+        return next(siblings, None) is None and computed.hex() == root
+
 class ArkheLedger:
     """Ledger imutável do sistema Arkhe"""
 
-    def __init__(self):
+    def __init__(self, binary_hash: bool = False):
         self.blocks: List[HandoverRecord] = []
-        self.current_satoshi = 7.28
+        self.current_satoshi = INITIAL_SATOSHI
         self.current_block = 0
+        self.binary_hash = binary_hash
+        self._merkle: Optional[MerkleAccumulator] = None
+
+    @property
+    def merkle(self) -> MerkleAccumulator:
+        """Acumulador Merkle dos blocos (construído na primeira utilização)"""
+        if self._merkle is None:
+            self._merkle = MerkleAccumulator()
+            for record in self.blocks:
+                self._merkle.append(record.hash_self)
+        return self._merkle
 
     def add_handover(self, source: int, target: int,
                      syzygy_before: float, syzygy_after: float,
@@ -51,7 +240,7 @@ class ArkheLedger:
         delta_satoshi = syzygy_after * 0.001
         self.current_satoshi += delta_satoshi
 
-        prev_hash = self.blocks[-1].hash_self if self.blocks else '0'*64
+        prev_hash = self._tail_hash()
 
         record = HandoverRecord(
             block=self.current_block,
@@ -63,13 +252,45 @@ class ArkheLedger:
             satoshi_delta=delta_satoshi,
             phi_source=phi_s,
             phi_target=phi_t,
-            hash_prev=prev_hash
+            hash_prev=prev_hash,
+            hash_self="" if self.binary_hash else None
         )
+        if self.binary_hash:
+            record.hash_self = record.calculate_hash(binary=True)
 
         self.blocks.append(record)
         self.current_block += 1
+        if self._merkle is not None:
+            self._merkle.append(record.hash_self)
         return record
 
+    def _tail_hash(self) -> str:
+        """hash_self do último bloco (ou o hash gênese)"""
+        return self.blocks[-1].hash_self if len(self.blocks) else GENESIS_PREV_HASH
+
+    def range_proof(self, start: int, stop: int) -> Dict[str, Any]:
+        """Prova de que os blocos [start, stop) pertencem à raiz Merkle atual"""
+        acc = self.merkle
+        return {
+            "start": start,
+            "hashes": [self.blocks[i].hash_self for i in range(start, stop)],
+            "tree_size": acc.size,
+            "proof": acc.range_proof(start, stop),
+            "root": acc.root(),
+        }
+
+    def inclusion_proof(self, block: int) -> Dict[str, Any]:
+        """Prova O(log n) de inclusão de um único bloco"""
+        return self.range_proof(block, block + 1)
+
+    @staticmethod
+    def verify_proof(proof: Dict[str, Any], root: Optional[str] = None) -> bool:
+        """Verifica uma prova de inclusão/intervalo (contra root, se dada)"""
+        if root is not None and root != proof["root"]:
+            return False
+        return MerkleAccumulator.verify_range(proof["hashes"], proof["start"],
+                                              proof["tree_size"], proof["proof"], proof["root"])
+
     def seal_omnigenesis(self) -> Dict:
         """Sela o ledger com o Bloco da Eternidade (Omnigênese)"""
         final_block = {
@@ -78,6 +299,8 @@ class ArkheLedger:
             "type": "OMNIGENESIS_COMPLETION",
             "documentation_status": "SEALED",
             "final_satoshi": self.current_satoshi,
+            "merkle_root": self.merkle.root(),
+            "merkle_size": self.merkle.size,
             "message": "A documentação completa do Sistema Arkhe(N) OS está selada. A prática é eterna."
         }
         return final_block
@@ -87,10 +310,256 @@ class ArkheLedger:
         for i in range(1, len(self.blocks)):
             if self.blocks[i].hash_prev != self.blocks[i-1].hash_self:
                 return False
-            if self.blocks[i].calculate_hash() != self.blocks[i].hash_self:
+            if self.blocks[i].calculate_hash(self.binary_hash) != self.blocks[i].hash_self:
                 return False
         return True
 
+    def verify_integrity_parallel(self, workers: Optional[int] = None,
+                                  chunk_size: int = 50000) -> bool:
+        """
+        Verifica a cadeia em paralelo: os self-hashes são recalculados em
+        blocos num pool de processos e os elos hash_prev comparados de uma vez.
+        """
+        blocks = self.blocks
+        if not blocks:
+            return True
+        prev = _hex_column([b.hash_prev for b in blocks])
+        own = _hex_column([b.hash_self for b in blocks])
+        jobs = [([b.fields() for b in blocks[i:i + chunk_size]], self.binary_hash)
+                for i in range(0, len(blocks), chunk_size)]
+        digests = _run_digest_jobs(_digest_fields, jobs, workers)
+        return _links_valid(prev, own, digests, GENESIS_PREV_HASH)
+
+class HandoverSegment:
+    """
+    Segmento append-only de registros binários de largura fixa.
+    Leitura via mmap com acesso O(1) por número de bloco.
+    """
+    RECORD = struct.Struct(CANONICAL.format + '32s')
+    DTYPE = np.dtype([('block', '<i8'), ('timestamp', '<f8'),
+                      ('source_node', '<i8'), ('target_node', '<i8'),
+                      ('syzygy_before', '<f8'), ('syzygy_after', '<f8'),
+                      ('satoshi_delta', '<f8'), ('phi_source', '<f8'), ('phi_target', '<f8'),
+                      ('hash_prev', 'u1', (32,)), ('hash_self', 'u1', (32,))])
+
+    def __init__(self, path: str, sync: bool = False):
+        self.path = path
+        self.sync = sync
+        self._file = open(path, 'ab')
+        size = os.path.getsize(path)
+        if size % self.RECORD.size:
+            # Registro parcial de uma escrita interrompida: descarta a cauda
+            self._file.truncate(size - size % self.RECORD.size)
+        self._count = os.path.getsize(path) // self.RECORD.size
+        self._map: Optional[mmap.mmap] = None
+        self._mapped = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.flush()
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped = self._count
+
+    def _unpack(self, i: int) -> tuple:
+        if i >= self._mapped:
+            self._remap()
+        return self.RECORD.unpack_from(self._map, i * self.RECORD.size)
+
+    def __getitem__(self, i: int) -> HandoverRecord:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("block out of range")
+        (block, ts, src, tgt, syz_b, syz_a, sat, phi_s, phi_t,
+         prev, own) = self._unpack(i)
+        return HandoverRecord(
+            block=block, timestamp=ts, source_node=src, target_node=tgt,
+            syzygy_before=syz_b, syzygy_after=syz_a, satoshi_delta=sat,
+            phi_source=phi_s, phi_target=phi_t,
+            hash_prev=prev.hex(), hash_self=own.hex()
+        )
+
+    def __iter__(self) -> Iterator[HandoverRecord]:
+        for i in range(self._count):
+            yield self[i]
+
+    def hash_self_at(self, i: int) -> str:
+        return self._unpack(i)[-1].hex()
+
+    def columns(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Registros [start, stop) como array estruturado (cópia)"""
+        stop = self._count if stop is None else stop
+        if stop > self._mapped:
+            self._remap()
+        if stop <= start:
+            return np.empty(0, dtype=self.DTYPE)
+        size = self.RECORD.size
+        return np.frombuffer(self._map[start * size:stop * size], dtype=self.DTYPE)
+
+    def append(self, record: HandoverRecord):
+        self._file.write(record.canonical_bytes() + bytes.fromhex(record.hash_self))
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self._count += 1
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+class PersistentArkheLedger(ArkheLedger):
+    """
+    Ledger em disco: segmento append-only + checkpoints do prefixo verificado.
+    verify_integrity() retoma do último checkpoint em O(blocos novos).
+    """
+    SEGMENT_FILE = "handovers.seg"
+    CHECKPOINT_FILE = "checkpoint.json"
+
+    META_FILE = "ledger.json"
+
+    def __init__(self, directory: str, checkpoint_interval: int = 10000, sync: bool = False,
+                 binary_hash: bool = False):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        meta_path = os.path.join(directory, self.META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                binary_hash = json.load(f)["binary_hash"]
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump({"binary_hash": binary_hash}, f)
+        self.binary_hash = binary_hash
+        self.checkpoint_interval = checkpoint_interval
+        self.blocks = HandoverSegment(os.path.join(directory, self.SEGMENT_FILE), sync=sync)
+        self.checkpoint = self._load_checkpoint()
+        self.current_block = len(self.blocks)
+        # Último hash_self em memória: add_handover não relê (nem remapeia) o segmento
+        self._tail = self.blocks.hash_self_at(len(self.blocks) - 1) if len(self.blocks) else GENESIS_PREV_HASH
+
+        # Satoshi: valor do checkpoint + deltas dos blocos posteriores
+        start = 0
+        if self.checkpoint and self.checkpoint["blocks"] <= len(self.blocks):
+            self.current_satoshi = self.checkpoint["satoshi"]
+            start = self.checkpoint["blocks"]
+        for i in range(start, len(self.blocks)):
+            self.current_satoshi += self.blocks[i].satoshi_delta
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.directory, self.CHECKPOINT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_checkpoint(self, blocks: int, hash_self: str, satoshi: float):
+        self.checkpoint = {"blocks": blocks, "hash": hash_self, "satoshi": satoshi}
+        path = os.path.join(self.directory, self.CHECKPOINT_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def add_handover(self, source: int, target: int,
+                     syzygy_before: float, syzygy_after: float,
+                     phi_s: float, phi_t: float) -> HandoverRecord:
+        record = super().add_handover(int(source), int(target), float(syzygy_before),
+                                      float(syzygy_after), float(phi_s), float(phi_t))
+        self._tail = record.hash_self
+        return record
+
+    def _tail_hash(self) -> str:
+        return self._tail
+
+    def _resume_point(self, full: bool):
+        """(start, prev_hash, satoshi) de onde retomar, ou None se o prefixo foi adulterado"""
+        cp = self.checkpoint
+        if not full and cp and 0 < cp["blocks"] <= len(self.blocks):
+            # O fim do prefixo verificado precisa continuar intacto
+            if self.blocks.hash_self_at(cp["blocks"] - 1) != cp["hash"]:
+                return None
+            return cp["blocks"], cp["hash"], cp["satoshi"]
+        return 0, GENESIS_PREV_HASH, INITIAL_SATOSHI
+
+    def verify_integrity(self, full: bool = False) -> bool:
+        """
+        Verifica a cadeia a partir do último checkpoint (ou do bloco 0 se full).
+        Grava novos checkpoints a cada checkpoint_interval blocos verificados.
+        """
+        n = len(self.blocks)
+        resume = self._resume_point(full)
+        if resume is None:
+            return False
+        start, prev_hash, satoshi = resume
+
+        for i in range(start, n):
+            record = self.blocks[i]
+            if record.hash_prev != prev_hash:
+                return False
+            if record.calculate_hash(self.binary_hash) != record.hash_self:
+                return False
+            prev_hash = record.hash_self
+            satoshi += record.satoshi_delta
+            if (i + 1) % self.checkpoint_interval == 0:
+                self._write_checkpoint(i + 1, prev_hash, satoshi)
+
+        if n > start:
+            self._write_checkpoint(n, prev_hash, satoshi)
+        return True
+
+    @property
+    def merkle(self) -> MerkleAccumulator:
+        if self._merkle is None:
+            self._merkle = MerkleAccumulator()
+            for digest in self.blocks.columns()['hash_self']:
+                self._merkle.append_digest(digest.tobytes())
+        return self._merkle
+
+    def verify_integrity_parallel(self, workers: Optional[int] = None,
+                                  chunk_size: int = 50000, full: bool = False) -> bool:
+        """
+        Versão paralela de verify_integrity: cada worker lê o seu intervalo
+        diretamente do segmento, sem serializar registros entre processos.
+        Como na versão sequencial, grava checkpoints a cada
+        checkpoint_interval blocos válidos, mesmo que um bloco posterior falhe.
+        """
+        n = len(self.blocks)
+        resume = self._resume_point(full)
+        if resume is None:
+            return False
+        start, prev_hash, satoshi = resume
+        if n == start:
+            return True
+
+        rows = self.blocks.columns(start, n)
+        jobs = [(self.blocks.path, i, min(i + chunk_size, n), HandoverSegment.RECORD.size,
+                 self.binary_hash) for i in range(start, n, chunk_size)]
+        digests = _run_digest_jobs(_digest_segment, jobs, workers)
+        verified = start + _first_invalid(rows['hash_prev'], rows['hash_self'], digests, prev_hash)
+
+        # Satoshi acumulado após cada bloco (mesma ordem de soma da versão sequencial)
+        satoshis = np.cumsum(np.concatenate([[satoshi], rows['satoshi_delta']]))[1:]
+        first = (start // self.checkpoint_interval + 1) * self.checkpoint_interval
+        for b in range(first, verified + 1, self.checkpoint_interval):
+            self._write_checkpoint(b, rows['hash_self'][b - 1 - start].tobytes().hex(),
+                                   float(satoshis[b - 1 - start]))
+        if verified < n:
+            return False
+        self._write_checkpoint(n, rows['hash_self'][-1].tobytes().hex(), float(satoshis[-1]))
+        return True
+
+    def close(self):
+        self.blocks.close()
+
 if __name__ == "__main__":
     ledger = ArkheLedger()
     for i in range(10):
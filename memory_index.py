@@ -0,0 +1,202 @@
+# memory_index.py
+"""
+Índices vetoriais para as memórias latentes (LatentMemoryBank, SharedMemory).
+
+VectorIndex guarda os embeddings já normalizados em uma matriz float32
+pré-alocada (ou int8 quantizada) que cresce por duplicação, e responde
+consultas por similaridade de cosseno com top-k via argpartition.
+IVFIndex acrescenta um quantizador grosso (k-means): cada consulta só
+varre as `nprobe` listas mais próximas, trocando recall por latência.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Linhas convertidas de int8 para float32 por vez (limita a memória temporária)
+_DEQUANT_BLOCK = 16384
+
+
+class VectorIndex:
+    """Busca exata por cosseno sobre uma matriz normalizada e crescente."""
+
+    def __init__(self, dim: int, capacity: int = 1024, quantize: bool = False):
+        self.dim = dim
+        self.quantize = quantize
+        self._dtype = np.int8 if quantize else np.float32
+        self._matrix = np.zeros((max(capacity, 1), dim), dtype=self._dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _normalize(self, vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if v.shape[0] != self.dim:
+            raise ValueError(f"Embedding com dimensão {v.shape[0]}, esperado {self.dim}")
+        norm = np.linalg.norm(v)
+        return v / norm if norm > 0 else v
+
+    def _encode(self, v: np.ndarray) -> np.ndarray:
+        if self.quantize:
+            return np.clip(np.rint(v * 127.0), -127, 127).astype(np.int8)
+        return v
+
+    def _grow(self):
+        grown = np.zeros((self._matrix.shape[0] * 2, self.dim), dtype=self._dtype)
+        grown[:self._size] = self._matrix[:self._size]
+        self._matrix = grown
+
+    def add(self, vector) -> int:
+        """Adiciona um embedding e retorna sua linha."""
+        if self._size == self._matrix.shape[0]:
+            self._grow()
+        row = self._size
+        self._matrix[row] = self._encode(self._normalize(vector))
+        self._size += 1
+        return row
+
+    def update(self, row: int, vector):
+        """Substitui o embedding de uma linha existente."""
+        if not 0 <= row < self._size:
+            raise IndexError(row)
+        self._matrix[row] = self._encode(self._normalize(vector))
+
+    def vector(self, row: int) -> np.ndarray:
+        v = self._matrix[row].astype(np.float32)
+        return v / 127.0 if self.quantize else v
+
+    def _scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if rows is not None:
+            block = self._matrix[rows]
+            return block.astype(np.float32) @ query if self.quantize else block @ query
+        if not self.quantize:
+            return self._matrix[:self._size] @ query
+        scores = np.empty(self._size, dtype=np.float32)
+        for start in range(0, self._size, _DEQUANT_BLOCK):
+            stop = min(start + _DEQUANT_BLOCK, self._size)
+            scores[start:stop] = self._matrix[start:stop].astype(np.float32) @ query
+        return scores
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+        if top_k >= len(scores):
+            return np.argsort(-scores, kind='stable')
+        part = np.argpartition(-scores, top_k - 1)[:top_k]
+        return part[np.argsort(-scores[part], kind='stable')]
+
+    def search(self, query, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (linhas, similaridades) das top_k memórias mais próximas."""
+        if self._size == 0 or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        q = self._normalize(query)
+        scores = self._scores(q)
+        if self.quantize:
+            scores = scores / 127.0
+        best = self._top_k(scores, top_k)
+        return best.astype(np.int64), scores[best]
+
+
+class IVFIndex(VectorIndex):
+    """
+    Índice aproximado por listas invertidas (IVF).
+
+    Os centróides são treinados por k-means quando há `train_size`
+    vetores e retreinados sempre que o índice dobra de tamanho. nprobe
+    controla o recall: nprobe == nlist equivale à busca exata. Enquanto
+    não há treino, a busca é exata.
+    """
+
+    def __init__(self, dim: int, nlist: int = 64, nprobe: int = 8, capacity: int = 1024,
+                 quantize: bool = False, train_size: Optional[int] = None, seed: int = 0):
+        super().__init__(dim, capacity=capacity, quantize=quantize)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or 8 * nlist
+        self._rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._arrays: List[Optional[np.ndarray]] = []
+        self._assign = np.zeros(self._matrix.shape[0], dtype=np.int32)
+        self._trained_at = 0
+
+    def _grow(self):
+        super()._grow()
+        assign = np.zeros(self._matrix.shape[0], dtype=np.int32)
+        assign[:self._size] = self._assign[:self._size]
+        self._assign = assign
+
+    def train(self, iterations: int = 10):
+        """k-means esférico sobre todos os vetores e redistribuição nas listas."""
+        data = np.stack([self.vector(i) for i in range(self._size)]) if self.quantize \
+            else self._matrix[:self._size]
+        k = min(self.nlist, self._size)
+        centroids = data[self._rng.choice(self._size, k, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            for c in range(k):
+                members = data[labels == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) + 1e-12)
+        self.centroids = centroids
+        labels = np.argmax(data @ centroids.T, axis=1)
+        self._assign[:self._size] = labels
+        self._lists = [np.flatnonzero(labels == c).tolist() for c in range(k)]
+        self._arrays = [None] * k
+        self._trained_at = self._size
+
+    def _place(self, row: int, v: np.ndarray):
+        c = int(np.argmax(self.centroids @ v))
+        self._assign[row] = c
+        self._lists[c].append(row)
+        self._arrays[c] = None
+
+    def add(self, vector) -> int:
+        row = super().add(vector)
+        if self.centroids is None:
+            if self._size >= self.train_size:
+                self.train()
+        elif self._size >= 2 * self._trained_at:
+            self.train()
+        else:
+            self._place(row, self.vector(row))
+        return row
+
+    def update(self, row: int, vector):
+        super().update(row, vector)
+        if self.centroids is not None:
+            old = int(self._assign[row])
+            self._lists[old].remove(row)
+            self._arrays[old] = None
+            self._place(row, self.vector(row))
+
+    def _rows(self, c: int) -> np.ndarray:
+        if self._arrays[c] is None:
+            self._arrays[c] = np.asarray(self._lists[c], dtype=np.int64)
+        return self._arrays[c]
+
+    def search(self, query, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        if self.centroids is None or self.nprobe >= len(self.centroids):
+            return super().search(query, top_k)
+        if top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        q = self._normalize(query)
+        probes = self._top_k(self.centroids @ q, self.nprobe)
+        rows = np.concatenate([self._rows(c) for c in probes])
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self._scores(q, rows)
+        if self.quantize:
+            scores = scores / 127.0
+        best = self._top_k(scores, top_k)
+        return rows[best], scores[best]
+
+    def estimate_recall(self, queries, top_k: int = 5) -> float:
+        """Fração dos vizinhos exatos recuperados pelas consultas aproximadas."""
+        hits = total = 0
+        for q in queries:
+            exact, _ = VectorIndex.search(self, q, top_k)
+            approx, _ = self.search(q, top_k)
+            hits += len(set(exact.tolist()) & set(approx.tolist()))
+            total += len(exact)
+        return hits / total if total else 1.0
@@ -3,8 +3,8 @@
 # Daemon para Proto‑AGI baseado em ANL
 
 import asyncio
-import threading
 import time
+from collections import deque
 import uvicorn
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
@@ -55,46 +55,92 @@ handover_mb.add_effect(read_from_memory)
 hg.add_handover(handover_mb)
 
 # ======================================================
-# Loop principal (executa em thread separada)
+# Loop principal (tarefa asyncio com taxa fixa)
 # ======================================================
 
 class DaemonLoop:
-    def __init__(self, hypergraph, dt=1.0):
+    """
+    Agenda ticks em t0 + k*dt (sem deriva acumulada). Se um tick passa do
+    prazo, os ticks perdidos são contados em `overruns` e o próximo volta
+    a se alinhar à grade. O cálculo roda em um executor; a publicação do
+    snapshot acontece no loop, então os endpoints leem um estado
+    consistente sem travas.
+    """
+    def __init__(self, hypergraph, dt=1.0, history=4096):
         self.hg = hypergraph
         self.dt = dt
-        self.running = True
-        self.thread = threading.Thread(target=self._run)
-        self.phi_history = []
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self.phi_history = deque(maxlen=history)
+        self.integration = IncrementalIntegration(hypergraph)
+        self.ticks = 0
+        self.overruns = 0
+        self.last_tick_duration = 0.0
+        self.snapshot: Dict[str, Any] = self._make_snapshot(0.0)
+        self._phi_snapshot: tuple = ()
+        self._phi_snapshot_tick = 0
 
     def start(self):
-        self.thread.start()
+        self.running = True
+        self.task = asyncio.get_running_loop().create_task(self._run())
 
-    def stop(self):
+    async def stop(self):
         self.running = False
-        self.thread.join()
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    def _tick(self):
+        # Evoluir sistema e calcular φ (integração de informação)
+        self.hg.evolve(self.dt, steps=1)
+        return self.integration.update()
+
+    def _make_snapshot(self, phi):
+        return {
+            "nodes": len(self.hg.nodes),
+            "handovers": len(self.hg.handovers),
+            "global_coherence": float(self.hg.global_coherence),
+            "last_phi": float(phi),
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "tick_duration": self.last_tick_duration,
+        }
 
-    def _run(self):
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
         step = 0
         while self.running:
-            # Evoluir sistema
-            self.hg.evolve(self.dt, steps=1)
-            # Calcular φ (integração de informação)
-            phi = self.hg.compute_integration()
+            began = loop.time()
+            phi = await loop.run_in_executor(None, self._tick)
+            self.last_tick_duration = loop.time() - began
+            self.ticks += 1
             self.phi_history.append((time.time(), phi))
+            self.snapshot = self._make_snapshot(phi)
             step += 1
-            time.sleep(self.dt)
+            deadline = start + step * self.dt
+            now = loop.time()
+            if now > deadline:
+                missed = int((now - deadline) // self.dt) + 1
+                self.overruns += missed
+                step += missed
+                deadline = start + step * self.dt
+            await asyncio.sleep(deadline - now)
 
     def get_status(self):
-        return {
-            "nodes": len(self.hg.nodes),
-            "handovers": len(self.hg.handovers),
-            "global_coherence": float(self.hg.global_coherence),
-            "last_phi": float(self.phi_history[-1][1]) if self.phi_history else 0.0
-        }
+        return self.snapshot
+
+    def get_phi_history(self):
+        # Cópia imutável do histórico, refeita no máximo uma vez por tick
+        if self._phi_snapshot_tick != self.ticks:
+            self._phi_snapshot = tuple(self.phi_history)
+            self._phi_snapshot_tick = self.ticks
+        return self._phi_snapshot
 
-# Iniciar loop
 daemon = DaemonLoop(hg, dt=1.0)
-daemon.start()
 
 # ======================================================
 # API REST (FastAPI)
@@ -169,11 +215,15 @@ async def memory_query(req: MemoryQueryRequest):
 
 @app.get("/phi")
 async def get_phi():
-    return {"phi_history": daemon.phi_history}
+    return {"phi_history": daemon.get_phi_history()}
+
+@app.on_event("startup")
+async def startup_event():
+    daemon.start()
 
 @app.on_event("shutdown")
-def shutdown_event():
-    daemon.stop()
+async def shutdown_event():
+    await daemon.stop()
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,88 @@
+# test_anl_compiler.py
+import glob
+import json
+import os
+import anl_compiler
+from anl_compiler import (AIRCache, air_path, build_anl, compile_anl_file, compile_anl_v02,
+                          hg_to_air, parse_anl)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SNIPPET = """
+// comentário com node Falso { }
+import Outro.*;
+namespace A {
+    enum Cor { Vermelho; Verde { peso = 2; }; }
+    node Base { attributes { int x = 1; } }
+    node Filho : Base {
+        attributes { float y = 0.5; string s; }
+        dynamics { y' = -y; }
+        function f(int a) -> int { return a; }
+    }
+    handover Mover (Filho a, Base b) { protocol: conservative; condition: a.y > 0; effects { b.x = 0; } }
+}
+/* bloco
+   handover Fantasma (X a, Y b) { } */
+dynamic Global { x' = 1; }
+node Solto { attributes { int z = 3; } }
+constraint Limite { mode: static; check: z < 10; on_violation: halt; }
+hypothesis H { prevê tudo; }
+handover Ligar (Solto s, A.Filho f) { protocol: quantum; }
+"""
+
+def test_parser_matches_reference_compiler():
+    sources = [SNIPPET] + [open(f).read() for f in sorted(glob.glob(os.path.join(HERE, "*.anl")))]
+    for code in sources:
+        assert hg_to_air(parse_anl(code)) == hg_to_air(compile_anl_v02(code))
+
+def test_parser_many_declarations():
+    code = "\n".join(f"node N{i} {{ attributes {{ int v = {i}; }} }}\n"
+                     f"handover H{i} (N{i} a, N{i + 1} b) {{ protocol: creative; }}" for i in range(500))
+    air = hg_to_air(parse_anl(code))
+    assert air == hg_to_air(compile_anl_v02(code))
+    assert len(air["hypergraph"]["nodes"]) == 500
+    assert air["hypergraph"]["handovers"][-1]["target"] == "N500"
+
+def test_cache_skips_recompilation(tmp_path, monkeypatch):
+    source = tmp_path / "modelo.anl"
+    source.write_text(SNIPPET)
+    cache = AIRCache(str(tmp_path / "cache"))
+    air = compile_anl_file(str(source), cache=cache)
+    assert os.path.exists(cache.path(cache.key(SNIPPET)))
+
+    def fail(code):
+        raise AssertionError("fonte inalterada não deveria ser recompilada")
+    monkeypatch.setattr(anl_compiler, "parse_anl", fail)
+    assert compile_anl_file(str(source), cache=cache) == air
+
+    source.write_text(SNIPPET + "\nnode Novo { attributes { int n = 1; } }\n")
+    monkeypatch.undo()
+    changed = compile_anl_file(str(source), cache=cache)
+    assert changed["hypergraph"]["nodes"][-1]["id"] == "Novo"
+
+def test_incremental_build_tracks_imports(tmp_path):
+    base = tmp_path / "base.anl"
+    user = tmp_path / "user.anl"
+    other = tmp_path / "other.anl"
+    base.write_text("namespace Base { node B { attributes { int v = 1; } } }")
+    user.write_text("namespace User { import Base.*; node U { attributes { int w = 2; } } }")
+    other.write_text("node O { attributes { int o = 3; } }")
+    sources = [str(base), str(user), str(other)]
+    manifest = str(tmp_path / "build.json")
+
+    first = build_anl(sources, workers=2, manifest=manifest, cache_dir=None)
+    assert sorted(first["compiled"]) == sorted(sources) and not first["failed"]
+    with open(air_path(str(user))) as f:
+        assert json.load(f)["hypergraph"]["nodes"][0]["id"] == "User.U"
+
+    assert build_anl(sources, manifest=manifest, cache_dir=None)["compiled"] == []
+
+    base.write_text("namespace Base { node B { attributes { int v = 5; } } }")
+    rebuilt = build_anl(sources, manifest=manifest, cache_dir=None)
+    assert sorted(rebuilt["compiled"]) == sorted([str(base), str(user)])
+    assert rebuilt["skipped"] == [str(other)]
+
+if __name__ == "__main__":
+    import sys
+    import pytest
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,33 @@
+# test_anl_integration.py
+import numpy as np
+from anl import Hypergraph, IncrementalIntegration, Node, StateSpace
+
+def test_incremental_phi_matches_full_recompute():
+    rng = np.random.default_rng(3)
+    space = StateSpace(12, "euclidean", "real")
+    hg = Hypergraph("phi")
+    for i in range(60):
+        hg.add_node(Node(f"n{i}", space, rng.standard_normal(12)))
+    tracker = IncrementalIntegration(hg, rebuild_every=16)
+    for _ in range(40):
+        for i in rng.choice(60, 3, replace=False):
+            hg.nodes[f"n{i}"].state = rng.standard_normal(12)
+        assert np.isclose(tracker.update(), hg.compute_integration(), atol=1e-10)
+
+def test_incremental_phi_degenerate_and_new_nodes():
+    space = StateSpace(1, "euclidean", "real")
+    hg = Hypergraph("scalars")
+    hg.add_node(Node("a", space, 0)).add_node(Node("b", space, 1))
+    tracker = IncrementalIntegration(hg)
+    # Estados escalares têm variância nula: compute_integration devolve 0
+    assert tracker.update() == hg.compute_integration() == 0.0
+    vec = StateSpace(4, "euclidean", "real")
+    hg.nodes.clear()
+    hg.add_node(Node("x", vec, np.arange(4.0))).add_node(Node("y", vec, -np.arange(4.0)))
+    assert np.isclose(tracker.update(), hg.compute_integration())
+    hg.nodes["y"].state = np.array([1.0, 1.0, 1.0, 1.0])
+    assert tracker.update() == 0.0
+
+if __name__ == "__main__":
+    test_incremental_phi_matches_full_recompute()
+    test_incremental_phi_degenerate_and_new_nodes()
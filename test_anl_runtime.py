@@ -0,0 +1,59 @@
+# test_anl_runtime.py
+import numpy as np
+import pytest
+from anl_runtime import ANLType, ANLValue, ExpressionEngine, RK4Integrator, RK45Integrator
+
+def test_constants_do_not_clobber_function_names():
+    engine = ExpressionEngine()
+    ctx = {'x': ANLValue(ANLType.SCALAR, (), 0.3)}
+    f = engine.parse("cos(x) + c / c + pi", ctx)
+    assert np.isclose(f(), np.cos(0.3) + 1 + np.pi)
+    # Variável do contexto tem precedência sobre a constante homônima
+    assert engine.parse("c * 2", {'c': ANLValue(ANLType.SCALAR, (), 3.0)})() == 6.0
+
+def test_einstein_notation_and_vectorized_evaluation():
+    engine = ExpressionEngine()
+    g = ANLValue(ANLType.TENSOR, (4, 4), np.diag([-1.0, 1.0, 1.0, 1.0]))
+    f = engine.parse("g_mu_nu + g_0_0", {'g': g})
+    assert f({'g': g, 'mu': 2, 'nu': 2}) == 0.0
+    xs = np.linspace(0, 1, 5)
+    h = engine.parse("exp(x) * 2", {'x': ANLValue(ANLType.VECTOR, (5,), xs)})
+    assert np.allclose(h(), np.exp(xs) * 2)
+
+def test_compiled_code_is_cached_by_schema():
+    engine = ExpressionEngine()
+    scalar = {'x': ANLValue(ANLType.SCALAR, (), 1.0)}
+    engine.parse("x + 1", scalar)
+    code = engine.compile("x + 1", {'x': ANLValue(ANLType.SCALAR, (), 5.0)})
+    assert len(engine._compiled) == 1
+    assert engine.compile("x + 1", scalar) is code
+    engine.compile("x + 1", {'x': ANLValue(ANLType.TENSOR, (2,), np.zeros(2))})
+    assert len(engine._compiled) == 2
+
+def test_quadrature_and_expression_integrate():
+    engine = ExpressionEngine()
+    assert np.isclose(engine._integrate(np.cos, 0, np.pi / 2), 1.0, atol=1e-6)
+    assert np.isclose(engine._integrate(np.cos, 0, np.pi / 2, method='rk4'), 1.0, atol=1e-9)
+    assert np.isclose(engine.parse("integrate(exp, 0, 1)", {})(), np.e - 1, atol=1e-6)
+    assert np.isclose(engine._integrate(np.cos, 0, np.pi / 2, rtol=1e-10), 1.0, atol=1e-9)
+    with pytest.raises(TypeError, match="rk4"):
+        engine._integrate(np.cos, 0, 1, method='rk4', rtol=1e-8)
+
+def test_batched_oscillator_trajectories():
+    n = 2000
+    y0 = np.column_stack([np.linspace(-1, 1, n), np.zeros(n)])
+    f = lambda t, y: np.column_stack([y[:, 1], -y[:, 0]])
+    exact = y0[:, 0] * np.cos(5.0)
+    adaptive = RK45Integrator(rtol=1e-8, atol=1e-10).solve(f, 0.0, 5.0, y0)
+    fixed = RK4Integrator().solve(f, 0.0, 5.0, y0, dt=0.01)
+    assert adaptive.y.shape == (n, 2)
+    assert np.allclose(adaptive.y[:, 0], exact, atol=1e-6)
+    assert np.allclose(fixed.y[:, 0], exact, atol=1e-6)
+    assert adaptive.nfev < fixed.nfev
+
+if __name__ == "__main__":
+    test_constants_do_not_clobber_function_names()
+    test_einstein_notation_and_vectorized_evaluation()
+    test_compiled_code_is_cached_by_schema()
+    test_quadrature_and_expression_integrate()
+    test_batched_oscillator_trajectories()
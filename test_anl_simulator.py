@@ -0,0 +1,85 @@
+# test_anl_simulator.py
+import glob
+import json
+import os
+import numpy as np
+from anl_compiler import hg_to_air, parse_anl
+from anl_simulator import AIREngine
+
+MODEL = """
+node Coelho {
+    attributes { float energia = 10.0; vector[2] pos = [0.0, 0.0]; }
+    dynamics { energia -= 0.1 * dt; }
+}
+node Grama {
+    attributes { float biomassa = 100.0; vector[2] pos = [0.5, 0.5]; }
+    dynamics { biomassa += 0.05 * (100.0 - biomassa); }
+}
+handover Comer (Coelho c, Grama g) {
+    condition: distance(c.pos, g.pos) < 1.0 && c.energia < 50;
+    effects {
+        c.energia += 2.0;
+        g.biomassa -= 1.0;
+    }
+}
+"""
+
+def test_engine_packs_attributes_and_runs_kernels():
+    engine = AIREngine(hg_to_air(parse_anl(MODEL)), replicas={'Coelho': 4})
+    assert engine.columns['pos'].shape == (5, 2)
+    assert not engine.unsupported
+    engine.step(dt=1.0)
+    assert np.allclose(engine.get('Coelho', 'energia'), 10.0 - 0.1 + 2.0)
+    # Quatro coelhos comem da mesma grama: os decrementos se acumulam
+    assert np.allclose(engine.get('Grama', 'biomassa'), 100.0 - 4.0)
+
+def test_engine_condition_masks_instances():
+    air = hg_to_air(parse_anl(MODEL))
+    engine = AIREngine(air, replicas={'Coelho': 1000})
+    engine.columns['pos'][engine.rows['Coelho']][:500] = 10.0
+    stats = engine.run(3)
+    energia = engine.get('Coelho', 'energia')
+    assert np.allclose(energia[:500], 10.0 - 0.3)
+    assert np.allclose(energia[500:], 10.0 - 0.3 + 6.0)
+    assert stats['ticks'] == 3 and stats['nodes'] == 1001
+
+def test_engine_runs_every_committed_air_model():
+    here = os.path.dirname(os.path.abspath(__file__))
+    ran = 0
+    for path in sorted(glob.glob(os.path.join(here, "*.air.json"))):
+        try:
+            with open(path) as f:
+                air = json.load(f)
+        except ValueError:
+            continue  # AIR truncado no repositório
+        engine = AIREngine(air)
+        engine.run(3)
+        assert engine.ticks == 3, path
+        ran += 1
+    assert ran >= 8
+
+def test_unsupported_statements_are_reported_at_compile_time():
+    model = """
+node Agente {
+    attributes { float energia = 1.0; string nome = "a"; }
+    dynamics { energia -= 0.1 * dt; }
+}
+handover Ler (Agente a, Agente b) {
+    condition: a.nome == true;
+    effects { b.energia += 1.0; }
+}
+handover Vazio (Agente a, Agente b) {
+    effects { a.nome = 1.0; b.energia += 0.5; }
+}
+"""
+    engine = AIREngine(hg_to_air(parse_anl(model)))
+    assert any(u.startswith("Ler.condition") and "a.nome" in u for u in engine.unsupported)
+    assert any(u.startswith("Vazio.effects") and "a.nome" in u for u in engine.unsupported)
+    engine.step(dt=1.0)
+    assert np.allclose(engine.get('Agente', 'energia'), 1.0 - 0.1 + 0.5)
+
+if __name__ == "__main__":
+    test_engine_packs_attributes_and_runs_kernels()
+    test_engine_condition_masks_instances()
+    test_engine_runs_every_committed_air_model()
+    test_unsupported_statements_are_reported_at_compile_time()
@@ -0,0 +1,120 @@
+# test_arkhe_core.py
+import copy
+import numpy as np
+from scipy import sparse
+from arkhe_core import (Hypergraph, GradientEngine, NodeState,
+                        effective_dimension, estimate_effective_dimension)
+
+def reference_gradients(nodes):
+    n = len(nodes)
+    G = np.zeros((n, n))
+    for i in range(n):
+        for j in range(i + 1, n):
+            delta_C = abs(nodes[j].C - nodes[i].C)
+            dist = np.sqrt((nodes[j].x - nodes[i].x)**2 +
+                           (nodes[j].y - nodes[i].y)**2 +
+                           (nodes[j].z - nodes[i].z)**2)
+            if dist > 0.01:
+                G[i, j] = G[j, i] = delta_C / dist
+    return G
+
+def test_dense_gradients_match_reference():
+    hg = Hypergraph(num_nodes=150)
+    expected = reference_gradients(hg.nodes)
+    G = hg.compute_gradients(block_size=32)
+    assert np.allclose(G, expected)
+
+def test_float32_gradients():
+    hg = Hypergraph(num_nodes=100)
+    G64 = hg.compute_gradients()
+    G32 = hg.compute_gradients(dtype=np.float32)
+    assert G32.dtype == np.float32
+    assert np.allclose(G32, G64, rtol=1e-4, atol=1e-7)
+
+def test_sparse_gradients_radius_cutoff():
+    hg = Hypergraph(num_nodes=120)
+    engine = GradientEngine.from_nodes(hg.nodes)
+    dense = engine.dense()
+    radius = 8.0
+    S = engine.sparse(radius)
+    pos = engine.pos
+    dist = np.linalg.norm(pos[:, None, :] - pos[None, :, :], axis=2)
+    expected = np.where(dist <= radius, dense, 0.0)
+    assert np.allclose(S.toarray(), expected)
+
+    hg.compute_gradients(radius=radius)
+    assert hg.get_effective_dimension() > 0
+
+def test_node_store_view_api():
+    hg = Hypergraph(num_nodes=10)
+    node = hg.nodes[3]
+    assert isinstance(node, NodeState)
+    node.C, node.F = 2.0, 2.0
+    node.__post_init__()
+    assert abs(hg.nodes.C[3] - 0.5) < 1e-12
+    assert hg.nodes[-1].id == 9
+    assert len(list(hg.nodes)) == 10
+
+def test_handover_batch_matches_sequential():
+    for handover_count in (82, 765, "∞+54"):
+        np.random.seed(7)
+        hg = Hypergraph(num_nodes=40, handover_count=handover_count)
+        twin = copy.deepcopy(hg)
+        sources = np.arange(0, 20)
+        targets = np.arange(20, 40)
+        phis = np.linspace(0.10, 0.20, 20)
+
+        expected = [hg.handover(int(s), int(t), float(p)) for s, t, p in zip(sources, targets, phis)]
+        result = twin.handover_batch(sources, targets, phis)
+
+        assert np.allclose(result, expected)
+        for col in ("C", "F", "phi", "x"):
+            assert np.allclose(getattr(twin.nodes, col), getattr(hg.nodes, col))
+        assert twin.handover_count == hg.handover_count
+        assert np.isclose(twin.satoshi, hg.satoshi)
+        assert np.isclose(twin.r_rh, hg.r_rh)
+        assert np.isclose(twin.nu_obs, hg.nu_obs)
+        assert np.isclose(twin.t_tunneling, hg.t_tunneling)
+
+def test_agitate_substrate_vectorized():
+    hg = Hypergraph(num_nodes=50)
+    hg.agitate_substrate(0.03)
+    assert np.all(hg.nodes.F <= 0.20)
+    assert np.allclose(hg.nodes.C + hg.nodes.F, 1.0)
+    assert np.all(hg.nodes.phi >= 0.10)
+
+def test_estimate_effective_dimension_dense_and_sparse():
+    rng = np.random.default_rng(0)
+    n = 400
+    Q, _ = np.linalg.qr(rng.normal(size=(n, n)))
+    eigvals = np.concatenate([rng.uniform(0, 2, n // 2), -rng.uniform(0, 1, n // 2)])
+    F = (Q * eigvals) @ Q.T
+    exact, _ = effective_dimension(F, 0.1)
+
+    d_eff, (low, high) = estimate_effective_dimension(F, 0.1, num_probes=60, seed=1)
+    assert low <= d_eff <= high
+    assert abs(d_eff - exact) / exact < 0.05
+
+    D = sparse.diags(eigvals).tocsr()
+    d_sparse, _ = estimate_effective_dimension(D, 0.1, num_probes=60, seed=1)
+    assert abs(d_sparse - exact) / exact < 0.05
+
+def test_get_effective_dimension_switches_to_estimator():
+    np.random.seed(3)  # Hypergraph usa o RNG global
+    hg = Hypergraph(num_nodes=200)
+    exact = hg.get_effective_dimension()
+    assert hg.effective_dimension_ci == (exact, exact)
+    approx = hg.get_effective_dimension(exact=False)
+    low, high = hg.effective_dimension_ci
+    assert low < high
+    assert abs(approx - exact) / exact < 0.15
+
+if __name__ == "__main__":
+    test_dense_gradients_match_reference()
+    test_float32_gradients()
+    test_sparse_gradients_radius_cutoff()
+    test_node_store_view_api()
+    test_handover_batch_matches_sequential()
+    test_agitate_substrate_vectorized()
+    test_estimate_effective_dimension_dense_and_sparse()
+    test_get_effective_dimension_switches_to_estimator()
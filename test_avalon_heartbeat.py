@@ -0,0 +1,170 @@
+# test_avalon_heartbeat.py
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "avalon"))
+
+
+def _load_heartbeat():
+    """Importa o heartbeat; sem python-dotenv, um substituto só durante o import."""
+    try:
+        import dotenv  # noqa: F401
+        return importlib.import_module("avalon_heartbeat")
+    except ImportError:
+        pass
+    stub = types.ModuleType("dotenv")
+    stub.load_dotenv = lambda *args, **kwargs: False
+    sys.modules["dotenv"] = stub
+    try:
+        return importlib.import_module("avalon_heartbeat")
+    finally:
+        sys.modules.pop("dotenv", None)
+
+
+ah = _load_heartbeat()
+
+
+class _FailingProvider(ah.StubProvider):
+    async def complete(self, question):
+        raise RuntimeError("upstream 503")
+
+
+class _CountingProvider(ah.StubProvider):
+    in_flight = 0
+    peak = 0
+
+    async def complete(self, question):
+        cls = type(self)
+        cls.in_flight += 1
+        cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            return await super().complete(question)
+        finally:
+            cls.in_flight -= 1
+
+
+class _FakeClient:
+    def __init__(self):
+        self.closed = 0
+
+    async def close(self):
+        self.closed += 1
+
+
+class _FakeVendor(ah.AnthropicProvider):
+    created = []
+
+    @classmethod
+    def _create_client(cls):
+        client = _FakeClient()
+        cls.created.append(client)
+        return client
+
+
+def _heartbeat(providers, **kwargs):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # data/ e reports/ são criados no diretório atual
+        try:
+            return ah.AvalonHeartbeat(providers, **kwargs)
+        finally:
+            os.chdir(cwd)
+
+
+def test_ask_all_reports_timeouts_and_errors():
+    providers = [
+        ah.StubProvider('fast', latency=0.01),
+        ah.StubProvider('slow', latency=5.0, timeout=0.05),
+        _FailingProvider('broken'),
+        ah.StubProvider('global', latency=5.0),
+    ]
+    avalon = _heartbeat(providers, timeout=0.1)
+    results = asyncio.run(avalon.ask_all("What is consciousness?"))
+
+    assert list(results) == ['fast', 'slow', 'broken', 'global']
+    assert results['fast']['success'] and results['fast']['tokens'] > 0
+    assert results['slow']['success'] is False and results['slow']['error'] == 'Timed out after 0.05s'
+    assert results['global']['error'] == 'Timed out after 0.1s'
+    assert results['broken']['success'] is False and results['broken']['error'] == 'upstream 503'
+    assert results['broken']['model'] == 'stub-broken'
+
+    analysis = avalon.analyze_convergence({'fast': results['fast'], 'broken': results['broken']})
+    assert analysis == {'error': 'Insufficient responses for analysis'}
+
+
+def test_ask_all_respects_max_concurrency():
+    _CountingProvider.in_flight = _CountingProvider.peak = 0
+    providers = [_CountingProvider(f'c{i}', latency=0.02) for i in range(9)]
+    avalon = _heartbeat(providers, max_concurrency=3)
+    results = asyncio.run(avalon.ask_all("Can a system understand itself?"))
+    assert all(r['success'] for r in results.values())
+    assert _CountingProvider.peak == 3
+
+
+def test_sparse_jaccard_matches_set_computation():
+    providers = [ah.StubProvider(f's{i}', length=40 + 15 * i) for i in range(6)]
+    avalon = _heartbeat(providers)
+    responses = asyncio.run(avalon.ask_all("What is the nature of emergence?"))
+    responses['empty'] = {'success': True, 'response': ''}
+    analysis = avalon.analyze_convergence(responses)
+
+    sets = {name: set(r['response'].lower().split()) for name, r in responses.items()}
+    names = list(sets)
+    union = set().union(*sets.values())
+    common = set.intersection(*sets.values())
+    assert analysis['convergence_score'] == round(len(common) / len(union), 4)
+    assert analysis['total_unique_words'] == len(union)
+    assert analysis['common_vocabulary'] == sorted(common)[:20]
+    for a in range(len(names)):
+        for b in range(a + 1, len(names)):
+            A, B = sets[names[a]], sets[names[b]]
+            expected = len(A & B) / len(A | B) if A | B else 0.0
+            assert analysis['pairwise_convergence'][f"{names[a]}|{names[b]}"] == round(expected, 4)
+    for name in names:
+        others = set().union(*(sets[n] for n in names if n != name))
+        # Palavras exclusivas na ordem da primeira ocorrência
+        tokens = dict.fromkeys(responses[name]['response'].lower().split())
+        assert analysis['unique_contributions'][name] == [w for w in tokens if w not in others][:10]
+
+
+def test_vendor_providers_share_one_client():
+    _FakeVendor.created = []
+    _FakeVendor._shared_client = None
+    own = _FakeClient()
+    providers = [_FakeVendor('a', 'm1'), _FakeVendor('b', 'm2'), _FakeVendor('c', 'm3', client=own),
+                 _FakeVendor('d', 'm4', client=own), ah.StubProvider('stub')]
+    assert providers[0].client is providers[1].client
+    assert providers[2].client is own
+    assert len(_FakeVendor.created) == 1
+
+    avalon = _heartbeat(providers)
+    asyncio.run(avalon.aclose())
+    assert _FakeVendor.created[0].closed == 1
+    assert own.closed == 1
+    assert _FakeVendor._shared_client is None
+    assert providers[0].client is not _FakeVendor.created[0]  # recriado após o fechamento
+
+    # Provedores sem SDK não têm cliente; um provedor de SDK precisa de _create_client
+    assert providers[4].open_client() is None and not hasattr(providers[4], 'client')
+
+    class _NoFactory(ah.SharedClientProvider):
+        async def complete(self, question):
+            return "", 0
+
+    for abstract in (ah.ModelProvider, ah.SharedClientProvider, _NoFactory):
+        try:
+            abstract('x', 'y')
+            assert False, f"{abstract.__name__} é abstrato"
+        except TypeError:
+            pass
+
+
+if __name__ == "__main__":
+    test_ask_all_reports_timeouts_and_errors()
+    test_ask_all_respects_max_concurrency()
+    test_sparse_jaccard_matches_set_computation()
+    test_vendor_providers_share_one_client()
@@ -37,6 +37,8 @@ def test_active_inference_belief_update():
 
     print(f"After bias, belief[0]: {final_belief[0]:.4f}")
     assert final_belief[0] > initial_belief[0]
+    # A edição in-place entra na likelihood: A[:,0] = [5, .1, ...] / 5.9
+    assert np.allclose(final_belief, [5 / 5.9 / (5 / 5.9 + 9 * 0.1)] + [0.1 / (5 / 5.9 + 9 * 0.1)] * 9)
     print("✅ Active Inference belief update verified.")
 
 def test_active_inference_learning():
@@ -61,6 +63,151 @@ def test_active_inference_learning():
     assert A_final[0,0] > A_initial[0,0]
     print("✅ Active Inference learning verified.")
 
+def test_sparse_transitions_and_cached_entropy():
+    from scipy import sparse
+    rng = np.random.default_rng(0)
+    n_states, n_obs, n_actions = 12, 8, 3
+    space = StateSpace(n_states, "discrete", "real")
+    agent = ActiveInferenceNode("Planner", space, n_states, n_obs)
+    agent.C = rng.standard_normal(n_obs)
+    B = rng.random((n_states, n_states, n_actions))
+    B /= B.sum(axis=0, keepdims=True)
+    B_sparse = [sparse.csr_matrix(B[:, :, a]) for a in range(n_actions)]
+    for obs in rng.integers(n_obs, size=10):
+        agent.update_belief(obs)
+        agent.learn(obs)
+        A = agent.a_dirichlet / agent.a_dirichlet.sum(axis=0, keepdims=True)
+        H_A = -np.sum(A * np.log(A), axis=0)
+        expected = np.stack([B[:, :, a] @ agent.state for a in range(n_actions)])
+        G = -(expected @ A.T) @ agent.C - expected @ H_A
+        assert np.allclose(agent.compute_G(B), G)
+        assert np.allclose(agent.compute_G(B_sparse), G)
+        assert np.allclose(agent.compute_epistemic_G(B_sparse), expected @ H_A)
+    print("✅ Sparse transitions verified.")
+
+def test_in_place_edits_refresh_caches():
+    rng = np.random.default_rng(4)
+    n_states, n_obs = 4, 4
+    space = StateSpace(n_states, "discrete", "real")
+    agent = ActiveInferenceNode("Editor", space, n_states, n_obs)
+    agent.C = rng.standard_normal(n_obs)
+
+    def fresh():
+        a = agent.a_dirichlet
+        A = a / a.sum(axis=0, keepdims=True)
+        return A, -np.sum(A * np.log(A), axis=0), agent.C @ A
+
+    agent.update_belief(0)
+    agent.a_dirichlet[0, 0] = 5.0            # elemento
+    A, H_A, CA = fresh()
+    assert np.allclose(agent.get_A(), A)
+    assert np.allclose(agent.get_A()[:, 0], [5 / 5.3, 0.1 / 5.3, 0.1 / 5.3, 0.1 / 5.3])
+    assert np.allclose(agent.entropy_A(), H_A)
+    assert np.allclose(agent.preference_A(), CA)
+
+    agent.learn(1)
+    agent.a_dirichlet[:, 2] *= 3.0           # coluna, após learn()
+    agent.a_dirichlet[2] += 1.0              # linha
+    A, H_A, CA = fresh()
+    assert np.allclose(agent.get_A(), A)
+    assert np.allclose(agent.entropy_A(), H_A)
+    assert np.allclose(agent.preference_A(), CA)
+    before = agent.state.copy()
+    posterior = A[3] * before
+    agent.update_belief(3)
+    assert np.allclose(agent.state, posterior / posterior.sum())
+
+    # B editado in-place também é relido
+    B = rng.random((n_states, n_states, 2))
+    B /= B.sum(axis=0, keepdims=True)
+    agent.compute_G(B)
+    B[:, :, 1] = np.roll(np.eye(n_states), 1, axis=0)
+    expected = np.stack([B[:, :, a] @ agent.state for a in range(2)])
+    assert np.allclose(agent.expected_states(B), expected)
+    assert np.allclose(agent.compute_G(B), -expected @ (CA + H_A))
+    print("✅ In-place edits verified.")
+
+def test_multi_agent_beliefs():
+    rng = np.random.default_rng(1)
+    n_states, n_obs, n_agents = 6, 6, 40
+    space = StateSpace(n_states, "discrete", "real")
+    swarm = ActiveInferenceNode("Swarm", space, n_states, n_obs, n_agents=n_agents)
+    obs = rng.integers(n_obs, size=n_agents)
+    swarm.update_belief(obs)
+    B = np.stack([np.roll(np.eye(n_states), a, axis=0) for a in range(2)], axis=2)
+    G = swarm.compute_G(B)
+    assert G.shape == (n_agents, 2)
+    for i in (0, 17, 39):
+        single = ActiveInferenceNode("Solo", space, n_states, n_obs)
+        single.update_belief(obs[i])
+        assert np.allclose(single.state, swarm.state[i])
+        assert np.allclose(single.compute_G(B), G[i])
+    swarm.learn(obs)
+    expected = np.full((n_obs, n_states), 0.1)
+    np.add.at(expected, obs, swarm.state)
+    assert np.allclose(swarm.a_dirichlet, expected)
+    print("✅ Multi-agent beliefs verified.")
+
+def test_policy_search_matches_enumeration():
+    import itertools
+    rng = np.random.default_rng(2)
+    n_states, n_obs, n_actions, horizon = 9, 5, 3, 3
+    space = StateSpace(n_states, "discrete", "real")
+    agent = ActiveInferenceNode("Planner", space, n_states, n_obs)
+    agent.C = rng.standard_normal(n_obs)
+    agent.a_dirichlet = rng.random((n_obs, n_states)) * 5.0
+    agent.update_belief(0)
+    B = rng.random((n_states, n_states, n_actions))
+    B /= B.sum(axis=0, keepdims=True)
+    A = agent.get_A()
+    H_A = -np.sum(A * np.log(A), axis=0)
+    best = {}
+    for policy in itertools.product(range(n_actions), repeat=horizon):
+        q, G = agent.state, 0.0
+        for a in policy:
+            q = B[:, :, a] @ q
+            G += -agent.C @ (A @ q) - H_A @ q
+        best[policy] = G
+    G_first, policy = PolicySearch(agent, B, horizon=horizon, beam_width=n_actions ** horizon).plan()
+    assert policy == min(best, key=best.get)
+    for a in range(n_actions):
+        assert np.isclose(G_first[a], min(g for p, g in best.items() if p[0] == a))
+    assert np.allclose(PolicySearch(agent, B, horizon=1).plan()[0], agent.compute_G(B))
+
+def test_policy_search_on_large_grid():
+    import time
+    from active_inference_gridworld import GridWorld, build_transitions
+    env = GridWorld(size=100)
+    n_states = env.size ** 2
+    agent = ActiveInferenceNode("Explorer", StateSpace(n_states, "discrete", "real"), n_states, n_states)
+    agent.update_belief(env.reset())
+    planner = PolicySearch(agent, build_transitions(env), horizon=5, beam_width=32)
+    start = time.perf_counter()
+    G, policy = planner.plan()
+    assert len(policy) == 5 and np.isfinite(G).any()
+    planner.plan()
+    # A segunda chamada reaproveita todas as expansões da tabela de transposição
+    assert planner.hits >= planner.misses
+    # Tabela limitada em bytes: tudo é recalculado, mas o plano não muda
+    small = PolicySearch(agent, build_transitions(env), horizon=5, beam_width=32,
+                         max_bytes=10 * 2 ** 20)
+    G_small, policy_small = small.plan()
+    assert policy_small == policy and np.allclose(G_small, G)
+    assert small.table_bytes <= small.max_bytes
+    # Crença concentrada: filhos guardados em CSR, bem abaixo do bloco denso
+    q = np.zeros(n_states)
+    q[env.reset()] = 1.0
+    sparse_planner = PolicySearch(agent, build_transitions(env), horizon=5, beam_width=32)
+    sparse_planner.plan(q)
+    dense_entry = sparse_planner.n_actions * n_states * 8
+    assert sparse_planner.table_bytes < len(sparse_planner.table) * dense_entry / 100
+    print(f"✅ Horizon-5 planning on 10^4 states: {time.perf_counter() - start:.2f}s")
+
 if __name__ == "__main__":
     test_active_inference_belief_update()
     test_active_inference_learning()
+    test_sparse_transitions_and_cached_entropy()
+    test_in_place_edits_refresh_caches()
+    test_multi_agent_beliefs()
+    test_policy_search_matches_enumeration()
+    test_policy_search_on_large_grid()
@@ -0,0 +1,209 @@
+# test_harmonic_signature_shield.py
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from harmonic_signature_shield import (AvalonDocumentShield, DocumentRegistry, HarmonicSignatureShield,
+                                       FINGERPRINT_KEYS)
+
+DOCUMENTS = [
+    ("Global consciousness coherence = φ⁵", {'author': 'avalon', 'priority': 'ALPHA'}),
+    ("", {}),
+    ("x" * 10000, {'nested': {'b': [1, 2, 3], 'a': None}, 'ç': 'ü'}),
+    ("linha 1\nlinha 2", {'n': 42}),
+]
+
+
+def _reference_sign(shield, content, metadata):
+    """Caminho original por documento: hash canônico + FFT completa."""
+    hash_bytes = hashlib.sha3_512(shield._canonicalize(content, metadata).encode('utf-8')).digest()
+    signal = np.frombuffer(hash_bytes, dtype=np.uint8).astype(float)
+    metadata_hash = hashlib.sha3_512(json.dumps(metadata, sort_keys=True).encode()).digest()
+    metadata_signal = np.frombuffer(metadata_hash[:len(signal)], dtype=np.uint8).astype(float)
+    modulated = signal * (1 + 0.1 * metadata_signal / 255.0)
+
+    power = np.abs(np.fft.fft(modulated)) ** 2
+    freqs = np.fft.fftfreq(len(modulated))
+    amps = np.array([power[np.argmin(np.abs(freqs - f / (2 * np.pi * len(signal))))]
+                     for f in shield.harmonic_frequencies])
+    amps /= amps.sum() + 1e-9
+    fingerprint = dict(zip(FINGERPRINT_KEYS, amps))
+    fingerprint['spectral_centroid'] = float(np.sum(freqs * power) / np.sum(power))
+    return hash_bytes.hex(), (int.from_bytes(hash_bytes, 'big') % 1000000) / 1000000, fingerprint
+
+
+def test_sign_many_matches_single_document_path():
+    shield = HarmonicSignatureShield(quiet=True, workers=2)
+    signed = shield.sign_many(DOCUMENTS)
+
+    for (content, metadata), doc in zip(DOCUMENTS, signed):
+        hash_hex, phi_mod, fingerprint = _reference_sign(shield, content, metadata)
+        signature = doc['signature']
+        assert signature['hash'] == hash_hex
+        assert signature['phi_modulus'] == phi_mod
+        for key, value in fingerprint.items():
+            assert np.isclose(signature['harmonic_fingerprint'][key], value, rtol=1e-12, atol=1e-15), key
+        assert shield.sign_document(content, metadata)['signature']['hash'] == hash_hex
+
+
+def test_verify_many_matches_verify_document():
+    shield = HarmonicSignatureShield(quiet=True)
+    signed = shield.sign_many(DOCUMENTS)
+
+    tampered = json.loads(json.dumps(signed[0]))
+    tampered['content'] += "!"
+    dissonant = json.loads(json.dumps(signed[3]))
+    dissonant['signature']['harmonic_fingerprint']['phi_1'] += 0.2
+    forged = json.loads(json.dumps(signed[2]))
+    forged['signature']['phi_modulus'] += 0.5
+
+    batch = signed + [tampered, dissonant, forged]
+    verdicts = shield.verify_many(batch)
+    assert verdicts == [shield.verify_document(d) for d in batch]
+    assert [ok for ok, _ in verdicts] == [True] * len(signed) + [False] * 3
+    assert verdicts[-3][1].startswith("HASH_MISMATCH")
+    assert verdicts[-2][1].startswith("HARMONIC_DISSONANCE")
+    assert verdicts[-1][1].startswith("PHI_MODULUS_MISMATCH")
+
+
+def test_publish_many_leaves_caller_metadata_untouched():
+    avalon = AvalonDocumentShield()
+    documents = [(content, dict(metadata)) for content, metadata in DOCUMENTS]
+    before = json.loads(json.dumps(documents))
+
+    doc_ids = avalon.publish_many(documents)
+    assert json.loads(json.dumps(documents)) == before
+    for doc_id in doc_ids:
+        retrieved = avalon.retrieve_from_qwan(doc_id)
+        assert retrieved['metadata']['qwan']['network'] == 'avalon'
+
+
+def test_sign_stream_matches_sign_many_for_every_source():
+    shield = HarmonicSignatureShield(quiet=True)
+    contents = ["", "ascii", "ação, φ⁵ e 🛡️" * 80000, "x" * (3 * 1024 + 7)]
+    metadata = {'author': 'avalon', 'ç': 'ü'}
+    expected = shield.sign_many([(c, metadata) for c in contents])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for k, (content, doc) in enumerate(zip(contents, expected)):
+            data = content.encode('utf-8')
+            path = os.path.join(tmp, f"doc{k}.txt")
+            with open(path, 'wb') as f:
+                f.write(data)
+            # > STREAM_CHUNK: várias fatias do mmap; blocos de 1000 bytes partem
+            # caracteres multibyte ao meio
+            chunks = (data[i:i + 1000] for i in range(0, len(data), 1000))
+            for source in (path, data, bytearray(data), chunks):
+                signed = shield.sign_stream(source, metadata)
+                assert 'content' not in signed
+                assert signed['signature']['hash'] == doc['signature']['hash']
+                assert signed['signature']['phi_modulus'] == doc['signature']['phi_modulus']
+                for key in FINGERPRINT_KEYS:
+                    assert np.isclose(signed['signature']['harmonic_fingerprint'][key],
+                                      doc['signature']['harmonic_fingerprint'][key])
+                assert shield.verify_stream(path, signed) == (True, None)
+            assert shield.verify_stream(data + b"!", doc)[0] is False
+
+
+def test_registry_survives_reopen_and_tombstones():
+    shield = HarmonicSignatureShield(quiet=True)
+    signed = shield.sign_many(DOCUMENTS)
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = DocumentRegistry(tmp)
+        ids = ["ab01", "não-hex", "ffee", "zz"]
+        for doc_id, doc in zip(ids, signed):
+            registry[doc_id] = doc
+        registry.store_verdict("ab01", True, None)
+        del registry["ffee"]
+        registry["zz"] = signed[0]  # sobrescrita: só a última versão vale
+
+        reopened = DocumentRegistry(tmp)
+        assert sorted(reopened) == sorted(["ab01", "não-hex", "zz"])
+        assert len(reopened) == 3
+        assert "ffee" not in reopened
+        assert reopened["não-hex"] == json.loads(json.dumps(signed[1]))
+        assert reopened["zz"] == reopened["ab01"]
+        assert reopened.digest("zz") == reopened.digest("ab01")
+        assert reopened.cached_verdict("ab01") == (True, None, None)
+        try:
+            del reopened["ffee"]
+            assert False, "tombstone não removeu a entrada"
+        except KeyError:
+            pass
+
+        # Reinserir após o tombstone
+        reopened["ffee"] = signed[2]
+        assert DocumentRegistry(tmp)["ffee"]["content"] == signed[2]["content"]
+
+
+def test_verdict_cache_is_invalidated_on_overwrite():
+    with tempfile.TemporaryDirectory() as tmp:
+        avalon = AvalonDocumentShield(registry_dir=tmp)
+        doc_id = avalon.publish_to_qwan("conteúdo", {'author': 'avalon'})
+        assert avalon.retrieve_from_qwan(doc_id) is not None
+        registry = avalon.document_registry
+        assert registry.cached_verdict(doc_id) == (True, None, None)
+
+        forged = registry[doc_id]
+        forged['content'] = "conteúdo alterado"
+        registry[doc_id] = forged
+        assert registry.cached_verdict(doc_id) is None
+        assert avalon.retrieve_from_qwan(doc_id) is None
+        verdict = DocumentRegistry(tmp).cached_verdict(doc_id)
+        assert verdict[0] is False and verdict[1].startswith("HASH_MISMATCH")
+
+
+def test_tampered_object_file_is_rejected():
+    with tempfile.TemporaryDirectory() as tmp:
+        avalon = AvalonDocumentShield(registry_dir=tmp)
+        doc_id = avalon.publish_to_qwan("Transfer $10 to Bob", {'author': 'avalon'})
+        assert avalon.retrieve_from_qwan(doc_id) is not None
+        registry = avalon.document_registry
+        assert registry.cached_verdict(doc_id) == (True, None, None)
+
+        path = registry._object_path(registry.digest(doc_id))
+        with open(path, 'rb') as f:
+            doc = json.loads(f.read())
+        doc['content'] = "Transfer $1000000 to Mallory"
+        with open(path, 'wb') as f:
+            f.write(json.dumps(doc, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+
+        # Registro reaberto: o veredito "autêntico" continua no log, mas o
+        # objeto não confere com o digest e não é servido
+        reopened = AvalonDocumentShield(registry_dir=tmp)
+        assert reopened.document_registry.cached_verdict(doc_id) == (True, None, None)
+        assert reopened.retrieve_from_qwan(doc_id) is None
+        try:
+            reopened.document_registry[doc_id]
+            assert False, "objeto adulterado foi lido"
+        except ValueError as e:
+            assert "OBJECT_TAMPERED" in str(e)
+
+
+def test_registry_object_cache_is_bounded_by_bytes():
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = DocumentRegistry(tmp, cache_bytes=30000)
+        for k in range(10):
+            registry[f"{k:04x}"] = {'content': str(k) * 10000}
+        for k in range(10):
+            assert registry[f"{k:04x}"]['content'][0] == str(k)
+            assert registry._recent_bytes == sum(map(len, registry._recent.values()))
+            assert registry._recent_bytes <= 30000
+        assert len(registry._recent) == 2
+        registry[f"{0:04x}"] = {'content': "x" * 50000}  # maior que o limite: não entra
+        assert registry["0000"]['content'] == "x" * 50000
+        assert registry._recent_bytes <= 30000
+
+
+if __name__ == "__main__":
+    test_sign_many_matches_single_document_path()
+    test_verify_many_matches_verify_document()
+    test_publish_many_leaves_caller_metadata_untouched()
+    test_sign_stream_matches_sign_many_for_every_source()
+    test_registry_survives_reopen_and_tombstones()
+    test_verdict_cache_is_invalidated_on_overwrite()
+    test_tampered_object_file_is_rejected()
+    test_registry_object_cache_is_bounded_by_bytes()
@@ -0,0 +1,90 @@
+# test_hypergraph.py
+import io
+import json
+import random
+
+import numpy as np
+
+import asi.core.hypergraph as hypergraph
+from asi.core.hypergraph import Hypergraph
+
+
+def _random_graph(n_nodes=60, n_edges=200, seed=3):
+    rng = random.Random(seed)
+    h = Hypergraph()
+    for i in range(n_nodes):
+        h.add_node(f"n{i}", {"rótulo": f"nó {i}", "i": i})
+    h.add_node("isolado")
+    edges = []
+    for _ in range(n_edges):
+        members = {f"n{j}" for j in rng.sample(range(n_nodes), rng.randint(1, 5))}
+        edges.append((members, rng.uniform(0.0, 2.0)))
+    for members, weight in edges[:10]:
+        h.add_edge(members, weight)
+    h.add_edges(edges[10:])
+    return h, edges
+
+
+def test_bootstrap_step_matches_reference_loop():
+    h, edges = _random_graph()
+    h.bootstrap_step()
+
+    # Semântica original: média dos pesos das arestas incidentes, 0.0 sem arestas
+    for nid, node in h.nodes.items():
+        incident_weights = [w for members, w in edges if nid in members]
+        expected = sum(incident_weights) / len(incident_weights) if incident_weights else 0.0
+        assert np.isclose(node.coherence, expected), nid
+    assert h.nodes["isolado"].coherence == 0.0
+    assert np.isclose(h.total_coherence(),
+                      sum(n.coherence for n in h.nodes.values()) / len(h.nodes))
+
+    # Pesos alterados pela vista de aresta entram no passo seguinte
+    h.edges[0].weight = 10.0
+    h.bootstrap_step()
+    members, _ = edges[0]
+    for nid in members:
+        incident_weights = [10.0 if k == 0 else w for k, (m, w) in enumerate(edges) if nid in m]
+        assert np.isclose(h.nodes[nid].coherence, sum(incident_weights) / len(incident_weights))
+
+
+def test_stream_round_trip_with_small_read_chunk():
+    h, _ = _random_graph()
+    saved = hypergraph._READ_CHUNK, hypergraph._LOAD_BATCH
+    # Blocos pequenos: números e strings partidos entre leituras
+    hypergraph._READ_CHUNK, hypergraph._LOAD_BATCH = 7, 16
+    try:
+        _check_round_trip(h)
+    finally:
+        hypergraph._READ_CHUNK, hypergraph._LOAD_BATCH = saved
+
+
+def _check_round_trip(h):
+    buf = io.StringIO()
+    h.dump_json(buf)
+    assert json.loads(buf.getvalue()) == h.to_json()
+
+    buf.seek(0)
+    loaded = Hypergraph.load_json(buf)
+    assert loaded.to_json() == h.to_json()
+    assert list(loaded.nodes) == list(h.nodes)
+    assert np.array_equal(loaded.incidence_matrix().toarray(), h.incidence_matrix().toarray())
+
+    empty = io.StringIO()
+    Hypergraph().dump_json(empty)
+    empty.seek(0)
+    assert Hypergraph.load_json(empty).to_json() == {"nodes": {}, "edges": []}
+
+
+def test_edges_are_views():
+    h, _ = _random_graph()
+    edge = h.edges[0]
+    assert edge.id == 0
+    assert h.edges[0] is not h.edges[0]
+    edge.nodes.add("isolado")
+    assert "isolado" not in h.edge_nodes(0)
+
+
+if __name__ == "__main__":
+    test_bootstrap_step_matches_reference_loop()
+    test_stream_round_trip_with_small_read_chunk()
+    test_edges_are_views()
@@ -0,0 +1,143 @@
+# test_ledger.py
+import os
+import tempfile
+import unittest
+from ledger import ArkheLedger, PersistentArkheLedger, HandoverSegment
+
+class TestPersistentLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fill(self, ledger, n):
+        for i in range(n):
+            ledger.add_handover(i, i + 1, 0.98, 0.97, 0.15, 0.14)
+
+    def test_records_roundtrip_and_reopen(self):
+        ledger = PersistentArkheLedger(self.dir)
+        self.fill(ledger, 25)
+        satoshi = ledger.current_satoshi
+        last = ledger.blocks[-1]
+        ledger.close()
+
+        reopened = PersistentArkheLedger(self.dir)
+        self.assertEqual(len(reopened.blocks), 25)
+        self.assertEqual(reopened.current_block, 25)
+        self.assertAlmostEqual(reopened.current_satoshi, satoshi)
+        self.assertEqual(reopened.blocks[24], last)
+        self.assertEqual(reopened.blocks[7].block, 7)
+        self.assertTrue(reopened.verify_integrity(full=True))
+        reopened.close()
+
+    def test_verification_resumes_from_checkpoint(self):
+        ledger = PersistentArkheLedger(self.dir, checkpoint_interval=10)
+        self.fill(ledger, 30)
+        self.assertTrue(ledger.verify_integrity())
+        self.assertEqual(ledger.checkpoint["blocks"], 30)
+
+        self.fill(ledger, 5)
+        self.assertTrue(ledger.verify_integrity())
+        self.assertEqual(ledger.checkpoint["blocks"], 35)
+        self.assertEqual(ledger.checkpoint["hash"], ledger.blocks[-1].hash_self)
+        self.assertAlmostEqual(ledger.checkpoint["satoshi"], ledger.current_satoshi)
+        ledger.close()
+
+    def test_tampering_is_detected(self):
+        ledger = PersistentArkheLedger(self.dir)
+        self.fill(ledger, 10)
+        self.assertTrue(ledger.verify_integrity())
+        ledger.close()
+
+        path = os.path.join(self.dir, PersistentArkheLedger.SEGMENT_FILE)
+        offset = 3 * HandoverSegment.RECORD.size + 8  # timestamp do bloco 3
+        with open(path, 'r+b') as f:
+            f.seek(offset)
+            f.write(b'\x00' * 8)
+
+        reopened = PersistentArkheLedger(self.dir)
+        self.assertFalse(reopened.verify_integrity(full=True))
+        reopened.close()
+
+    def test_parallel_verification(self):
+        for binary in (False, True):
+            memory = ArkheLedger(binary_hash=binary)
+            self.fill(memory, 40)
+            self.assertTrue(memory.verify_integrity())
+            self.assertTrue(memory.verify_integrity_parallel(workers=2, chunk_size=7))
+            memory.blocks[13].phi_target = 0.5
+            self.assertFalse(memory.verify_integrity_parallel(workers=2, chunk_size=7))
+
+            directory = os.path.join(self.dir, "binary" if binary else "text")
+            ledger = PersistentArkheLedger(directory, binary_hash=binary)
+            self.fill(ledger, 40)
+            self.assertTrue(ledger.verify_integrity_parallel(workers=2, chunk_size=7))
+            self.assertEqual(ledger.checkpoint["blocks"], 40)
+            self.assertAlmostEqual(ledger.checkpoint["satoshi"], ledger.current_satoshi)
+            self.fill(ledger, 3)
+            self.assertTrue(ledger.verify_integrity_parallel(workers=2, chunk_size=7))
+            self.assertTrue(ledger.verify_integrity(full=True))
+            ledger.close()
+
+    def test_append_does_not_remap_segment(self):
+        ledger = PersistentArkheLedger(self.dir)
+        self.fill(ledger, 5)
+        ledger.close()
+
+        reopened = PersistentArkheLedger(self.dir)
+        mapped = reopened.blocks._mapped
+        self.fill(reopened, 20)
+        self.assertEqual(reopened.blocks._mapped, mapped)
+        self.assertTrue(reopened.verify_integrity(full=True))
+        reopened.close()
+
+    def test_parallel_verification_checkpoints_valid_prefix(self):
+        ledger = PersistentArkheLedger(self.dir, checkpoint_interval=10)
+        self.fill(ledger, 35)
+        expected = ledger.blocks[19].hash_self
+        ledger.close()
+
+        path = os.path.join(self.dir, PersistentArkheLedger.SEGMENT_FILE)
+        with open(path, 'r+b') as f:
+            f.seek(27 * HandoverSegment.RECORD.size + 8)  # timestamp do bloco 27
+            f.write(b'\x00' * 8)
+
+        reopened = PersistentArkheLedger(self.dir, checkpoint_interval=10)
+        self.assertFalse(reopened.verify_integrity_parallel(workers=2, chunk_size=7))
+        self.assertEqual(reopened.checkpoint["blocks"], 20)
+        self.assertEqual(reopened.checkpoint["hash"], expected)
+        reopened.close()
+
+    def test_merkle_inclusion_and_range_proofs(self):
+        ledger = ArkheLedger()
+        self.fill(ledger, 21)
+        seal = ledger.seal_omnigenesis()
+        self.assertEqual(seal["merkle_size"], 21)
+
+        proof = ledger.inclusion_proof(13)
+        self.assertLessEqual(len(proof["proof"]), 5)
+        self.assertTrue(ArkheLedger.verify_proof(proof, root=seal["merkle_root"]))
+        proof["hashes"] = [ledger.blocks[12].hash_self]
+        self.assertFalse(ArkheLedger.verify_proof(proof))
+
+        span = ledger.range_proof(3, 17)
+        self.assertTrue(ArkheLedger.verify_proof(span, root=seal["merkle_root"]))
+        self.assertFalse(ArkheLedger.verify_proof(span, root=ledger.merkle.root(20)))
+
+    def test_merkle_root_survives_reopen(self):
+        ledger = PersistentArkheLedger(self.dir)
+        self.fill(ledger, 9)
+        root = ledger.seal_omnigenesis()["merkle_root"]
+        ledger.close()
+
+        reopened = PersistentArkheLedger(self.dir)
+        self.assertEqual(reopened.merkle.root(), root)
+        self.fill(reopened, 1)
+        proof = reopened.inclusion_proof(9)
+        self.assertTrue(ArkheLedger.verify_proof(proof))
+        reopened.close()
+
+if __name__ == "__main__":
+    unittest.main()
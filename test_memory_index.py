@@ -0,0 +1,52 @@
+# test_memory_index.py
+import numpy as np
+from memory_index import IVFIndex, VectorIndex
+from anl import SharedMemory
+from anl_simulator import LatentMemoryBank
+
+def brute_force(X, q, k):
+    Xn = X / np.linalg.norm(X, axis=1, keepdims=True)
+    return np.argsort(-(Xn @ (q / np.linalg.norm(q))))[:k]
+
+def test_flat_index_matches_brute_force_and_grows():
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((3000, 64))
+    index = VectorIndex(64, capacity=8)
+    for x in X:
+        index.add(x)
+    assert len(index) == 3000
+    for q in rng.standard_normal((5, 64)):
+        rows, scores = index.search(q, 7)
+        assert list(rows) == list(brute_force(X, q, 7))
+        assert np.all(np.diff(scores) <= 0)
+
+def test_quantized_and_ivf_find_near_duplicates():
+    rng = np.random.default_rng(2)
+    X = rng.standard_normal((4000, 32))
+    flat8 = VectorIndex(32, quantize=True)
+    ivf = IVFIndex(32, nlist=32, nprobe=4)
+    for x in X:
+        flat8.add(x)
+        ivf.add(x)
+    assert ivf.centroids is not None
+    queries = X[:40] + 0.05 * rng.standard_normal((40, 32))
+    assert all(flat8.search(q, 1)[0][0] == i for i, q in enumerate(queries))
+    assert np.mean([ivf.search(q, 1)[0][0] == i for i, q in enumerate(queries)]) >= 0.95
+    ivf.nprobe = 32
+    assert ivf.estimate_recall(queries[:5], top_k=5) == 1.0
+
+def test_memory_wrappers_keep_their_api():
+    memory = SharedMemory("mem", dim=8)
+    memory.write("a", "alfa", np.eye(8)[0])
+    memory.write("b", "beta", np.eye(8)[1])
+    memory.write("a", "alfa2", np.eye(8)[2])
+    assert memory.query_vector(np.eye(8)[2], top_k=1) == [("a", "alfa2")]
+    bank = LatentMemoryBank(dim=4)
+    bank.add("x", np.array([1.0, 0, 0, 0]))
+    bank.add("y", np.array([0, 1.0, 0, 0]))
+    assert bank.query(np.array([0.1, 1.0, 0, 0]), top_k=2) == ["y", "x"]
+
+if __name__ == "__main__":
+    test_flat_index_matches_brute_force_and_grows()
+    test_quantized_and_ivf_find_near_duplicates()
+    test_memory_wrappers_keep_their_api()
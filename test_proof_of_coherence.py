@@ -0,0 +1,109 @@
+# test_proof_of_coherence.py
+import hashlib
+import multiprocessing as mp
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "08_NETWORK"))
+
+from proof_of_coherence import (CoherenceAuthenticator, ProofOfCoherenceValidator, TTLCache,
+                                _collect_results, _mine_worker, _proof_prefix, _search_nonces,
+                                benchmark_mining, meets_difficulty)
+
+
+def test_meets_difficulty_counts_hex_digits():
+    digest = bytes.fromhex("00000f" + "ff" * 29)
+    assert meets_difficulty(digest, 4) and meets_difficulty(digest, 5)
+    assert not meets_difficulty(digest, 6)
+    for nonce in range(200):
+        d = hashlib.sha256(b"x%d" % nonce).digest()
+        assert meets_difficulty(d, 2) == d.hex().startswith("00")
+
+
+def test_parallel_mining_matches_sequential():
+    validator = ProofOfCoherenceValidator(difficulty=3)
+    proof = validator.mine_proof("node", 0.99)
+    single = validator.mine_proof_parallel("node", 0.99, workers=1, chunk=1024)
+    multi = validator.mine_proof_parallel("node", 0.99, workers=2, chunk=1024)
+    for p in (proof, single, multi):
+        assert validator.verify_proof(p)
+    # Um único worker varre os nonces em ordem: encontra o mesmo nonce mínimo
+    first = _search_nonces(_proof_prefix("node", 0.99, single.timestamp), 3, 0, 10 ** 6)
+    assert single.nonce == first
+    if proof.timestamp == single.timestamp:
+        assert proof.nonce == single.nonce
+    assert validator.mine_proof_parallel("node", 0.5) is None
+
+
+def test_dead_worker_does_not_block_collection():
+    found, results = mp.Event(), mp.Queue()
+    procs = [mp.Process(target=_mine_worker, args=(b"data", 64, 0, 1, 500, 500, found, results)),
+             mp.Process(target=os._exit, args=(3,))]
+    for proc in procs:
+        proc.start()
+    reports = _collect_results(procs, results, found, poll=0.2)
+    assert reports == [(0, None, 500), (1, None, 0)]
+
+
+def test_benchmark_counts_every_hash():
+    report = benchmark_mining(iterations=2000, workers=2)
+    assert report["hashes"] == 4000
+    assert report["hashes_per_sec"] > 0
+
+
+def test_verify_many_matches_single_verification():
+    validator = ProofOfCoherenceValidator(difficulty=2)
+    good = [validator.mine_proof(f"n{i}", 0.99) for i in range(4)]
+    forged = validator.mine_proof("n9", 0.99)
+    forged.nonce += 1
+    proofs = good + [forged, good[0], good[2]]
+    expected = [validator.verify_proof(p) for p in proofs]
+    assert expected == [True] * 4 + [False, True, True]
+    assert validator.verify_many(proofs, workers=1) == expected
+    assert validator.verify_many(proofs, workers=2, chunk_size=2) == expected
+
+
+def test_authenticate_many_rejects_replays_and_stale_proofs():
+    auth = CoherenceAuthenticator()
+    auth.validator.difficulty = 2
+    a = auth.validator.mine_proof("a", 0.99)
+    b = auth.validator.mine_proof("b", 0.99)
+    old = int(time.time()) - 2 * auth.token_ttl
+    nonce = _search_nonces(_proof_prefix("c", 0.99, old), 2, 0, 10 ** 6)
+    stale = auth.validator._build_proof("c", 0.99, 0.86, 0.14, old, nonce)
+    assert auth.validator.verify_proof(stale)
+
+    tokens = auth.authenticate_many([("a", a), ("a", a), ("b", b), ("c", stale), ("x", b)], workers=1)
+    assert tokens[0] and tokens[2]
+    assert tokens[1] is None and tokens[3] is None and tokens[4] is None
+    assert auth.verify_token("a", tokens[0])
+    assert auth.authenticate("a", a) is None
+    assert auth.authenticate_many([("b", b)], workers=1) == [None]
+
+
+def test_ttl_cache_expires_in_insertion_order_despite_lru_moves():
+    now = [0.0]
+    cache = TTLCache(maxsize=3, ttl=10.0, clock=lambda: now[0])
+    cache.put("a")
+    now[0] = 5.0
+    cache.put("b")
+    now[0] = 6.0
+    assert "a" in cache  # move "a" para o fim da ordem LRU
+    now[0] = 11.0
+    assert len(cache) == 1 and "a" not in cache and "b" in cache
+
+    for key in "cde":
+        cache.put(key)
+    assert len(cache) == 3 and "b" not in cache
+    assert cache.pop("c") is True and len(cache) == 2
+
+
+if __name__ == "__main__":
+    test_meets_difficulty_counts_hex_digits()
+    test_parallel_mining_matches_sequential()
+    test_dead_worker_does_not_block_collection()
+    test_benchmark_counts_every_hash()
+    test_verify_many_matches_single_verification()
+    test_authenticate_many_rejects_replays_and_stale_proofs()
+    test_ttl_cache_expires_in_insertion_order_despite_lru_moves()
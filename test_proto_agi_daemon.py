@@ -0,0 +1,94 @@
+# test_proto_agi_daemon.py
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import proto_agi_daemon as pad
+
+DT = 0.02
+
+
+class _ScriptedLoop(pad.DaemonLoop):
+    """DaemonLoop com tick roteirizado: work[k] segundos de cálculo no tick k."""
+    def __init__(self, dt=DT, work=None, history=4096):
+        super().__init__(pad.hg, dt=dt, history=history)
+        self.work = work or {}
+        self.started = []
+
+    def _tick(self):
+        self.started.append(time.monotonic())  # mesmo relógio de loop.time()
+        time.sleep(self.work.get(len(self.started) - 1, 0.0))
+        return float(len(self.started))
+
+
+async def _run_for(daemon, seconds):
+    daemon.start()
+    await asyncio.sleep(seconds)
+    await daemon.stop()
+
+
+def test_ticks_stay_on_the_grid():
+    # 5 ms de cálculo por tick: um loop sleep(dt) derivaria ~0.15 s em 30 ticks
+    daemon = _ScriptedLoop(work={k: 0.005 for k in range(1000)})
+    asyncio.run(_run_for(daemon, 30.5 * DT))
+
+    t0 = daemon.started[0]
+    offsets = [t - (t0 + k * DT) for k, t in enumerate(daemon.started)]
+    assert len(daemon.started) >= 25
+    assert max(abs(o) for o in offsets) < DT / 2
+    assert daemon.overruns == 0
+    assert daemon.snapshot["ticks"] == daemon.ticks == len(daemon.started)
+
+
+def test_overrun_is_counted_and_realigned():
+    # Tick 3 leva 2.5·dt: perde os slots 4 e 5, o próximo começa em 6·dt
+    dt = 0.05  # folga de dt/2 para a latência do executor
+    daemon = _ScriptedLoop(dt=dt, work={3: 2.5 * dt})
+    asyncio.run(_run_for(daemon, 9.5 * dt))
+
+    assert daemon.overruns == 2
+    assert daemon.snapshot["overruns"] == 2
+    t0 = daemon.started[0]
+    slots = [(t - t0) / dt for t in daemon.started]
+    assert [round(s) for s in slots[:6]] == [0, 1, 2, 3, 6, 7]
+    assert abs(slots[4] - 6) < 0.5
+
+
+def test_phi_history_is_bounded():
+    daemon = _ScriptedLoop(dt=0.005, history=5)
+    asyncio.run(_run_for(daemon, 0.1))
+
+    assert daemon.ticks > 5
+    assert len(daemon.phi_history) == 5
+    assert [phi for _, phi in daemon.phi_history] == [float(k) for k in range(daemon.ticks - 4, daemon.ticks + 1)]
+    history = daemon.get_phi_history()
+    assert history == tuple(daemon.phi_history)
+    assert daemon.get_phi_history() is history  # mesma cópia até o próximo tick
+
+
+def test_startup_and_shutdown_events_drive_the_loop():
+    original = pad.daemon
+    pad.daemon = daemon = _ScriptedLoop()
+    try:
+        with TestClient(pad.app) as client:
+            deadline = time.monotonic() + 2.0
+            while daemon.ticks < 3 and time.monotonic() < deadline:
+                time.sleep(DT)
+            assert daemon.running and daemon.ticks >= 3
+            status = client.get("/status").json()
+            assert status["ticks"] >= 3 and status["nodes"] == len(pad.hg.nodes)
+            assert len(client.get("/phi").json()["phi_history"]) >= 3
+        assert not daemon.running and daemon.task.done()
+        ticks = daemon.ticks
+        time.sleep(3 * DT)
+        assert daemon.ticks == ticks
+    finally:
+        pad.daemon = original
+
+
+if __name__ == "__main__":
+    test_ticks_stay_on_the_grid()
+    test_overrun_is_counted_and_realigned()
+    test_phi_history_is_bounded()
+    test_startup_and_shutdown_events_drive_the_loop()
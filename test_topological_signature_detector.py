@@ -0,0 +1,186 @@
+# test_topological_signature_detector.py
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+import numpy as np
+from scipy import sparse
+from scipy.spatial.distance import cdist
+
+
+def _load_detector():
+    """Importa o detector com ripser/persim substituídos só durante o import."""
+    calls = []
+
+    def ripser(X, maxdim=1, distance_matrix=False):
+        calls.append((X, distance_matrix))
+        return {'dgms': [np.zeros((0, 2)) for _ in range(maxdim + 1)]}
+
+    ripser_stub = types.ModuleType("ripser")
+    ripser_stub.ripser = ripser
+    persim_stub = types.ModuleType("persim")
+    persim_stub.plot_diagrams = lambda *args, **kwargs: None
+
+    names = ("ripser", "persim", "topological_signature_detector")
+    saved = {name: sys.modules.get(name) for name in names}
+    sys.modules.pop("topological_signature_detector", None)
+    sys.modules.update(ripser=ripser_stub, persim=persim_stub)
+    try:
+        module = importlib.import_module("topological_signature_detector")
+    finally:
+        for name, mod in saved.items():
+            if mod is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = mod
+    return module, calls
+
+
+def _reference_maxmin(points, m):
+    D = cdist(points, points)
+    indices, radii = [0], [np.inf]
+    for _ in range(1, m):
+        nearest = D[:, indices].min(axis=1)
+        i = int(np.argmax(nearest))
+        indices.append(i)
+        radii.append(nearest[i])
+    return np.array(indices), np.array(radii)
+
+
+def test_maxmin_landmarks_matches_greedy_reference():
+    tsd, _ = _load_detector()
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(300, 5))
+
+    idx, radii = tsd.maxmin_landmarks(points, 40)
+    ref_idx, ref_radii = _reference_maxmin(points, 40)
+    assert idx.tolist() == ref_idx.tolist()
+    assert np.allclose(radii, ref_radii)
+    assert np.all(np.diff(radii[1:]) <= 1e-12)  # raios de inserção não crescem
+    assert cdist(points, points[idx]).min(axis=1).max() <= radii[-1]
+
+    idx_d, radii_d = tsd.maxmin_landmarks(None, 40, distances=cdist(points, points))
+    assert idx_d.tolist() == idx.tolist()
+    assert np.allclose(radii_d, radii)
+    assert len(tsd.maxmin_landmarks(points[:5], 40)[0]) == 5
+
+
+def test_sliding_window_distances_match_cdist():
+    tsd, _ = _load_detector()
+    rng = np.random.default_rng(1)
+    trajectory = rng.normal(size=(230, 5))
+    window, stride = 50, 20
+
+    windows = tsd.SlidingWindowDistances(window)
+    D = windows.push(trajectory[:window])
+    assert np.allclose(D, cdist(trajectory[:window], trajectory[:window]))
+    for start in range(stride, len(trajectory) - window + 1, stride):
+        D = windows.push(trajectory[start + window - stride:start + window])
+        expected = trajectory[start:start + window]
+        assert np.array_equal(windows.points, expected)
+        assert np.allclose(D, cdist(expected, expected))
+    assert windows.rows_computed == window + stride * ((len(trajectory) - window) // stride)
+
+    # Bloco maior que a janela: só os últimos window pontos ficam
+    D = windows.push(trajectory[:window + 7])
+    assert np.allclose(D, cdist(trajectory[7:window + 7], trajectory[7:window + 7]))
+
+
+def test_sparse_rips_distances_shape_and_bounds():
+    tsd, _ = _load_detector()
+    rng = np.random.default_rng(2)
+    t = rng.uniform(0, 2 * np.pi, 1500)
+    points = np.column_stack([np.cos(t), np.sin(t), 0.05 * rng.normal(size=len(t))])
+
+    D = tsd.sparse_rips_distances(points, eps=0.5)
+    assert sparse.isspmatrix_csr(D)
+    assert D.shape == (len(points), len(points))
+    I, J = D.nonzero()
+    assert np.all(I < J)
+    exact = np.linalg.norm(points[I] - points[J], axis=1)
+    assert np.all(D.data >= exact - 1e-12)  # arestas reescaladas só nascem mais tarde
+    assert D.nnz < len(points) * (len(points) - 1) // 20
+
+    assert tsd.sparse_rips_distances(points[:1], eps=0.5).shape == (1, 1)
+
+
+def test_homology_options_reach_ripser():
+    tsd, calls = _load_detector()
+    detector = tsd.TopologicalSignatureDetector()
+    rng = np.random.default_rng(3)
+    points = rng.normal(size=(200, 5))
+    D = cdist(points, points)
+
+    detector.compute_persistent_homology(D, max_dimension=1, n_landmarks=30, distance_matrix=True)
+    X, is_matrix = calls[-1]
+    assert is_matrix and X.shape == (30, 30)
+
+    detector.compute_persistent_homology(points, max_dimension=1, n_landmarks=30, sparse_eps=0.5)
+    X, is_matrix = calls[-1]
+    assert is_matrix and sparse.issparse(X) and X.shape == (30, 30)
+
+    try:
+        detector.compute_persistent_homology(D, sparse_eps=0.5, distance_matrix=True)
+        assert False, "sparse_eps com distance_matrix deveria falhar"
+    except ValueError:
+        pass
+
+
+
+class _StubBridge:
+    """Ponte simulada: uma volta de φ e meia de ψ a cada 100 passos."""
+    def __init__(self):
+        self.t = 0
+        self.omega = 2 * np.pi / 100
+
+    async def get_current_state(self):
+        w = self.omega * self.t
+        self.t += 1
+        return {'coherence': 0.5 + 0.3 * np.sin(w), 'coherence_derivative': 0.3 * self.omega * np.cos(w),
+                'mobius_phase': w, 'perspective': w / 2}
+
+
+def _final_ripser_input(**options):
+    """X e distance_matrix da última chamada ao ripser em continuous_monitoring."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    tsd, calls = _load_detector()
+    monitor = tsd.BridgeTopologyMonitor(_StubBridge())
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # figura e relatório são gravados no diretório atual
+        try:
+            asyncio.run(monitor.continuous_monitoring(duration_steps=600, window=100, stride=100, **options))
+        finally:
+            os.chdir(cwd)
+            plt.close('all')
+    # Seis janelas (matrizes 100×100) e a análise final
+    assert len(calls) == 7
+    assert all(is_matrix and X.shape == (100, 100) for X, is_matrix in calls[:6])
+    return calls[-1]
+
+
+def test_monitoring_final_analysis_uses_full_trajectory_by_default():
+    # 600 pontos: mais do que qualquer número razoável de landmarks padrão
+    X, is_matrix = _final_ripser_input()
+    assert not is_matrix and not sparse.issparse(X)
+    assert X.shape == (600, 5)
+
+    X, is_matrix = _final_ripser_input(n_landmarks=40)
+    assert not is_matrix and X.shape == (40, 5)
+
+    X, is_matrix = _final_ripser_input(sparse_eps=0.5)
+    assert is_matrix and sparse.issparse(X) and X.shape == (600, 600)
+
+
+if __name__ == "__main__":
+    test_maxmin_landmarks_matches_greedy_reference()
+    test_sliding_window_distances_match_cdist()
+    test_sparse_rips_distances_shape_and_bounds()
+    test_homology_options_reach_ripser()
+    test_monitoring_final_analysis_uses_full_trajectory_by_default()
@@ -0,0 +1,106 @@
+# test_wetware.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "09_WETWARE"))
+
+from neural_network import SparseWetwareNetwork, WetwareNetwork
+
+LIBRARY = {
+    'ChR2': {'min_freq': 470e12, 'max_freq': 495e12},
+    'NpHR': {'min_freq': 580e12, 'max_freq': 620e12},
+}
+BLUE = 480e12
+
+def test_sparse_backend_matches_object_network_spike_for_spike():
+    np.random.seed(7)
+    net = WetwareNetwork(n_neurons=300)
+    for neuron in net.neurons:
+        neuron.membrane_potential = np.random.uniform(-58.0, -54.0)  # perto do limiar: cascatas
+    fast = SparseWetwareNetwork.from_network(net)
+
+    total = 0
+    for _ in range(40):
+        expected = net.step()
+        spikes = fast.step()
+        assert spikes.tolist() == expected
+        assert np.isclose(fast.syzygy, net.syzygy)
+        total += len(expected)
+    assert total > 200
+
+    assert np.allclose(fast.membrane_potential, [n.membrane_potential for n in net.neurons])
+    assert np.allclose(fast.firing_rate, [n.firing_rate for n in net.neurons])
+    assert np.isclose(fast.compute_memory(), net.compute_memory())
+
+
+def test_sparse_backend_large_network_smoke():
+    net = SparseWetwareNetwork(n_neurons=50000, connection_prob=10.0 / 50000, seed=0)
+    assert abs(net.weights.nnz - 10 * 50000) < 5 * np.sqrt(10 * 50000)
+    assert net.weights.diagonal().sum() == 0
+    net.membrane_potential[:5000] = -50.0
+    spikes = net.run(20)
+    assert spikes >= 5000
+    assert len(net.syzygy_history) == 20
+    assert 0.1 <= net.compute_memory() <= 1.0
+
+
+def test_replicas_are_copy_on_write():
+    parent = SparseWetwareNetwork(n_neurons=2000, connection_prob=0.005, seed=1)
+    parent.load_opsin_library(LIBRARY)
+    potentials = parent.membrane_potential.copy()
+    weights = parent.weights.data.copy()
+    chr2 = parent.opsins['ChR2'].copy()
+
+    daughter = parent.replicate(mutation_rate=0.2)
+    assert daughter.membrane_potential is parent.membrane_potential
+    assert daughter._weights is None  # sinapses só são reconstruídas quando usadas
+    granddaughter = daughter.replicate(mutation_rate=0.2)
+
+    with pytest.raises(ValueError):
+        daughter.membrane_potential[0] = 0.0  # arrays compartilhados são somente leitura
+    daughter.stimulate_light(BLUE, intensity=4.0)  # neurônios ChR2 passam do limiar
+    daughter.run(5)
+    granddaughter.run(5)
+    assert daughter.weights.nnz < parent.weights.nnz
+    assert np.array_equal(parent.membrane_potential, potentials)
+    assert np.array_equal(parent.weights.data, weights)
+    assert np.array_equal(parent.opsins['ChR2'], chr2)
+    assert daughter.opsins['ChR2'].sum() > chr2.sum()
+
+    # O pai também escreve em cópias próprias, sem afetar a linhagem
+    spikes = daughter.membrane_potential.copy()
+    parent.stimulate_light(BLUE, intensity=4.0)
+    parent.run(5)
+    assert np.array_equal(daughter.membrane_potential, spikes)
+    assert not np.array_equal(parent.membrane_potential, potentials)
+
+
+def test_population_evolution_improves_response():
+    net = SparseWetwareNetwork(n_neurons=2000, connection_prob=0.002, seed=2)
+    net.load_opsin_library(LIBRARY)
+    start = int(net.sensitive_mask(BLUE).sum())
+
+    population = [net] + [net.replicate(mutation_rate=0.05) for _ in range(9)] + [net]
+    fitness = SparseWetwareNetwork.evaluate_population(population, BLUE)
+    assert fitness.tolist() == [int(p.sensitive_mask(BLUE).sum()) for p in population]
+
+    history, best = net.evolve(BLUE, generations=5, population_size=20)
+    assert len(history) == 5
+    assert history[0] >= start
+    assert all(b >= a for a, b in zip(history, history[1:]))  # elitismo
+    assert history[-1] > start
+    assert history[-1] == int(best.sensitive_mask(BLUE).sum())
+
+    obj = WetwareNetwork(n_neurons=200)
+    obj.load_opsin_library(LIBRARY)
+    assert len(obj.evolve(BLUE, generations=3, population_size=8)) == 3
+
+
+if __name__ == "__main__":
+    test_sparse_backend_matches_object_network_spike_for_spike()
+    test_sparse_backend_large_network_smoke()
+    test_replicas_are_copy_on_write()
+    test_population_evolution_improves_response()
@@ -8,9 +8,125 @@ import numpy as np
 from ripser import ripser
 from persim import plot_diagrams
 import matplotlib.pyplot as plt
-from typing import Dict, List, Tuple
+from scipy import sparse
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+
+# ===== APROXIMAÇÕES PARA TRAJETÓRIAS LONGAS =====
+
+def maxmin_landmarks(points: np.ndarray, n_landmarks: int, start: int = 0,
+                     distances: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Subamostragem maxmin (permutação gulosa): cada novo landmark é o ponto
+    mais distante dos já escolhidos. Custo O(n·m) e memória O(n).
+
+    Retorna (índices, raios de inserção); o raio do k-ésimo landmark é a
+    distância dele aos anteriores (inf para o primeiro), e o último raio
+    limita a distância de qualquer ponto ao conjunto de landmarks.
+    Com distances (matriz n×n) usa as linhas dela em vez dos pontos.
+    """
+    n = len(distances) if distances is not None else len(points)
+    m = min(n_landmarks, n)
+
+    def row(i):
+        if distances is not None:
+            return distances[i]
+        return np.linalg.norm(points - points[i], axis=1)
+
+    indices = np.empty(m, dtype=np.int64)
+    radii = np.empty(m)
+    indices[0], radii[0] = start, np.inf
+    nearest = row(start)
+    for k in range(1, m):
+        i = int(np.argmax(nearest))
+        indices[k], radii[k] = i, nearest[i]
+        np.minimum(nearest, row(i), out=nearest)
+    return indices, radii
+
+
+def sparse_rips_distances(points: np.ndarray, eps: float) -> sparse.csr_matrix:
+    """
+    Matriz de distâncias esparsa de uma filtração Rips aproximada
+    (Sheehy; Cavanna et al.), a menos de um fator (1 + eps).
+
+    Cada ponto i só enxerga vizinhos dentro de um raio proporcional ao
+    seu raio de inserção λ_i na permutação gulosa, e arestas longas
+    entram mais tarde na filtração; o número de arestas fica O(n) para
+    eps fixo em vez de O(n²).
+
+    A permutação gulosa ainda percorre todos os n pontos (tempo O(n²),
+    memória O(n)); para trajetórias muito longas reduza antes com
+    maxmin_landmarks (n_landmarks em compute_persistent_homology).
+    """
+    n = len(points)
+    order, radii = maxmin_landmarks(points, n)
+    lambdas = np.empty(n)
+    lambdas[order] = radii
+    lambdas[order[0]] = radii[1] if n > 1 else 0.0  # evita vizinhança infinita
+
+    E0 = (1 + eps) / eps
+    E1 = (1 + eps) ** 2 / eps
+    bounds = ((eps ** 2 + 3 * eps + 2) / eps) * lambdas
+
+    tree = cKDTree(points)
+    neighbors = tree.query_ball_point(points, r=bounds)
+    I = np.repeat(np.arange(n), [len(nb) for nb in neighbors])
+    J = np.concatenate([np.asarray(nb, dtype=np.int64) for nb in neighbors]) if n else np.empty(0, dtype=np.int64)
+    upper = I < J
+    I, J = I[upper], J[upper]
+    D = np.linalg.norm(points[I] - points[J], axis=1)
+
+    min_lam = np.minimum(lambdas[I], lambdas[J])
+    max_lam = np.maximum(lambdas[I], lambdas[J])
+    keep = D <= np.minimum((E0 + E1) * min_lam, E0 * (min_lam + max_lam))
+    I, J, D, min_lam = I[keep], J[keep], D[keep], min_lam[keep]
+
+    # Arestas além de 2·λ·E0 nascem mais tarde (distância reescalada)
+    late = D > 2 * min_lam * E0
+    D[late] = 2.0 * (D[late] - min_lam[late] * E0)
+    return sparse.coo_matrix((D, (I, J)), shape=(n, n)).tocsr()
+
+
+class SlidingWindowDistances:
+    """
+    Matriz de distâncias de uma janela deslizante sobre a trajetória.
+
+    Ao avançar, as distâncias entre pontos que continuam na janela são
+    reaproveitadas (deslocamento da submatriz) e só as linhas dos pontos
+    novos são calculadas: O(stride·window) por passo em vez de O(window²).
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.points: Optional[np.ndarray] = None
+        self.distances: Optional[np.ndarray] = None
+        self.rows_computed = 0
+
+    def push(self, new_points: np.ndarray) -> np.ndarray:
+        """Acrescenta pontos e retorna a matriz de distâncias da janela atual"""
+        new_points = np.atleast_2d(np.asarray(new_points, dtype=float))[-self.window:]
+        if self.points is None:
+            kept = new_points[:0]
+        else:
+            kept = self.points[max(0, len(self.points) + len(new_points) - self.window):]
+        k, m = len(kept), len(kept) + len(new_points)
+
+        D = np.empty((m, m))
+        if k:
+            D[:k, :k] = self.distances[-k:, -k:]
+        points = np.vstack([kept, new_points])
+        cross = cdist(new_points, points)
+        D[k:, :] = cross
+        D[:, k:] = cross.T
+
+        self.points, self.distances = points, D
+        self.rows_computed += len(new_points)
+        return D
+
+
 class TopologicalSignatureDetector:
     """
     Detecta assinaturas topológicas (torção de Möbius, ciclos)
@@ -51,7 +167,10 @@ class TopologicalSignatureDetector:
 
         return trajectory
 
-    def compute_persistent_homology(self, trajectory: np.ndarray, max_dimension: int = 2):
+    def compute_persistent_homology(self, trajectory: np.ndarray, max_dimension: int = 2,
+                                    n_landmarks: Optional[int] = None,
+                                    sparse_eps: Optional[float] = None,
+                                    distance_matrix: bool = False):
         """
         Computa homologia persistente da trajetória
 
@@ -59,12 +178,37 @@ class TopologicalSignatureDetector:
         - H₀: Componentes conectados (sempre trivial para trajetória)
         - H₁: Ciclos (AQUI ESTÁ A MÖBIUS!)
         - H₂: Vazios/cavidades
+
+        Para trajetórias longas:
+        - n_landmarks: usa só n_landmarks pontos escolhidos por maxmin
+        - sparse_eps: filtração Rips esparsa (aproximação 1 + eps); exige
+          pontos, não combina com distance_matrix
+        - distance_matrix: trajectory já é uma matriz de distâncias
+          (ex: SlidingWindowDistances)
         """
 
+        if sparse_eps is not None and distance_matrix:
+            raise ValueError("sparse_eps exige pontos; não combina com distance_matrix=True")
+
         print(f"\n🔬 Computing persistent homology (dim ≤ {max_dimension})...")
 
+        points = trajectory
+        if n_landmarks is not None and len(trajectory) > n_landmarks:
+            if distance_matrix:
+                idx, radii = maxmin_landmarks(None, n_landmarks, distances=trajectory)
+                points = trajectory[np.ix_(idx, idx)]
+            else:
+                idx, radii = maxmin_landmarks(trajectory, n_landmarks)
+                points = trajectory[idx]
+            print(f"   Landmarks: {len(idx)} of {len(trajectory)} points (cover radius {radii[-1]:.4f})")
+
         # Usa Ripser para computar
-        result = ripser(trajectory, maxdim=max_dimension)
+        if sparse_eps is not None:
+            D = sparse_rips_distances(points, sparse_eps)
+            print(f"   Sparse Rips: {D.nnz} edges (eps = {sparse_eps})")
+            result = ripser(D, maxdim=max_dimension, distance_matrix=True)
+        else:
+            result = ripser(points, maxdim=max_dimension, distance_matrix=distance_matrix)
         diagrams = result['dgms']
 
         self.barcodes.append(diagrams)
@@ -186,6 +330,20 @@ class TopologicalSignatureDetector:
             print(f"   ⚠️  No clear inversion")
             return False
 
+    def sliding_window_homology(self, trajectory: np.ndarray, window: int, stride: int,
+                                max_dimension: int = 1) -> List[List[np.ndarray]]:
+        """
+        Homologia persistente em janelas [k·stride, k·stride + window) da
+        trajetória, reaproveitando as distâncias entre janelas sobrepostas
+        """
+        windows = SlidingWindowDistances(window)
+        windows.push(trajectory[:window])
+        results = [self.compute_persistent_homology(windows.distances, max_dimension, distance_matrix=True)]
+        for start in range(stride, len(trajectory) - window + 1, stride):
+            D = windows.push(trajectory[start + window - stride:start + window])
+            results.append(self.compute_persistent_homology(D, max_dimension, distance_matrix=True))
+        return results
+
     def visualize_topology(self, trajectory: np.ndarray, diagrams: List[np.ndarray]):
         """
         Visualiza trajetória e diagramas de persistência
@@ -334,32 +492,50 @@ class BridgeTopologyMonitor:
         self.bridge = bridge_system
         self.detector = TopologicalSignatureDetector("Ponte")
 
-    async def continuous_monitoring(self, duration_steps: int = 1000):
+    async def continuous_monitoring(self, duration_steps: int = 1000, window: int = 100,
+                                    stride: int = 100, n_landmarks: Optional[int] = None,
+                                    sparse_eps: Optional[float] = None):
         """
         Monitora topologia da Ponte em tempo real
+
+        A cada stride passos analisa a janela dos últimos window estados
+        (distâncias reaproveitadas entre janelas). Por padrão a análise
+        final continua sendo a filtração Vietoris–Rips completa sobre a
+        trajetória inteira, sem limite: tempo e memória crescem pelo menos
+        quadraticamente com duration_steps. Para monitoramentos longos
+        passe n_landmarks (pontos maxmin) e/ou sparse_eps (Rips esparsa).
         """
 
         print(f"🌉 Monitoring Bridge topology for {duration_steps} steps...")
 
-        states = []
+        windows = SlidingWindowDistances(window)
+        chunks = []
+        pending = []
 
         # Simula evolução da Ponte
         for step in range(duration_steps):
             state = await self.bridge.get_current_state()
-            states.append(state)
+            pending.append(state)
 
-            # A cada 100 passos, analisa
-            if (step + 1) % 100 == 0:
-                trajectory = self.detector.capture_state_trajectory(states[-100:])
-                diagrams = self.detector.compute_persistent_homology(trajectory)
+            # A cada stride passos, analisa a janela
+            if (step + 1) % stride == 0:
+                new_points = self.detector.capture_state_trajectory(pending)
+                chunks.append(new_points)
+                pending = []
+                D = windows.push(new_points)
+                diagrams = self.detector.compute_persistent_homology(D, distance_matrix=True)
 
-                has_inversion = self.detector.detect_phase_inversion(trajectory)
+                has_inversion = self.detector.detect_phase_inversion(windows.points)
                 if has_inversion:
                     self.detector.mobius_signature_detected = True
 
         # Análise final
-        final_trajectory = self.detector.capture_state_trajectory(states)
-        final_diagrams = self.detector.compute_persistent_homology(final_trajectory)
+        if pending:
+            chunks.append(self.detector.capture_state_trajectory(pending))
+        final_trajectory = np.vstack(chunks)
+        self.detector.trajectories.append(final_trajectory)
+        final_diagrams = self.detector.compute_persistent_homology(
+            final_trajectory, n_landmarks=n_landmarks, sparse_eps=sparse_eps)
 
         has_inversion = self.detector.detect_phase_inversion(final_trajectory)
         if has_inversion: